@@ -0,0 +1,94 @@
+import argparse
+import json
+import sys
+
+from .models import DEFAULT_INSTANCES, FAMILIES, build
+from .runner import algorithms, policies, run_all, work, compare
+
+# benchmark degli algoritmi e delle politiche di cspsolver
+#
+#   python -m benchmarks run --timeout 30 --output results.json
+#   python -m benchmarks run --instances queens-20 rb-25-0.6 --algorithms ForwardChecking AC3
+#   python -m benchmarks compare old.json new.json
+#
+# da eseguire nella cartella principale del progetto
+
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(prog="python -m benchmarks", description="Benchmark di algoritmi e politiche di cspsolver.")
+    commands = parser.add_subparsers(dest="command")
+
+    run = commands.add_parser("run", help="esegue i benchmark e salva i risultati in JSON")
+    run.add_argument("--instances", nargs="+", default=DEFAULT_INSTANCES,
+                     help="istanze da risolvere, es. queens-8 sudoku rb-20-0.6 (famiglie: " + ", ".join(FAMILIES) + ")")
+    run.add_argument("--algorithms", nargs="+", default=algorithms(), choices=algorithms(), metavar="ALGORITHM")
+    run.add_argument("--policies", nargs="+", default=policies(), choices=policies(), metavar="POLICY")
+    run.add_argument("--timeout", type=float, default=60, help="limite di tempo per ogni esecuzione, in secondi")
+    run.add_argument("--memory", type=int, default=1024, help="limite di memoria per ogni esecuzione, in MB (0 = nessun limite)")
+    run.add_argument("--all-solutions", action="store_true", help="cerca tutte le soluzioni invece della prima")
+    run.add_argument("--trail", action="store_true", help="risolve con solve(trail=True)")
+    run.add_argument("--statistics", action="store_true", help="salva anche le statistiche della ricerca")
+    run.add_argument("--output", default="benchmark_results.json", help="file dei risultati")
+
+    compare_parser = commands.add_parser("compare", help="confronta due file di risultati")
+    compare_parser.add_argument("old")
+    compare_parser.add_argument("new")
+    compare_parser.add_argument("--threshold", type=float, default=0.1,
+                                help="variazione relativa del tempo oltre la quale segnalare una differenza")
+
+    commands.add_parser("list", help="elenca algoritmi, politiche e istanze di default")
+
+    # eseguito nei sottoprocessi da runner.run_one
+    worker = commands.add_parser("_worker")
+    worker.add_argument("instance")
+    worker.add_argument("algorithm")
+    worker.add_argument("policy")
+    worker.add_argument("--memory", type=int, default=0)
+    worker.add_argument("--all-solutions", action="store_true")
+    worker.add_argument("--trail", action="store_true")
+    worker.add_argument("--statistics", action="store_true")
+
+    args = parser.parse_args(argv)
+
+    if args.command == "run":
+        for instance in args.instances:
+            # errori nei nomi delle istanze prima di iniziare
+            try:
+                build(instance, None, None)
+            except ValueError as error:
+                parser.error(str(error))
+
+        results = run_all(args.instances, args.algorithms, args.policies, args.timeout, args.memory,
+                          args.all_solutions, args.trail, args.statistics)
+        with open(args.output, "w") as f:
+            json.dump(results, f, indent=2)
+        print("Risultati salvati in " + args.output)
+        return 0
+
+    if args.command == "compare":
+        with open(args.old) as f:
+            old = json.load(f)
+        with open(args.new) as f:
+            new = json.load(f)
+        regressions = compare(old, new, args.threshold)
+        print("Regressioni: " + str(regressions))
+        return 1 if regressions else 0
+
+    if args.command == "list":
+        print("Algoritmi: " + ", ".join(algorithms()))
+        print("Politiche: " + ", ".join(policies()))
+        print("Istanze di default: " + ", ".join(DEFAULT_INSTANCES))
+        return 0
+
+    if args.command == "_worker":
+        result = work(args.instance, args.algorithm, args.policy, args.memory,
+                      args.all_solutions, args.trail, args.statistics)
+        print(json.dumps(result))
+        return 0
+
+    parser.print_help()
+    return 2
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,160 @@
+from typing import Callable, Dict
+import functools
+import itertools
+import math
+import random
+
+from cspsolver import CSPSolver
+
+# situazione iniziale del sudoku di examples/sudoku.py
+SUDOKU_GIVEN = {
+    "cell_14": 1, "cell_16": 2, "cell_22": 8, "cell_25": 5, "cell_28": 3, "cell_33": 4, "cell_35": 8,
+    "cell_37": 7, "cell_42": 6, "cell_47": 9, "cell_48": 5, "cell_51": 3, "cell_55": 9, "cell_56": 6,
+    "cell_59": 2, "cell_62": 5, "cell_68": 7, "cell_71": 5, "cell_77": 4, "cell_82": 9, "cell_85": 3,
+    "cell_88": 6, "cell_89": 7, "cell_94": 4, "cell_96": 8, "cell_97": 5
+}
+
+# istanze eseguite di default da python -m benchmarks run
+DEFAULT_INSTANCES = ["arc", "queens-8", "queens-12", "queens_alldiff-12", "sudoku", "sudoku_alldiff", "rb-12-0.5", "rb-15-0.6"]
+
+
+def queens(solver: CSPSolver, n: int, all_different: bool = False):
+    """
+    Problema delle n regine: la variabile ri è la colonna della regina sulla riga i.
+    Con all_different le colonne diverse sono un vincolo globale (come in examples/n_queens.py),
+    altrimenti vincoli binari.
+    """
+    names = ["r" + str(i) for i in range(1, n + 1)]
+    for name in names:
+        solver.add_variable(name, list(range(1, n + 1)))
+
+    if all_different:
+        solver.add_all_different(names)
+
+    for i in range(n):
+        for j in range(i + 1, n):
+            if not all_different:
+                solver.add_constraint((names[i], names[j]), lambda xi, xj: xi != xj)
+            solver.add_constraint((names[i], names[j]), lambda xi, xj, d=j - i: xi != xj + d)
+            solver.add_constraint((names[i], names[j]), lambda xi, xj, d=j - i: xi != xj - d)
+
+
+def sudoku(solver: CSPSolver, given: Dict[str, int] = SUDOKU_GIVEN, all_different: bool = False):
+    """
+    Sudoku 9x9 di examples/sudoku.py: cell_ij è la cella sulla riga i, colonna j,
+    i valori iniziali sono vincoli unari.
+    Con all_different righe, colonne e quadrati sono vincoli globali (come nell'esempio),
+    altrimenti vincoli binari tra ogni coppia di celle.
+    """
+    cells = [(i, j) for i in range(1, 10) for j in range(1, 10)]
+    for i, j in cells:
+        solver.add_variable("cell_" + str(i) + str(j), list(range(1, 10)))
+
+    if all_different:
+        groups = [[(i, j) for j in range(1, 10)] for i in range(1, 10)]
+        groups += [[(j, i) for j in range(1, 10)] for i in range(1, 10)]
+        groups += [[(3 * r + i, 3 * c + j) for i in range(1, 4) for j in range(1, 4)] for r in range(3) for c in range(3)]
+        for group in groups:
+            solver.add_all_different(["cell_" + str(i) + str(j) for i, j in group])
+    else:
+        different = lambda x, y: x != y
+        for (i, j), (k, h) in itertools.combinations(cells, 2):
+            if i == k or j == h or ((i - 1) // 3 == (k - 1) // 3 and (j - 1) // 3 == (h - 1) // 3):
+                solver.add_constraint(("cell_" + str(i) + str(j), "cell_" + str(k) + str(h)), different)
+
+    for name, value in given.items():
+        solver.add_constraint((name,), lambda x, value=value: x == value)
+
+
+def arc(solver: CSPSolver):
+    """
+    Il problema di examples/arc_consistency.py.
+    """
+    solver.add_variables(["a", "b", "c", "d", "e"], [1, 2, 3, 4])
+
+    solver.add_constraint(("b", ), lambda b: b != 3)
+    solver.add_constraint(("c", ), lambda c: c != 2)
+    solver.add_constraint(("a", "b"), lambda a, b: a != b)
+    solver.add_constraint(("b", "c"), lambda b, c: b != c)
+    solver.add_constraint(("c", "d"), lambda c, d: c < d)
+    solver.add_constraint(("a", "d"), lambda a, d: a == d)
+    solver.add_constraint(("e", "a"), lambda e, a: e < a)
+    solver.add_constraint(("e", "b"), lambda e, b: e < b)
+    solver.add_constraint(("e", "c"), lambda e, c: e < c)
+    solver.add_constraint(("e", "d"), lambda e, d: e < d)
+    solver.add_constraint(("b", "d"), lambda b, d: b != d)
+
+
+def model_rb(solver: CSPSolver, n: int, p: float, seed: int = 0, alpha: float = 0.8, r: float = 0.8):
+    """
+    CSP binario casuale secondo il modello RB: n variabili con dominio di n^alpha valori,
+    r * n * ln(n) vincoli tra coppie distinte di variabili scelte a caso (densità),
+    ogni vincolo esclude p * d^2 coppie di valori scelte a caso (strettezza).
+    Le istanze più difficili sono vicine alla soglia p = 1 - e^(-alpha / r).
+
+    Parametri
+    -------
+    solver : CSPSolver
+        il solver a cui aggiungere variabili e vincoli
+    n : int
+        numero di variabili
+    p : float
+        strettezza dei vincoli, frazione di coppie di valori escluse
+    seed : int = 0
+        seme del generatore casuale, la stessa terna (n, p, seed) genera sempre la stessa istanza
+    alpha : float = 0.8
+        la dimensione dei domini è n^alpha
+    r : float = 0.8
+        il numero di vincoli è r * n * ln(n)
+    """
+    generator = random.Random(seed)
+    d = max(1, round(n ** alpha))
+    names = ["x" + str(i) for i in range(n)]
+    for name in names:
+        solver.add_variable(name, list(range(d)))
+
+    pairs = list(itertools.combinations(range(n), 2))
+    m = min(len(pairs), round(r * n * math.log(n)))
+    tuples = list(itertools.product(range(d), repeat=2))
+    t = round(p * d * d)
+
+    for index_1, index_2 in generator.sample(pairs, m):
+        forbidden = frozenset(generator.sample(tuples, t))
+        solver.add_constraint((names[index_1], names[index_2]), lambda a, b, forbidden=forbidden: (a, b) not in forbidden)
+
+
+# famiglie di modelli: funzione, tipi dei parametri nel nome dell'istanza (es. "queens-8", "rb-20-0.6-1")
+# e numero di parametri obbligatori
+FAMILIES = {
+    "queens": (queens, (int,), 1),
+    "queens_alldiff": (functools.partial(queens, all_different=True), (int,), 1),
+    "sudoku": (sudoku, (), 0),
+    "sudoku_alldiff": (functools.partial(sudoku, all_different=True), (), 0),
+    "arc": (arc, (), 0),
+    "rb": (model_rb, (int, float, int), 2)
+}
+
+
+def build(instance: str, algorithm: Callable, policy: Callable) -> CSPSolver:
+    """
+    Costruisce il problema descritto dal nome dell'istanza: la famiglia seguita dai parametri separati da "-",
+    es. "queens-12" oppure "rb-20-0.6" (n, p e opzionalmente il seme).
+
+    Errors
+    ------
+    ValueError
+        se la famiglia non esiste o i parametri non sono validi
+    """
+    family, *arguments = instance.split("-")
+    if family not in FAMILIES:
+        raise ValueError("Unknown model family " + family + ", available: " + ", ".join(FAMILIES) + ".")
+
+    model, types, required = FAMILIES[family]
+    if not required <= len(arguments) <= len(types):
+        raise ValueError("Wrong number of parameters for " + family + ": " + instance + ".")
+
+    arguments = [parameter_type(argument) for parameter_type, argument in zip(types, arguments)]
+    solver = CSPSolver(algorithm, policy)
+    model(solver, *arguments)
+
+    return solver
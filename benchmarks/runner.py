@@ -0,0 +1,159 @@
+from typing import Dict, List, Any, Optional
+from time import perf_counter
+import json
+import os
+import platform
+import subprocess
+import sys
+import time
+
+from cspsolver import Algorithm, Policy
+from .models import build
+
+try:
+    import resource
+except ImportError:
+    # Windows: niente limite di memoria, la memoria massima non viene misurata
+    resource = None
+
+# cartella da cui eseguire python -m benchmarks nei sottoprocessi
+_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+
+def algorithms() -> List[str]:
+    return [name for name in vars(Algorithm) if not name.startswith("_")]
+
+
+def policies() -> List[str]:
+    return [name for name in vars(Policy) if not name.startswith("_")]
+
+
+def run_all(instances: List[str], algorithm_names: List[str], policy_names: List[str], timeout: float,
+            memory: Optional[int], all_solutions: bool = False, trail: bool = False,
+            statistics: bool = False, log=sys.stdout) -> Dict[str, Any]:
+    """
+    Esegue ogni combinazione istanza x algoritmo x politica in un sottoprocesso separato,
+    con limite di tempo (secondi) e di memoria (MB), e restituisce i risultati
+    nel formato salvato da python -m benchmarks run.
+    """
+    results = []
+    for instance in instances:
+        for algorithm in algorithm_names:
+            for policy in policy_names:
+                result = run_one(instance, algorithm, policy, timeout, memory, all_solutions, trail, statistics)
+                results.append(result)
+
+                if log:
+                    time_str = "{0:.3f} s".format(result["time"]) if result["time"] is not None else "-"
+                    print("{0:<16} {1:<22} {2:<26} {3:<8} {4}".format(instance, algorithm, policy, result["status"], time_str), file = log)
+
+    return {
+        "date": time.strftime("%Y-%m-%dT%H:%M:%S"),
+        "python": platform.python_version(),
+        "platform": platform.platform(),
+        "config": {"timeout": timeout, "memory": memory, "all_solutions": all_solutions,
+                   "trail": trail, "statistics": statistics},
+        "results": results
+    }
+
+
+def run_one(instance: str, algorithm: str, policy: str, timeout: float, memory: Optional[int],
+            all_solutions: bool = False, trail: bool = False, statistics: bool = False) -> Dict[str, Any]:
+    """
+    Esegue una sola combinazione in un sottoprocesso, status è:
+      - "ok": risolto entro i limiti
+      - "timeout": superato il limite di tempo, il sottoprocesso viene terminato
+      - "memory": superato il limite di memoria
+      - "error": il sottoprocesso è terminato con un errore (vedi "error")
+    """
+    command = [sys.executable, "-m", "benchmarks", "_worker", instance, algorithm, policy]
+    if memory: command += ["--memory", str(memory)]
+    if all_solutions: command.append("--all-solutions")
+    if trail: command.append("--trail")
+    if statistics: command.append("--statistics")
+
+    result = {"instance": instance, "algorithm": algorithm, "policy": policy, "status": "ok", "time": None}
+
+    try:
+        completed = subprocess.run(command, cwd=_ROOT, timeout=timeout, stdout=subprocess.PIPE,
+                                   stderr=subprocess.PIPE, universal_newlines=True)
+    except subprocess.TimeoutExpired:
+        result["status"] = "timeout"
+        return result
+
+    if completed.returncode != 0:
+        error = completed.stderr.strip().splitlines()
+        result["status"] = "memory" if "MemoryError" in completed.stderr else "error"
+        result["error"] = error[-1] if error else "exit code " + str(completed.returncode)
+        return result
+
+    result.update(json.loads(completed.stdout.strip().splitlines()[-1]))
+    return result
+
+
+def work(instance: str, algorithm: str, policy: str, memory: Optional[int],
+         all_solutions: bool, trail: bool, statistics: bool) -> Dict[str, Any]:
+    """
+    Eseguito nel sottoprocesso: costruisce il problema, lo risolve e restituisce le misure.
+    Il tempo misura solo la risoluzione, non la costruzione del problema;
+    con statistics le misure includono il costo della raccolta delle statistiche.
+    """
+    if memory and resource is not None:
+        limit = memory * 1024 * 1024
+        resource.setrlimit(resource.RLIMIT_AS, (limit, limit))
+
+    solver = build(instance, getattr(Algorithm, algorithm), getattr(Policy, policy))
+
+    start = perf_counter()
+    solutions = solver.solve(one_solution=not all_solutions, trail=trail, record_tree="off", decompose=False,
+                             statistics=statistics)
+    elapsed = perf_counter() - start
+
+    result = {"time": elapsed, "solutions": len(solutions)}
+    if resource is not None:
+        # KB su Linux, byte su macOS
+        result["max_rss"] = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    if statistics:
+        result["statistics"] = solver.stats.as_dict()
+
+    return result
+
+
+def compare(old: Dict[str, Any], new: Dict[str, Any], threshold: float, log=sys.stdout) -> int:
+    """
+    Confronta due file di risultati e stampa il rapporto dei tempi (nuovo / vecchio)
+    per le combinazioni presenti in entrambi.
+    Restituisce il numero di regressioni: combinazioni più lente di oltre threshold
+    (es. 0.1 = 10%), oppure risolte prima e non più ora.
+    """
+    key = lambda result: (result["instance"], result["algorithm"], result["policy"])
+    old_results = {key(result): result for result in old["results"]}
+    regressions = 0
+
+    for result in new["results"]:
+        old_result = old_results.get(key(result))
+        if old_result is None:
+            continue
+
+        old_ok = old_result["status"] == "ok"
+        new_ok = result["status"] == "ok"
+        note = ""
+        if old_ok and new_ok:
+            ratio = result["time"] / old_result["time"] if old_result["time"] else float("inf")
+            change = "{0:.2f}x".format(ratio)
+            if ratio > 1 + threshold:
+                note = "REGRESSIONE"
+                regressions += 1
+            elif ratio < 1 - threshold:
+                note = "miglioramento"
+        else:
+            change = old_result["status"] + " -> " + result["status"]
+            if old_ok:
+                note = "REGRESSIONE"
+                regressions += 1
+            elif new_ok:
+                note = "miglioramento"
+
+        print("{0:<16} {1:<22} {2:<26} {3:<20} {4}".format(*key(result), change, note), file = log)
+
+    return regressions
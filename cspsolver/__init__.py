@@ -1,4 +1,8 @@
 from .cspsolver import CSPSolver
 from .algorithm import Algorithm
 from .policy import Policy
+from .value_order import ValueOrder
+from .restarts import Restart
+from .search import Status
+from .optimize import SumObjective
 from .plot import draw_constraint_graph, draw_decision_tree
\ No newline at end of file
@@ -1,10 +1,12 @@
-from typing import TextIO, Optional
+from typing import Optional, Callable, Set
+from collections import deque
 from .node import Node
 from .constraints import Constraints
 from .variable import Variable
+from .trace import TraceSink, PRUNE, MESSAGE
 
-str_value_not_compatible = "{not_assigned} = {not_assigned_value} non e' compatibile con {variable} = {value} -> Nuovo dominio di {not_assigned}: {not_assigned_domain}"
-str_var_not_compatible = "{not_assigned} = {not_assigned_value} non e' compatibile con i valori di {variable} -> Nuovo dominio di {not_assigned}: {not_assigned_domain}"
+# nessun supporto residuo salvato, vedi Algorithm.AC2001
+_NO_RESIDUE = object()
 
 class Algorithm:
     """
@@ -23,8 +25,10 @@ class Algorithm:
     tree_depth: int
         L'attuale profondità dell'albero di decisione,
         corrisponde anche al numero di variabili già assegnate
-    target: TextIO
-        Dove stampare l'output (es. sys.stdout)
+    target: cspsolver.trace.TraceSink
+        Dove inviare gli eventi della risoluzione (None se la traccia è disattivata),
+        es. target.emit((PRUNE, variabile, valore, causa, valore della causa, dominio)),
+        vedi cspsolver.trace. Anche print(..., file = target) funziona
 
     Return
     -------
@@ -33,82 +37,110 @@ class Algorithm:
     """
 
     @staticmethod
-    def GenerateAndTest(node: Node, constraints: Constraints, tree_depth: int, target: Optional[TextIO]) -> bool:
+    def GenerateAndTest(node: Node, constraints: Constraints, tree_depth: int, target: Optional[TraceSink]) -> bool:
         """
         La funzione ha successo ad ogni passo (Generate) eccetto l'ultimo,
         nel quale vengono testate le assegnaziononi effettuate (Test),
         se ci sono incompatibilità restituisce False
         """
 
-        if target: print("Applico l'algoritmo Generate and Test...", file = target)
+        if target: target.emit((MESSAGE, "Applico l'algoritmo Generate and Test..."))
 
-        if tree_depth + 1 == len(node.get_variables()):
-            for index, variable in enumerate(node.get_variables()):
+        variables = node.get_variables()
+        if tree_depth + 1 == len(variables):
+            for variable in variables:
                 # verifico vincoli unari
-                if not constraints.verify({variable.name: variable.value}):
+                if not constraints.check_unary(variable.index, variable.value):
                     return False
                     
                 # verifico vincoli binari
-                for variable_2 in node.get_variables()[index + 1:]:
-                    if not constraints.verify({variable.name: variable.value, variable_2.name: variable_2.value}):
-                        return False
+                for index_2 in constraints.neighbours(variable.index):
+                    if index_2 > variable.index:
+                        variable_2 = variables[index_2]
+                        if not constraints.check(variable.index, variable.value, index_2, variable_2.value):
+                            constraints.record_failure(variable.index, index_2)
+                            return False
+
+            # verifico vincoli globali
+            for constraint in constraints.get_globals():
+                if not constraint.check(variables):
+                    constraints.record_global_failure(constraint)
+                    return False
 
         return True
 
     @staticmethod
-    def StandardBacktracking(node: Node, constraints: Constraints, tree_depth: int, target: Optional[TextIO]) -> bool:
+    def StandardBacktracking(node: Node, constraints: Constraints, tree_depth: int, target: Optional[TraceSink]) -> bool:
         """
         Viene testata la compatibilità dell'ultima variabile assegnata
         con le variabili assegnate precedentemente, se ci sono incompatibilità restituisce False
         """
 
-        if target: print("Applico l'algoritmo Standard Backtracking...", file = target)
+        if target: target.emit((MESSAGE, "Applico l'algoritmo Standard Backtracking..."))
 
         variable = node.get_last_assigned_variable()
         # verifico vincoli unari
-        if not constraints.verify({variable.name: variable.value}):
+        if not constraints.check_unary(variable.index, variable.value):
             return False
         
         # verifico vincoli binari
-        # prendo variabili assegnate diverse da quella appena assegnata
-        for assigned_var in [v for v in node.get_variables() if v.value and not variable.name == v.name]:
-            if not constraints.verify({variable.name: variable.value, assigned_var.name: assigned_var.value}):
+        # prendo le variabili assegnate vincolate con quella appena assegnata
+        variables = node.get_variables()
+        for index in constraints.neighbours(variable.index):
+            assigned_var = variables[index]
+            if assigned_var.value is not None and not constraints.check(variable.index, variable.value, index, assigned_var.value):
+                constraints.record_failure(variable.index, index)
+                return False
+
+        # verifico vincoli globali
+        for constraint in constraints.get_globals(variable.index):
+            if not constraint.check_variable(variables, variable.index):
+                constraints.record_global_failure(constraint)
                 return False
 
         return True
 
     @staticmethod
-    def ForwardChecking(node: Node, constraints: Constraints, tree_depth: int, target: Optional[TextIO]) -> bool:
+    def ForwardChecking(node: Node, constraints: Constraints, tree_depth: int, target: Optional[TraceSink]) -> bool:
         """
         Elimino dai domini delle variabili non ancora assegnate
         i valori non compatibili con l'ultima variabile assegnata.
         Se rimangono domini vuoti la funzione restituisce False
         """
 
-        if target: print("Applico l'algoritmo Forward Checking...", file = target)
+        if target: target.emit((MESSAGE, "Applico l'algoritmo Forward Checking..."))
 
         variable = node.get_last_assigned_variable()
         # verifico vincoli unari
-        if not constraints.verify({variable.name: variable.value}):
+        if not constraints.check_unary(variable.index, variable.value):
             return False
         
-        for variable_not_assigned in [v for v in node.get_variables() if not v.value]:
-            for value in variable_not_assigned.domain[:]:
-                if not constraints.verify({variable.name: variable.value, variable_not_assigned.name: value}):
-                    variable_not_assigned.delete_value(value)
+        # solo le variabili non assegnate vincolate con quella appena assegnata possono perdere valori
+        variables = node.get_variables()
+        for index in constraints.neighbours(variable.index):
+            variable_not_assigned = variables[index]
+            if variable_not_assigned.value is not None:
+                continue
+
+            for value in constraints.unsupported_values(variable.index, variable.value, variable_not_assigned):
+                variable_not_assigned.delete_value(value)
 
-                    if target:
-                        data = {"not_assigned": variable_not_assigned.name, "not_assigned_value": value,
-                                "variable": variable.name, "value": variable.value, "not_assigned_domain": variable_not_assigned.domain}
-                        print(str_value_not_compatible.format(**data), file = target)
+                if target: target.emit((PRUNE, variable_not_assigned.name, value, variable.name, variable.value, variable_not_assigned.domain))
             
             if not variable_not_assigned.domain:
+                constraints.record_failure(variable.index, index)
+                return False
+
+        # elimino il valore assegnato dalle variabili dei vincoli globali
+        for constraint in constraints.get_globals(variable.index):
+            if not constraint.forward(variables, variable.index, target):
+                constraints.record_global_failure(constraint)
                 return False
 
         return True
 
     @staticmethod
-    def PartialLookAhead(node: Node, constraints: Constraints, tree_depth: int, target: Optional[TextIO]) -> bool:
+    def PartialLookAhead(node: Node, constraints: Constraints, tree_depth: int, target: Optional[TraceSink]) -> bool:
         """
         Applico il forward checking, successivamente per ogni variabile non assegnata
         elimino i valori che non sono compatibili con nessuno dei valori
@@ -121,33 +153,39 @@ class Algorithm:
         if not Algorithm.ForwardChecking(node, constraints, tree_depth, target):
             return False
             
-        if target: print("Applico l'algoritmo Partial Look Ahead...", file = target)
-
-        for index, variable_not_assigned in enumerate([v for v in node.get_variables() if not v.value]):
-            for value in variable_not_assigned.domain[:]:
+        if target: target.emit((MESSAGE, "Applico l'algoritmo Partial Look Ahead..."))
 
-                for next_variable_not_assigned in [v for v in node.get_variables() if not v.value][index + 1:]:
-                    delete_value = True
+        variables = node.get_variables()
+        for variable_not_assigned in variables:
+            if variable_not_assigned.value is not None:
+                continue
 
-                    for next_value in next_variable_not_assigned.domain:
-                        if constraints.verify({variable_not_assigned.name: value, next_variable_not_assigned.name: next_value}):
-                            delete_value = False
+            # variabili non assegnate successive vincolate con variable_not_assigned
+            next_variables = [variables[index] for index in constraints.neighbours(variable_not_assigned.index)
+                              if index > variable_not_assigned.index and variables[index].value is None]
 
-                    if delete_value:
+            # variabile senza supporto per l'ultimo valore eliminato
+            culprit = None
+            for value in variable_not_assigned.domain[:]:
+                for next_variable_not_assigned in next_variables:
+                    if not constraints.has_support(variable_not_assigned.index, value, next_variable_not_assigned):
                         variable_not_assigned.delete_value(value)
+                        culprit = next_variable_not_assigned
 
-                        if target:
-                            data = {"not_assigned": variable_not_assigned.name, "not_assigned_value": value,
-                                    "variable": next_variable_not_assigned.name, "not_assigned_domain": variable_not_assigned.domain}
-                            print(str_var_not_compatible.format(**data), file = target)
+                        if target: target.emit((PRUNE, variable_not_assigned.name, value, next_variable_not_assigned.name, None, variable_not_assigned.domain))
+                        break
 
-                    if not variable_not_assigned.domain:
-                        return False
+            if not variable_not_assigned.domain:
+                # l'ultimo valore è stato eliminato dal vincolo con culprit
+                # (nessun colpevole se il dominio era già vuoto)
+                if culprit is not None:
+                    constraints.record_failure(variable_not_assigned.index, culprit.index)
+                return False
 
         return True
         
     @staticmethod
-    def FullLookAhead(node: Node, constraints: Constraints, tree_depth: int, target: Optional[TextIO]) -> bool:
+    def FullLookAhead(node: Node, constraints: Constraints, tree_depth: int, target: Optional[TraceSink]) -> bool:
         """
         Applico il forward checking, successivamente per ogni variabile non assegnata
         elimino i valori che non sono compatibili
@@ -160,166 +198,277 @@ class Algorithm:
         if not Algorithm.ForwardChecking(node, constraints, tree_depth, target):
             return False
         
-        if target: print("Applico l'algoritmo Full Look Ahead...", file = target)
-
-        for variable_not_assigned in [v for v in node.get_variables() if not v.value]:
-            for value in variable_not_assigned.domain[:]:
+        if target: target.emit((MESSAGE, "Applico l'algoritmo Full Look Ahead..."))
 
-                for next_variable_not_assigned in [v for v in node.get_variables() if not v.value and v.name != variable_not_assigned.name]:
-                    delete_value = True
+        variables = node.get_variables()
+        for variable_not_assigned in variables:
+            if variable_not_assigned.value is not None:
+                continue
 
-                    for next_value in next_variable_not_assigned.domain:
-                        if constraints.verify({variable_not_assigned.name: value, next_variable_not_assigned.name: next_value}):
-                            delete_value = False
+            # altre variabili non assegnate vincolate con variable_not_assigned
+            other_variables = [variables[index] for index in constraints.neighbours(variable_not_assigned.index)
+                               if variables[index].value is None]
 
-                    if delete_value:
+            # variabile senza supporto per l'ultimo valore eliminato
+            culprit = None
+            for value in variable_not_assigned.domain[:]:
+                for next_variable_not_assigned in other_variables:
+                    if not constraints.has_support(variable_not_assigned.index, value, next_variable_not_assigned):
                         variable_not_assigned.delete_value(value)
+                        culprit = next_variable_not_assigned
 
-                        if target:
-                            data = {"not_assigned": variable_not_assigned.name, "not_assigned_value": value,
-                                    "variable": next_variable_not_assigned.name, "not_assigned_domain": variable_not_assigned.domain}
-                            print(str_var_not_compatible.format(**data), file = target)
+                        if target: target.emit((PRUNE, variable_not_assigned.name, value, next_variable_not_assigned.name, None, variable_not_assigned.domain))
+                        break
 
-                    if not variable_not_assigned.domain:
-                        return False
+            if not variable_not_assigned.domain:
+                # l'ultimo valore è stato eliminato dal vincolo con culprit
+                # (nessun colpevole se il dominio era già vuoto)
+                if culprit is not None:
+                    constraints.record_failure(variable_not_assigned.index, culprit.index)
+                return False
 
         return True
 
     @staticmethod
-    def AC3(node: Node, constraints: Constraints, tree_depth: int, target: Optional[TextIO]):
+    def AC3(node: Node, constraints: Constraints, tree_depth: int, target: Optional[TraceSink]):
         """
         Verifico i vincoli ed elimino dai domini delle variabili i valori non compatibili,
         fino a che non ci sono più domini che cambiano.
+        Se il nodo era arc-consistente prima dell'ultimo assegnamento
+        vengono verificati solo gli archi verso la variabile appena assegnata.
         Se rimangono domini vuoti la funzione restituisce False
         """
-        
-        # metodo privato
-        def verify_arc_consistency(variable_1: Variable, variable_2: Variable, constraints: Constraints, target: Optional[TextIO]):
-            changed = False
-
-            # Ciclo sul dominio di variable_1
-            for value_1 in variable_1.domain[:]:
-                delete_value = True
-
-                # variable_2 non è assegnata
-                if not variable_2.value:
-                    # Cerco un valore di variable_2 che soddisfi il vincolo se variable_1 = value_1
-                    for value_2 in variable_2.domain:
-                        if constraints.verify({variable_1.name: value_1, variable_2.name: value_2}):
-                            delete_value = False
-                            break
-                
-                # variable_2 è assegnata: verifico che variable_1 = value_1 soddisfi il vincolo con la variabile già assegnata
-                elif constraints.verify({variable_1.name: value_1, variable_2.name: variable_2.value}):
-                    delete_value = False
-
-                # variable_1 = value_1 non soddisfa alcun vincolo con variable_2
-                if delete_value:
-                    changed = True
-                    variable_1.delete_value(value_1)
-
-                    if target:
-                        data = {"var1": variable_1.name, "value1": value_1, "var2": variable_2.name, "domain1": variable_1.domain}
-                        s = "{var1} = {value1} non e' compatibile con i valori di {var2} -> Nuovo dominio di {var1}: {domain1}"
-                        print(s.format(**data), file=target)
-                
-            return changed
-        # fine definizione verify_arc_consistency
-        
-        # applico la node consistenza solo se il nodo che sto considerando non è node-consistente
-        if not node.is_node_consistent():
-            if not node_consistency(node, constraints, tree_depth, target):
-                return False
+
+        if not _check_last_assignment(node, constraints, tree_depth, target):
+            return False
+
+        if target: target.emit((MESSAGE, "Applico AC3..."))
+
+        if not _propagate(node, constraints, _revise, target):
+            return False
+
+        if target: target.emit((MESSAGE, "I vincoli sono arc-consistenti."))
+
+        return True
+
+    @staticmethod
+    def AC2001(node: Node, constraints: Constraints, tree_depth: int, target: Optional[TraceSink]):
+        """
+        Come AC3, ma per ogni arco e ogni valore viene ricordato l'ultimo supporto trovato (residuo):
+        il dominio della variabile vincolata viene riscandito solo se il supporto è stato eliminato.
+        I residui non vanno ripristinati quando si torna indietro, poichè vengono sempre
+        riverificati prima di essere utilizzati (AC-2001/AC3.1 con supporti residui).
+        Se rimangono domini vuoti la funzione restituisce False
+        """
+
+        if not _check_last_assignment(node, constraints, tree_depth, target):
+            return False
+
+        if target: target.emit((MESSAGE, "Applico AC2001..."))
+
+        if not _propagate(node, constraints, _revise_residual, target):
+            return False
+
+        if target: target.emit((MESSAGE, "I vincoli sono arc-consistenti."))
+
+        return True
+
+# applica la node-consistenza (se il nodo non lo è già) e verifica i vincoli unari dell'ultima variabile assegnata
+def _check_last_assignment(node: Node, constraints: Constraints, tree_depth: int, target: Optional[TraceSink]) -> bool:
+    if not node.is_node_consistent():
+        if not node_consistency(node, constraints, tree_depth, target):
+            return False
+
+    # anche se la node-consistenza ha appena eliminato il valore assegnato
+    # dal dominio, la variabile resta assegnata: verifico i vincoli unari
+    variable = node.get_last_assigned_variable()
+    if variable.name and not constraints.check_unary(variable.index, variable.value):
+        return False
+
+    return True
+
+# elimina dal dominio di variable_1 i valori senza supporto in variable_2,
+# restituisce True se il dominio di variable_1 è cambiato
+def _revise(variable_1: Variable, variable_2: Variable, constraints: Constraints, target: Optional[TraceSink]) -> bool:
+    changed = False
+
+    # Ciclo sul dominio di variable_1
+    for value_1 in variable_1.domain[:]:
+        # variable_2 non è assegnata: cerco un valore di variable_2 che soddisfi il vincolo se variable_1 = value_1
+        if variable_2.value is None:
+            delete_value = not constraints.has_support(variable_1.index, value_1, variable_2)
+
+        # variable_2 è assegnata: verifico che variable_1 = value_1 soddisfi il vincolo con la variabile già assegnata
+        else:
+            delete_value = not constraints.check(variable_1.index, value_1, variable_2.index, variable_2.value)
+
+        # variable_1 = value_1 non soddisfa alcun vincolo con variable_2
+        if delete_value:
+            changed = True
+            variable_1.delete_value(value_1)
+
+            if target: target.emit((PRUNE, variable_1.name, value_1, variable_2.name, None, variable_1.domain))
+
+    return changed
+
+# come _revise, ma riutilizza i supporti residui salvati in constraints
+def _revise_residual(variable_1: Variable, variable_2: Variable, constraints: Constraints, target: Optional[TraceSink]) -> bool:
+    if variable_2.value is not None:
+        return _revise(variable_1, variable_2, constraints, target)
+
+    index_1 = variable_1.index
+    index_2 = variable_2.index
+    domain_2 = variable_2.domain
+    residues = constraints.get_residues(index_1, index_2)
+    reverse_residues = constraints.get_residues(index_2, index_1)
+    changed = False
+
+    for value_1 in variable_1.domain[:]:
+        # il supporto residuo è ancora nel dominio: niente da verificare
+        residue = residues.get(value_1, _NO_RESIDUE)
+        if residue is not _NO_RESIDUE and residue in domain_2:
+            continue
+
+        for value_2 in domain_2:
+            if constraints.check(index_1, value_1, index_2, value_2):
+                # il supporto vale in entrambi i versi
+                residues[value_1] = value_2
+                reverse_residues[value_2] = value_1
+                break
+        else:
+            changed = True
+            variable_1.delete_value(value_1)
+
+            if target: target.emit((PRUNE, variable_1.name, value_1, variable_2.name, None, variable_1.domain))
+
+    return changed
+
+# rende arc-consistenti i vincoli binari (con la funzione revise) e i vincoli globali del nodo,
+# alternandoli finché nessun dominio cambia, restituisce False se un dominio diventa vuoto
+def _propagate(node: Node, constraints: Constraints, revise: Callable, target: Optional[TraceSink]) -> bool:
+    variables = node.get_variables()
+    variable = node.get_last_assigned_variable()
+
+    # il nodo era arc-consistente prima dell'assegnamento: solo i vincoli sulla variabile assegnata,
+    # altrimenti tutti i vincoli del problema (changed None)
+    changed = {variable.index} if variable.name and node.was_arc_consistent() else None
+
+    while True:
+        modified = set()  # type: Set[int]
+        if not _propagate_arcs(node, constraints, revise, target, changed, modified):
+            return False
+
+        if not constraints.get_globals():
+            break
+
+        if changed is None:
+            pending = constraints.get_globals()
         else:
-            # verifico se l'assegnamento effettuato è compatibile con i vincoli unari
-            variable = node.get_last_assigned_variable()
-            # verifico vincoli unari
-            if not constraints.verify({variable.name: variable.value}):
+            # vincoli globali sulle variabili modificate, ognuno una sola volta
+            modified |= changed
+            pending = []
+            for index in sorted(modified):
+                for constraint in constraints.get_globals(index):
+                    if constraint not in pending:
+                        pending.append(constraint)
+
+        changed = set()
+        for constraint in pending:
+            if not constraint.propagate(variables, changed, target):
+                constraints.record_global_failure(constraint)
                 return False
-        
-        if target: print("Applico AC3...", file = target)
-        
 
-        # Aggiungo tutti i vincoli del problema
-        worklist = []
-        for index, v1 in enumerate(node.get_variables()):
-            for v2 in node.get_variables()[index + 1:]:
-                c1, c2 = constraints.get_binary_constraints(v1.name, v2.name)
-                if c1 or c2:
-                    worklist.append([v1.name, v2.name])
-
-        # Ciclo sui vincoli
-        while worklist:
-            couple = worklist.pop(0)
-
-            variable_1 = node.get_variable_by_name(couple[0])
-            variable_2 = node.get_variable_by_name(couple[1])
-
-            variable_1_changed = False
-            variable_2_changed = False
-
-            # Entrambe le variabili non assegnate
-            if not variable_1.value and not variable_2.value:
-                variable_1_changed = verify_arc_consistency(variable_1, variable_2, constraints, target)
-                
-                variable_2_changed = verify_arc_consistency(variable_2, variable_1, constraints, target)
-
-            # variable_1 assegnata, variable_2 non assegnata
-            elif variable_1.value and not variable_2.value:
-                variable_2_changed = verify_arc_consistency(variable_2, variable_1, constraints, target)
-            
-            # variable_1 non assegnata, variable_2 assegnata
-            elif not variable_1.value and variable_2.value:
-                variable_1_changed = verify_arc_consistency(variable_1, variable_2, constraints, target)
-            
-            # Se entrambe sono assegnate, non fa nulla
+        # i vincoli globali non hanno modificato nulla: tutti i vincoli sono consistenti
+        if not changed:
+            break
 
-            if variable_1_changed:
-                if not variable_1.domain:
-                    return False
-                    
-                for v in [v for v in node.get_variables() if v.name != variable_2.name and v.name != variable_1.name]:
-                    c1, c2 = constraints.get_binary_constraints(variable_1.name, v.name)
-                    if c1 or c2:
-                        worklist.append([variable_1.name, v.name])
+    node.set_arc_consistent()
 
-            if variable_2_changed:
-                if not variable_2.domain:
-                    return False
-                
-                for v in [v for v in node.get_variables() if v.name != variable_2.name and v.name != variable_1.name]:
-                    c1, c2 = constraints.get_binary_constraints(variable_2.name, v.name)
-                    if c1 or c2:
-                        worklist.append([variable_2.name, v.name])
+    return True
 
-        if target: print("I vincoli sono arc-consistenti.", file = target)
+# rende arc-consistenti gli archi (variable_1 -> variable_2) del nodo utilizzando la funzione revise,
+# a partire dagli archi verso le variabili in changed (tutti gli archi se changed è None),
+# aggiunge a modified gli indici delle variabili modificate, restituisce False se un dominio diventa vuoto
+def _propagate_arcs(node: Node, constraints: Constraints, revise: Callable, target: Optional[TraceSink],
+                    changed: Optional[Set[int]], modified: Set[int]) -> bool:
+    variables = node.get_variables()
+    n_variables = len(variables)
+
+    # coda FIFO degli archi da verificare, l'arco index_1 -> index_2 è codificato come index_1 * n_variables + index_2,
+    # un arco già in coda non viene aggiunto di nuovo
+    worklist = deque()  # type: deque[int]
+    queued = set()
+
+    if changed is not None:
+        # solo gli archi verso le variabili modificate
+        for index_2 in sorted(changed):
+            for index in constraints.neighbours(index_2):
+                arc = index * n_variables + index_2
+                if arc not in queued:
+                    worklist.append(arc)
+                    queued.add(arc)
+    else:
+        # tutti gli archi del problema
+        for index_1 in range(n_variables):
+            for index_2 in constraints.neighbours(index_1):
+                if index_2 > index_1:
+                    arc = index_1 * n_variables + index_2
+                    worklist.append(arc)
+                    queued.add(arc)
+                    arc = index_2 * n_variables + index_1
+                    worklist.append(arc)
+                    queued.add(arc)
+
+    # Ciclo sugli archi
+    while worklist:
+        arc = worklist.popleft()
+        queued.discard(arc)
+
+        index_1, index_2 = divmod(arc, n_variables)
+        variable_1 = variables[index_1]
+
+        # i domini delle variabili assegnate non vengono modificati
+        if variable_1.value is not None:
+            continue
+
+        if revise(variable_1, variables[index_2], constraints, target):
+            if not variable_1.domain:
+                constraints.record_failure(index_1, index_2)
+                return False
+            modified.add(index_1)
 
-        return True
+            # il dominio di variable_1 è cambiato: vanno riverificati gli archi verso variable_1
+            for index in constraints.neighbours(index_1):
+                if index != index_2:
+                    arc = index * n_variables + index_1
+                    if arc not in queued:
+                        worklist.append(arc)
+                        queued.add(arc)
+
+    return True
 
 # applica node-consistenza, inserito insieme agli algoritmi poichè utilizzato da uno di essi e perchè l'interfaccia è la stessa
-def node_consistency(node: Node, constraints: Constraints, tree_depth: int, target: Optional[TextIO]) -> bool:
+def node_consistency(node: Node, constraints: Constraints, tree_depth: int, target: Optional[TraceSink]) -> bool:
     """
     Elimino dai domini delle variabili i valori
     che non verificano i vincoli unari per tale variabile.
     """
 
-    if target: print("Applico node-consistency...", file = target)
+    if target: target.emit((MESSAGE, "Applico node-consistency..."))
 
     for variable in node.get_variables():
         for value in variable.domain[:]:
-            if not constraints.verify({variable.name: value}):
+            if not constraints.check_unary(variable.index, value):
                 variable.delete_value(value)
 
-                if target:
-                    data = {"variable": variable.name, "value": value, "domain": variable.domain}
-                    s = "{variable} = {value} non e' compatibile con i vincoli unari -> Nuovo dominio di {variable}: {domain}"
-                    print(s.format(**data), file = target)
+                if target: target.emit((PRUNE, variable.name, value, None, None, variable.domain))
 
                 if not variable.domain:
                     return False
 
     node.set_node_consistent()
 
-    if target: print("Le variabili sono node-consistenti.", file = target)
+    if target: target.emit((MESSAGE, "Le variabili sono node-consistenti."))
 
     return True
+
@@ -1,18 +1,274 @@
-from typing import Union, Callable, Dict, Tuple, List, Any, NewType
+from typing import Callable, Dict, Tuple, List, Any, NewType, Optional
+from .matrix import CompatibilityMatrices
+from .global_constraints import Predicate, Table
+from .ordering import ConflictWeights
+
+# nessun vincolo tra due variabili
+_NO_ARC = None
 
 class Constraints:
 
     def __init__(self):
         self._constraints = {}
+        # vincoli globali (es. cspsolver.global_constraints.AllDifferent)
+        self._globals = []
+
+        # indice compilato, vedi compile()
+        self._compiled = False
+        self._indices = {}
+        self._unary = []
+        self._arcs = []
+        self._neighbours = []
+        self._variable_globals = []
+        self._degrees = []
+        self._degree_order = []
+        self._residues = {}
+        self._matrices = None
+        # stato delle politiche adattive, vedi get_conflicts()
+        self._conflicts = None
+        # indici delle variabili dell'ultimo vincolo fallito, vedi pop_failure()
+        self._failure = None
+
+    # aggiungi un vincolo unario, binario o n-ario (vedi cspsolver.global_constraints.Predicate)
+    def add_constraint(self, variables: Tuple[str, ...], constraint: Callable):
+        if len(variables) > 2:
+            self.add_global(Predicate(variables, constraint))
+            return
 
-    # aggiungi un vincolo unario o binario
-    def add_constraint(self, variables: Union[Tuple[str], Tuple[str, str]], constraint: Callable):
         if not variables in self._constraints.keys():
             self._constraints[variables] = []
 
         self._constraints[variables].append(constraint)
+        self._compiled = False
+
+    # aggiungi un vincolo globale su un numero qualsiasi di variabili
+    def add_global(self, constraint):
+        self._globals.append(constraint)
+        self._compiled = False
+
+    # aggiungi un vincolo in estensione (vedi cspsolver.global_constraints.Table)
+    def add_table(self, variables: Tuple[str, ...], tuples: List[Tuple]):
+        self.add_global(Table(variables, tuples))
+
+    def compile(self, variables: List) -> None:
+        """
+        Compila i vincoli in un indice che viene utilizzato durante la risoluzione.
+        Ad ogni variabile viene assegnato un indice intero (variable.index)
+        e per ogni coppia di variabili vincolate vengono salvati i vincoli in entrambi i versi,
+        in questo modo check() e check_unary() non allocano nulla ad ogni chiamata.
+        La compilazione viene rifatta solo se sono stati aggiunti vincoli o variabili.
+
+        Parametri
+        -------
+        variables : List[cspsolver.variable.Variable]
+            le variabili del problema, nell'ordine di inserimento
+        """
+        if self._compiled and len(variables) == len(self._indices):
+            return
+
+        self._indices = {}
+        for index, variable in enumerate(variables):
+            variable.index = index
+            self._indices[variable.name] = index
+
+        n_variables = len(variables)
+        self._unary = [[] for _ in range(n_variables)]
+        self._arcs = [{} for _ in range(n_variables)]
+
+        for names, constraints in self._constraints.items():
+            if len(names) == 1:
+                self._unary[self._indices[names[0]]].extend(constraints)
+
+            elif len(names) == 2:
+                index_1 = self._indices[names[0]]
+                index_2 = self._indices[names[1]]
+
+                # arco index_1 -> index_2: (vincoli f(v1, v2), vincoli f(v2, v1))
+                if index_2 not in self._arcs[index_1]:
+                    arc = ([], [])  # type: Tuple[List[Callable], List[Callable]]
+                    self._arcs[index_1][index_2] = arc
+                    self._arcs[index_2][index_1] = (arc[1], arc[0])
+
+                self._arcs[index_1][index_2][0].extend(constraints)
+
+        self._neighbours = [sorted(arcs.keys()) for arcs in self._arcs]
+
+        self._variable_globals = [[] for _ in range(n_variables)]
+        for constraint in self._globals:
+            constraint.compile(self._indices)
+            for index in constraint.indices:
+                self._variable_globals[index].append(constraint)
+
+        # numero di vincoli su ogni variabile (lo stesso di get_variable_constraints)
+        self._degrees = [len(self._variable_globals[index]) for index in range(n_variables)]
+        for names, constraints in self._constraints.items():
+            for index in set(self._indices[name] for name in names):
+                self._degrees[index] += len(constraints)
+        self._degree_order = sorted(range(n_variables), key=lambda index: -self._degrees[index])
+
+        self._residues = {}
+        self._conflicts = None
+        self._matrices = None
+        self._compiled = True
+
+    def precompile(self, variables: List, vectorize: bool = True) -> None:
+        """
+        Calcola le matrici di compatibilità dei vincoli binari sui domini attuali delle variabili
+        (vedi cspsolver.matrix.CompatibilityMatrices), da questo momento
+        check(), has_support() e unsupported_values() utilizzano le matrici
+        invece di chiamare i vincoli. Richiede numpy.
+        Le matrici vengono scartate se i vincoli vengono ricompilati.
+
+        Parametri
+        -------
+        variables : List[cspsolver.variable.Variable]
+            le variabili del problema, nell'ordine di inserimento
+        vectorize : bool = True
+            vedi cspsolver.matrix.CompatibilityMatrices
+
+        Errors
+        ------
+        ImportError
+            se numpy non è installato
+        """
+        self.compile(variables)
+        if self._matrices is not None:
+            return
+
+        self._matrices = CompatibilityMatrices(self, variables, vectorize)
+
+    def get_matrices(self) -> Optional[CompatibilityMatrices]:
+        return self._matrices
+
+    def is_compiled(self) -> bool:
+        return self._compiled
+
+    # restituisce l'indice della variabile con il nome passato come parametro
+    def get_index(self, variable_name: str) -> int:
+        return self._indices[variable_name]
+
+    # verifica se variable_1 = value_1 e variable_2 = value_2 soddisfano i vincoli binari tra le due variabili
+    def check(self, index_1: int, value_1: Any, index_2: int, value_2: Any) -> bool:
+        if self._matrices is not None:
+            return self._matrices.check(index_1, value_1, index_2, value_2)
+
+        arc = self._arcs[index_1].get(index_2, _NO_ARC)
+        if arc is _NO_ARC:
+            return True
+
+        for constraint in arc[0]:
+            if not constraint(value_1, value_2):
+                return False
 
-    # verifica se i valori delle variabili soddisfano i vincoli
+        for constraint in arc[1]:
+            if not constraint(value_2, value_1):
+                return False
+
+        return True
+
+    # verifica se variable = value soddisfa i vincoli unari della variabile
+    def check_unary(self, index: int, value: Any) -> bool:
+        for constraint in self._unary[index]:
+            if not constraint(value):
+                return False
+
+        return True
+
+    # True se esiste almeno un valore nel dominio di variable_2 compatibile con variable_1 = value_1
+    def has_support(self, index_1: int, value_1: Any, variable_2) -> bool:
+        if self._matrices is not None:
+            return self._matrices.has_support(index_1, value_1, variable_2)
+
+        index_2 = variable_2.index
+        for value_2 in variable_2.domain:
+            if self.check(index_1, value_1, index_2, value_2):
+                return True
+
+        return False
+
+    # restituisce i valori del dominio di variable_2 non compatibili con variable_1 = value_1
+    def unsupported_values(self, index_1: int, value_1: Any, variable_2) -> List:
+        if self._matrices is not None:
+            return self._matrices.unsupported_values(index_1, value_1, variable_2)
+
+        index_2 = variable_2.index
+        return [value_2 for value_2 in variable_2.domain if not self.check(index_1, value_1, index_2, value_2)]
+
+    # restituisce i vincoli tra le due variabili: (vincoli f(v1, v2), vincoli f(v2, v1))
+    def get_arc(self, index_1: int, index_2: int) -> Tuple[List[Callable], List[Callable]]:
+        return self._arcs[index_1].get(index_2, ([], []))
+
+    # restituisce gli indici (ordinati) delle variabili con almeno un vincolo binario con la variabile passata come parametro
+    def neighbours(self, index: int) -> List[int]:
+        return self._neighbours[index]
+
+    # restituisce l'ultimo supporto trovato per ogni valore di variable_1 nel dominio di variable_2,
+    # come dizionario {valore di variable_1: valore di variable_2}, vedi Algorithm.AC2001
+    def get_residues(self, index_1: int, index_2: int) -> Dict[Any, Any]:
+        key = index_1 * len(self._arcs) + index_2
+        residues = self._residues.get(key)
+        if residues is None:
+            residues = {}
+            self._residues[key] = residues
+        return residues
+
+    # restituisce i vincoli globali sulla variabile con l'indice passato come parametro,
+    # o tutti i vincoli globali se index è None
+    def get_globals(self, index: Optional[int] = None) -> List:
+        if index is None:
+            return self._globals
+        return self._variable_globals[index]
+
+    # restituisce il numero di vincoli (unari, binari e globali) sulla variabile con l'indice passato come parametro
+    def get_degree(self, index: int) -> int:
+        return self._degrees[index]
+
+    # restituisce gli indici delle variabili in ordine di numero di vincoli decrescente
+    # (a parità di vincoli nell'ordine di inserimento)
+    def get_degree_order(self) -> List[int]:
+        return self._degree_order
+
+    # restituisce i pesi dei conflitti utilizzati dalle politiche adattive,
+    # creati alla prima richiesta e mantenuti fino a reset_conflicts()
+    def get_conflicts(self) -> ConflictWeights:
+        if self._conflicts is None:
+            self._conflicts = ConflictWeights(self, len(self._indices))
+        return self._conflicts
+
+    # scarta i pesi dei conflitti, chiamato all'inizio di ogni ricerca
+    def reset_conflicts(self):
+        self._conflicts = None
+
+    # True se una politica richiede l'attività delle variabili, vedi cspsolver.Policy.ActivityBased
+    def tracks_activity(self) -> bool:
+        return self._conflicts is not None and self._conflicts.tracks_activity
+
+    # il vincolo binario tra le due variabili ha svuotato un dominio (o non è verificato),
+    # il peso del vincolo viene aggiornato solo se una politica adattiva utilizza i pesi
+    def record_failure(self, index_1: int, index_2: int):
+        self._failure = (index_1, index_2)
+        if self._conflicts is not None:
+            self._conflicts.arc_failure(index_1, index_2)
+
+    # come record_failure, per un vincolo globale
+    def record_global_failure(self, constraint):
+        self._failure = constraint.indices
+        if self._conflicts is not None:
+            self._conflicts.global_failure(constraint)
+
+    # restituisce (e dimentica) gli indici delle variabili dell'ultimo vincolo che ha causato un fallimento,
+    # None se l'ultimo fallimento non è stato causato da un vincolo binario o globale (es. vincoli unari)
+    def pop_failure(self) -> Optional[Tuple[int, ...]]:
+        failure = self._failure
+        self._failure = None
+        return failure
+
+    # True se esiste almeno un vincolo binario tra le due variabili
+    def are_neighbours(self, index_1: int, index_2: int) -> bool:
+        return index_2 in self._arcs[index_1]
+
+    # verifica se i valori delle variabili soddisfano i vincoli:
+    # i vincoli unari (una variabile), binari (due variabili) e globali sulle variabili passate
     def verify(self, values: Dict[str, Any]):
         n_keys = len(values.keys())
 
@@ -35,7 +291,12 @@ class Constraints:
             for constraint in constraints_2:
                 if not constraint(values[name_2], values[name_1]):
                     return False
-        
+
+        names = set(values.keys())
+        for constraint in self._globals:
+            if set(constraint.names) == names and not constraint.verify(values):
+                return False
+
         return True
     
     # restituisce i vincoli unari della variabili passatata come parametro
@@ -56,7 +317,8 @@ class Constraints:
         
         return (constraints_12, constraints_21)
 
-    # restituisce tutti i vincoli unari e binari che includono la variabile passata come parametro
+    # restituisce tutti i vincoli unari, binari e globali che includono la variabile passata come parametro
     def get_variable_constraints(self, variable_name):
         constraints_list = [item[1] for item in list(self._constraints.items()) if variable_name in item[0]]
+        constraints_list.append([constraint for constraint in self._globals if variable_name in constraint.names])
         return [constraint for constraints in constraints_list for constraint in constraints]
\ No newline at end of file
@@ -1,11 +1,29 @@
-from typing import Callable, Dict, Tuple, List, TextIO, Union, Any, Optional
+from typing import Callable, Dict, Tuple, List, TextIO, Union, Any, Optional, Iterator, Iterable
 import sys
 from copy import deepcopy
 from .node import Node
+from .search import Search, Status
+from .local_search import LocalSearch
+from .trace import TraceSink, as_sink, solution_to_str, MESSAGE
+from .statistics import Statistics
+from .nogoods import NogoodStore
+from .parallel import solve_parallel
+from .structure import solve_components, solve_tree, solve_structured
+from . import optimize
 from .constraints import Constraints
 from .variable import Variable
+from .domain import BitsetDomain, ValueTable
+from .global_constraints import AllDifferent
 from .algorithm import Algorithm, node_consistency
 from .policy import Policy
+from .value_order import ValueOrder
+
+# modalità di registrazione dell'albero di decisione
+RECORD_TREE_MODES = ("off", "failures", "full")
+
+# algoritmi che verificano solo i vincoli: con questi solve può sfruttare la struttura del problema
+STRUCTURE_ALGORITHMS = (Algorithm.GenerateAndTest, Algorithm.StandardBacktracking, Algorithm.ForwardChecking,
+                        Algorithm.PartialLookAhead, Algorithm.FullLookAhead, Algorithm.AC3, Algorithm.AC2001)
 
 class CSPSolver:
     """
@@ -29,7 +47,7 @@ class CSPSolver:
 
     Parametri
     -------
-    algorithm : Callable[[Node, Constraints, int, str, Optional[TextIO]], bool] = StandardBacktracking
+    algorithm : Callable[[Node, Constraints, int, Optional[TraceSink]], bool] = StandardBacktracking
         Funzione che viene chiamata dopo ogni assegnazione.
         Per maggiori info vedi la classe cspsolver.Algorithm,
         nella classe cspsolver.Algorithm sono già implementati questi algoritmi:
@@ -39,6 +57,7 @@ class CSPSolver:
           - PartialLookAhead
           - FullLookAhead
           - AC3
+          - AC2001
     policy : Callable[[Node, Constraints, int], Variable] = InsertOrder
         Funzione chiamata prima dell'assegnazione di una variabile,
         serve a decidere quale variabile verrà assegnata.
@@ -47,17 +66,48 @@ class CSPSolver:
           - InsertOrder (default)
           - MinimumRemainingValues
           - MostConstrainedPrinciple
+          - MinimumRemainingValuesDegree
+          - DomainOverWeightedDegree
+          - ActivityBased
+    value_order : Callable[[Node, Constraints, Variable], List] = InsertOrder
+        Funzione chiamata dopo la politica, decide l'ordine in cui provare i valori della variabile.
+        Per maggiori info vedi la classe cspsolver.ValueOrder,
+        nella classe cspsolver.ValueOrder sono già implementati questi ordinamenti:
+          - InsertOrder (default)
+          - LeastConstrainingValue
+          - Random(seed)
+          - ByKey(key, reverse)
+    compact_domains : bool = False
+        se True i domini delle variabili sono rappresentati come maschere di bit
+        (cspsolver.domain.BitsetDomain) su una tabella di valori condivisa:
+        eliminazione, appartenenza, dimensione e copia di un dominio costano O(1).
+        I valori dei domini devono essere hashable.
+    precompile : bool = False
+        se True, prima della risoluzione ogni vincolo binario viene valutato una sola volta
+        su tutte le coppie di valori dei domini e salvato in una matrice di compatibilità
+        (cspsolver.matrix.CompatibilityMatrices), utilizzata poi al posto dei vincoli.
+        I vincoli devono essere funzioni pure. Richiede numpy.
+        Con domini non numerici le matrici vengono calcolate chiamando i vincoli su ogni coppia.
     """
     # init
-    def __init__(self, algorithm: Callable[[Node, Constraints, int, str, Optional[TextIO]], bool] = Algorithm.StandardBacktracking,
-                 policy: Callable[[Node, Constraints, int], Variable] = Policy.InsertOrder):
+    def __init__(self, algorithm: Callable[[Node, Constraints, int, Optional[TraceSink]], bool] = Algorithm.StandardBacktracking,
+                 policy: Callable[[Node, Constraints, int], Variable] = Policy.InsertOrder,
+                 compact_domains: bool = False, precompile: bool = False,
+                 value_order: Callable[[Node, Constraints, Variable], List] = ValueOrder.InsertOrder):
         self._constraints = Constraints()
         self._root = Node(None, [])
         self._solutions = []
         self._found_solution = False
         self._algorithm = algorithm
         self._policy = policy
+        self._value_order = value_order
         self._is_solved = False
+        self._search = None  # type: Union[None, Search, LocalSearch]
+        # esito dell'ultima risoluzione che non ha utilizzato la ricerca (vedi solve(decompose=...))
+        self._status = None  # type: Optional[str]
+        self._compact_domains = compact_domains
+        self._value_tables = {}  # type: Dict[Tuple, ValueTable]
+        self._precompile = precompile
 
     # Add a variable
     def add_variable(self, name: str, domain: List):
@@ -76,6 +126,10 @@ class CSPSolver:
         domain : List
             dominio della variabile da aggiungere.
         """
+        if self._compact_domains:
+            # il dominio compatto ha l'interfaccia di una lista
+            domain = BitsetDomain(ValueTable.intern(domain, self._value_tables))  # type: ignore
+
         new_variable = Variable(name, domain)
         self._root.add_variable(new_variable)
 
@@ -98,19 +152,25 @@ class CSPSolver:
         for name in names:
             self.add_variable(name, deepcopy(domain))
         
-    def add_constraint(self, variables: Union[Tuple[str], Tuple[str, str]], constraint: Callable):
+    def add_constraint(self, variables: Tuple[str, ...], constraint: Callable):
         """
         Aggiunge un vincolo tra le variabili fornite nella tupla.
+        I vincoli su più di due variabili sono vincoli globali
+        (cspsolver.global_constraints.Predicate): vengono verificati quando tutte le variabili
+        sono assegnate, oppure quando ne resta una sola da assegnare con ForwardChecking,
+        AC3 e AC2001 (per vincoli dati come elenco di tuple vedi add_table_constraint).
         
         Esempio
         -------
           # aggiungo un vincolo di diverso
           # tra le variabili "a" e "b"
           solver.add_constraint(("a", "b"), lambda a, b: a != b)
+          # aggiungo un vincolo tra tre variabili
+          solver.add_constraint(("a", "b", "c"), lambda a, b, c: a + b == c)
 
         Parametri
         -------
-        variables : Tuple[str] or Tuple[str, str]
+        variables : Tuple[str, ...]
             tupla che descrive su quali variabili è il vincolo.
         constraint : Callable[..., bool]
             funzione che descrive il vincolo tra le variabili
@@ -136,9 +196,83 @@ class CSPSolver:
             if not self._root.get_variable_by_name(v):
                 raise ValueError("The variable " + v + " is not a variable in this problem.")
         
-        self._constraints.add_constraint(variables, constraint)
+        self._constraints.add_constraint(tuple(variables), constraint)
+
+    def add_table_constraint(self, variables: Tuple[str, ...], tuples: List[Tuple]):
+        """
+        Aggiunge un vincolo in estensione tra le variabili fornite nella tupla:
+        i valori delle variabili devono essere una delle tuple ammesse
+        (cspsolver.global_constraints.Table, propagazione compact-table con maschere di bit).
+        Con ForwardChecking vengono eliminati i valori senza una tupla compatibile
+        con le variabili assegnate, con AC3 e AC2001 i valori senza una tupla compatibile
+        con i domini di tutte le variabili.
+
+        Esempio
+        -------
+          # combinazioni ammesse di (modello, colore, motore)
+          solver.add_table_constraint(("modello", "colore", "motore"),
+                                      [("base", "bianco", "benzina"), ("sport", "rosso", "benzina"), ("sport", "nero", "ibrido")])
+
+        Parametri
+        -------
+        variables : Tuple[str, ...]
+            tupla che descrive su quali variabili è il vincolo.
+        tuples : List[Tuple]
+            le tuple ammesse, i valori nello stesso ordine delle variabili
+
+        Errors
+        ------
+        ValueError
+            se una variabile non è una variabile del problema o una tupla non ha un valore per ogni variabile
+        """
+        for v in variables:
+            if not self._root.get_variable_by_name(v):
+                raise ValueError("The variable " + v + " is not a variable in this problem.")
+
+        tuples = [tuple(values) for values in tuples]
+        for values in tuples:
+            if len(values) != len(variables):
+                raise ValueError("The tuple " + str(values) + " must have a value for each of the " + str(len(variables)) + " variables.")
+
+        self._constraints.add_table(tuple(variables), tuples)
+
+    def add_all_different(self, variables: List[str]):
+        """
+        Aggiunge un vincolo globale di diverso tra tutte le variabili fornite
+        (cspsolver.global_constraints.AllDifferent), equivale a
+        aggiungere lambda x, y: x != y tra ogni coppia di variabili ma con un solo vincolo.
+        Con AC3 e AC2001 il vincolo elimina tutti i valori che non possono far parte
+        di un assegnamento con valori tutti diversi (es. tre variabili con dominio [1, 2]).
+
+        Esempio
+        -------
+          # le celle della prima riga del sudoku hanno valori tutti diversi
+          solver.add_all_different(["cell_11", "cell_12", "cell_13", ...])
+
+        Parametri
+        -------
+        variables : List[str]
+            i nomi delle variabili
+
+        Errors
+        ------
+        ValueError
+            se una variabile non è una variabile del problema o è ripetuta
+        """
+        for v in variables:
+            if not self._root.get_variable_by_name(v):
+                raise ValueError("The variable " + v + " is not a variable in this problem.")
+        if len(set(variables)) != len(variables):
+            raise ValueError("The variables of an all different constraint must be distinct.")
+
+        self._constraints.add_global(AllDifferent(tuple(variables)))
     
-    def solve(self, one_solution: bool = True, target: Optional[TextIO] = None) -> List[Node]:
+    def solve(self, one_solution: bool = True, target: Union[None, TextIO, TraceSink] = None, trail: bool = False,
+              record_tree: str = "full", statistics: bool = False,
+              callback: Optional[Callable[[Statistics], None]] = None,
+              backjumping: bool = False, nogoods: int = 0,
+              timeout: Optional[float] = None, max_nodes: Optional[int] = None, max_backtracks: Optional[int] = None,
+              restarts: Optional[Iterable[int]] = None, decompose: bool = False) -> List[Union[Node, Dict[str, Any]]]:
         """
         Risolvi il problema costituito dalle variabili e dai vincoli forniti.
         
@@ -152,27 +286,425 @@ class CSPSolver:
         -------
         one_solution : bool = True
             booleano che indica se fermarsi o no alla prima soluzione trovata.
-        target : TextIO = None
+        target : TextIO or cspsolver.trace.TraceSink = None
             indica dove stampare i passi svolti per la risoluzione del problema.
             se il target è None (default) non verrà stampato nulla.
             target può essere qualsiasi output su cui si può scrivere,
-            es. sys.stdout, oppure f = open("file.txt", "w+")
+            es. sys.stdout, oppure f = open("file.txt", "w+"),
+            oppure un cspsolver.trace.TraceSink che riceve gli eventi della risoluzione,
+            es. TextRenderer(sys.stdout, Verbosity.SEARCH) stampa solo assegnamenti, fallimenti e soluzioni,
+            JSONLinesWriter("trace.jsonl") li scrive su file in formato JSON
+        trail : bool = False
+            se True le variabili non vengono copiate ad ogni nodo:
+            i domini vivono in un unico nodo condiviso e le modifiche
+            vengono annullate tramite un trail (cspsolver.trail.Trail) quando si torna indietro.
+            L'albero di decisione contiene comunque una copia delle variabili per ogni nodo registrato.
+        record_tree : str = "full"
+            indica quali nodi dell'albero di decisione tenere in memoria:
+              - "full" (default): tutti i nodi, le soluzioni sono dei Node
+              - "failures": solo i rami che terminano con un fallimento,
+                le soluzioni sono dei dizionari {nome variabile: valore}
+              - "off": nessun nodo, le soluzioni sono dei dizionari {nome variabile: valore},
+                la memoria utilizzata non cresce con la dimensione della ricerca
+        statistics : bool = False
+            se True vengono raccolte le statistiche della ricerca (nodi, fallimenti,
+            backtrack, verifiche dei vincoli, valori eliminati e tempo di algoritmo e politica),
+            disponibili al termine in solver.stats (vedi cspsolver.statistics.Statistics).
+            Se False la raccolta non ha alcun costo.
+        callback : Callable[[Statistics], None] = None
+            funzione chiamata con le statistiche durante la ricerca
+            (ogni Statistics.CALLBACK_INTERVAL nodi, ad ogni soluzione e alla fine),
+            se indicata le statistiche vengono raccolte anche con statistics False
+        backjumping : bool = False
+            se True, quando i valori di una variabile sono esauriti la ricerca torna direttamente
+            all'ultima variabile assegnata responsabile dei fallimenti (conflict-directed backjumping),
+            saltando le variabili che non hanno nulla a che fare con il conflitto.
+            Disponibile solo con gli algoritmi StandardBacktracking e ForwardChecking
+        nogoods : int = 0
+            se maggiore di 0, numero massimo di nogood appresi durante la ricerca
+            (vedi cspsolver.nogoods.NogoodStore): quando un sottoalbero fallisce l'assegnamento
+            delle variabili responsabili viene ricordato e i rami che lo ripetono vengono scartati
+            subito. Quando sono troppi viene dimenticato quello utilizzato meno di recente.
+            I nogood vengono verificati solo quando una variabile viene assegnata: non eliminano
+            valori dai domini delle variabili non assegnate (nessuna propagazione), quindi un ramo
+            viene scartato solo quando l'assegnamento che completa il nogood viene provato.
+            Disponibile solo con gli algoritmi StandardBacktracking e ForwardChecking,
+            i valori dei domini devono essere hashable
+        timeout : float = None
+            se indicato, la ricerca si ferma dopo timeout secondi
+        max_nodes : int = None
+            se indicato, la ricerca si ferma dopo aver creato max_nodes nodi
+        max_backtracks : int = None
+            se indicato, la ricerca si ferma dopo max_backtracks backtrack.
+            Quando la ricerca viene fermata da un limite solver.status è Status.LIMIT_REACHED,
+            vengono restituite le soluzioni trovate fino a quel momento
+            e le statistiche raccolte sono disponibili in solver.stats
+        restarts : Iterable[int] = None
+            strategia di riavvio (vedi cspsolver.Restart, es. Restart.Luby(100)):
+            la ricerca riparte dalla radice quando il numero di fallimenti supera la soglia,
+            mantenendo i pesi delle politiche adattive e i nogood appresi.
+            Può essere anche una sequenza finita (es. [100, 200]): finite le soglie
+            la ricerca prosegue fino alla fine senza altri riavvii.
+            Utile con cspsolver.ValueOrder.Random e con le politiche adattive,
+            disponibile solo con one_solution True
+        decompose : bool = False
+            se True e record_tree è "off" viene sfruttata la struttura del grafo dei vincoli
+            (vedi cspsolver.structure.solve_structured): se è una foresta il problema viene risolto
+            senza backtracking (vedi solve_tree), se ha più componenti connesse ognuna viene
+            risolta separatamente (vedi solve_components), quindi un fallimento in una componente
+            non fa ripetere la ricerca nelle altre. Avviene solo se nessuna opzione dipende dalla ricerca
+            (target, statistiche, callback, limiti, riavvii, backjumping, nogood) e con gli algoritmi
+            di cspsolver.Algorithm. Le soluzioni sono le stesse, ma possono essere in un ordine diverso
+            (con one_solution True può essere restituita un'altra soluzione).
+            Sulle foreste l'algoritmo e la politica del solver non vengono utilizzati,
+            solo se l'ordinamento dei valori è ValueOrder.InsertOrder (altrimenti vengono solo
+            separate le componenti, risolte con l'algoritmo, la politica e l'ordinamento del solver).
+            Con False (predefinito) la ricerca è sempre quella dell'algoritmo e della politica del solver
 
         Return
         -------
-        List[Node]
+        List[Node] or List[Dict[str, Any]]
             Restituisce la lista delle soluzioni o
             una lista vuota se non ci sono soluzioni
+
+        Errors
+        ------
+        ValueError
+            se record_tree non è "off", "failures" o "full",
+            se backjumping è True o nogoods è maggiore di 0 con un algoritmo
+            diverso da StandardBacktracking e ForwardChecking,
+            o se restarts è indicato con one_solution False
         """
-        
+        if restarts is not None and not one_solution:
+            raise ValueError("restarts can only be used with one_solution=True.")
+
+        if not self._is_solved and decompose and self._uses_structure(record_tree, target, statistics, callback, backjumping,
+                                                                     nogoods, timeout, max_nodes, max_backtracks, restarts):
+            solutions = solve_structured(self, one_solution, trail)
+            if solutions is not None:
+                self._solutions = solutions
+                self._search = None
+                self._status = Status.COMPLETE
+                self._is_solved = True
+
         if not self._is_solved:
-            if target: print(str(self._root), file = target)
-            self._next_step(self._root, 0, one_solution, target)
-            self._is_solved = True
+            # una ricerca interrotta riparte da capo
+            self._solutions = []
+            search = self._new_search(one_solution, target, trail, record_tree, statistics, callback,
+                                      backjumping, nogoods, timeout, max_nodes, max_backtracks, restarts)
+            self._search = search
+            for solution in search.solutions():
+                self._solutions.append(solution)
+
+            self._is_solved = search.is_completed()
+
+        return self._solutions
+
+    def iter_solutions(self, target: Union[None, TextIO, TraceSink] = None, trail: bool = False,
+                       record_tree: str = "off", statistics: bool = False,
+                       callback: Optional[Callable[[Statistics], None]] = None,
+                       backjumping: bool = False, nogoods: int = 0,
+                       timeout: Optional[float] = None, max_nodes: Optional[int] = None,
+                       max_backtracks: Optional[int] = None) -> Iterator[Union[Node, Dict[str, Any]]]:
+        """
+        Come solve, ma restituisce un generatore: ogni soluzione viene restituita
+        appena trovata e la ricerca prosegue solo quando viene chiesta la soluzione successiva.
+        Le soluzioni non vengono salvate nel solver (print_solutions non le stampa),
+        quindi è possibile fermarsi dopo le prime k soluzioni o scriverle su file
+        senza tenerle tutte in memoria.
+        Ogni chiamata inizia una nuova ricerca.
+
+        Esempio
+        -------
+          # stampo le prime 10 soluzioni
+          for solution in itertools.islice(solver.iter_solutions(), 10):
+              print(solution)
+
+        Parametri
+        -------
+        target : TextIO = None
+            vedi solve
+        trail : bool = False
+            vedi solve
+        record_tree : str = "off"
+            vedi solve, di default l'albero di decisione non viene registrato
+            e le soluzioni sono dei dizionari {nome variabile: valore}
+        statistics : bool = False
+            vedi solve
+        callback : Callable[[Statistics], None] = None
+            vedi solve
+        backjumping : bool = False
+            vedi solve
+        nogoods : int = 0
+            vedi solve
+        timeout : float = None
+            vedi solve
+        max_nodes : int = None
+            vedi solve
+        max_backtracks : int = None
+            vedi solve
+
+        Return
+        -------
+        Iterator[Node] or Iterator[Dict[str, Any]]
+            le soluzioni del problema
+
+        Errors
+        ------
+        ValueError
+            se record_tree non è "off", "failures" o "full",
+            o se backjumping è True o nogoods è maggiore di 0 con un algoritmo
+            diverso da StandardBacktracking e ForwardChecking
+        """
+
+        search = self._new_search(False, target, trail, record_tree, statistics, callback, backjumping, nogoods,
+                                  timeout, max_nodes, max_backtracks)
+        self._search = search
+        return search.solutions()
+
+    def minimize(self, objective: Callable[[Dict[str, Any]], float], bound: Optional[Callable[[Node], float]] = None,
+                 target: Union[None, TextIO, TraceSink] = None, trail: bool = False, statistics: bool = False,
+                 callback: Optional[Callable[[Statistics], None]] = None, timeout: Optional[float] = None,
+                 max_nodes: Optional[int] = None, max_backtracks: Optional[int] = None) -> Iterator[Dict[str, Any]]:
+        """
+        Cerca la soluzione con il costo minimo con un branch and bound in profondità:
+        i sottoalberi che non possono migliorare la migliore soluzione trovata vengono scartati.
+        Restituisce un generatore delle soluzioni man mano che migliorano, l'ultima è ottima
+        (se status è Status.COMPLETE). Per maggiori info vedi cspsolver.optimize.minimize
+
+        Esempio
+        -------
+          objective = SumObjective({"a": lambda a: a, "b": lambda b: 2 * b})
+          best = None
+          for best in solver.minimize(objective):
+              print("Costo:", objective(best))
+
+        Parametri
+        -------
+        objective : Callable[[Dict[str, Any]], float]
+            costo di una soluzione {nome variabile: valore}
+        bound : Callable[[Node], float] = None
+            limite inferiore del costo delle soluzioni che estendono un nodo,
+            se None viene utilizzato objective.bound se esiste (vedi cspsolver.optimize.SumObjective)
+        target, trail, statistics, callback, timeout, max_nodes, max_backtracks
+            vedi solve
+
+        Return
+        -------
+        Iterator[Dict[str, Any]]
+            le soluzioni, ognuna con costo minore della precedente
+        """
+
+        return optimize.minimize(self, objective, bound, target, trail, statistics, callback,
+                                 timeout, max_nodes, max_backtracks)
+
+    def maximize(self, objective: Callable[[Dict[str, Any]], float], bound: Optional[Callable[[Node], float]] = None,
+                 target: Union[None, TextIO, TraceSink] = None, trail: bool = False, statistics: bool = False,
+                 callback: Optional[Callable[[Statistics], None]] = None, timeout: Optional[float] = None,
+                 max_nodes: Optional[int] = None, max_backtracks: Optional[int] = None) -> Iterator[Dict[str, Any]]:
+        """
+        Come minimize, ma cerca la soluzione con il valore di objective più alto,
+        bound (o objective.upper_bound) è un limite superiore.
+        """
+
+        return optimize.maximize(self, objective, bound, target=target, trail=trail, statistics=statistics,
+                                 callback=callback, timeout=timeout, max_nodes=max_nodes, max_backtracks=max_backtracks)
+
+    def solve_parallel(self, workers: Optional[int] = None, split_depth: Optional[int] = None,
+                       one_solution: bool = True, trail: bool = True) -> List[Dict[str, Any]]:
+        """
+        Risolve il problema in parallelo su più processi,
+        l'albero di decisione viene diviso in sottoproblemi indipendenti alla profondità split_depth.
+        L'albero di decisione non viene registrato, le soluzioni sono dei dizionari {nome variabile: valore}.
+        Per maggiori info vedi cspsolver.parallel.solve_parallel
+
+        Esempio
+        -------
+          # cerco tutte le soluzioni con 8 processi
+          solver.solve_parallel(workers=8, one_solution=False)
+
+        Parametri
+        -------
+        workers : int = None
+            numero di processi, di default il numero di cpu
+        split_depth : int = None
+            profondità a cui dividere l'albero di decisione (0 o più, con 0 non viene diviso),
+            di default viene scelta in base al numero di processi
+        one_solution : bool = True
+            booleano che indica se fermarsi o no alla prima soluzione trovata.
+        trail : bool = True
+            vedi solve
+
+        Return
+        -------
+        List[Dict[str, Any]]
+            Restituisce la lista delle soluzioni o
+            una lista vuota se non ci sono soluzioni
+
+        Errors
+        ------
+        ValueError
+            se split_depth è negativo,
+            o se fork non è disponibile e il problema non può essere serializzato
+        """
+
+        self._solutions = solve_parallel(self, workers, split_depth, one_solution, trail)
+        self._root.children = []
+        self._is_solved = True
 
         return self._solutions
 
-    def apply_node_consistency(self, target: Optional[TextIO] = None) -> bool:
+    def solve_components(self, one_solution: bool = True, trail: bool = False,
+                         workers: Optional[int] = None) -> Iterator[Dict[str, Any]]:
+        """
+        Risolve separatamente (e, con workers, in parallelo) ogni componente connessa
+        del grafo dei vincoli e combina le soluzioni delle componenti.
+        Sui problemi con più componenti indipendenti evita che un fallimento in una componente
+        faccia ripetere la ricerca nelle altre, e con tutte le soluzioni ogni componente
+        viene risolta una sola volta invece che per ogni soluzione delle altre.
+        L'albero di decisione non viene registrato, le soluzioni non vengono salvate nel solver.
+        solve lo fa con decompose True e record_tree "off" (vedi il parametro decompose),
+        questo metodo permette di risolvere le componenti in parallelo e di generare le soluzioni man mano.
+        Per maggiori info vedi cspsolver.structure.solve_components
+
+        Esempio
+        -------
+          # tutte le soluzioni, generate man mano dal prodotto di quelle delle componenti
+          for solution in solver.solve_components(one_solution=False):
+              print(solution)
+
+        Parametri
+        -------
+        one_solution : bool = True
+            booleano che indica se fermarsi o no alla prima soluzione trovata.
+        trail : bool = False
+            vedi solve
+        workers : int = None
+            se indicato, numero di processi su cui risolvere le componenti (0 per il numero di cpu),
+            altrimenti le componenti vengono risolte nel processo corrente
+
+        Return
+        -------
+        Iterator[Dict[str, Any]]
+            le soluzioni del problema come dizionari {nome variabile: valore}
+
+        Errors
+        ------
+        ValueError
+            vedi solve_parallel
+        """
+
+        return solve_components(self, one_solution, trail, workers)
+
+    def solve_tree(self, one_solution: bool = True, max_cutset: Optional[int] = None) -> Iterator[Dict[str, Any]]:
+        """
+        Risolve senza backtracking i problemi il cui grafo dei vincoli è un albero o una foresta
+        (ordinamento dalla radice alle foglie, arc consistency direzionale e assegnamento, O(n * d^2)).
+        La struttura viene riconosciuta automaticamente: se il grafo ha dei cicli viene cercato
+        un insieme di variabili che li taglia (cycle cutset), i cui assegnamenti vengono enumerati
+        risolvendo ogni volta la foresta che resta. Conviene quando l'insieme è piccolo, vedi max_cutset.
+        L'algoritmo e la politica del solver non vengono utilizzati, le soluzioni non vengono salvate nel solver.
+        solve risolve già le foreste con decompose True e record_tree "off" (vedi il parametro decompose),
+        questo metodo serve per il cycle cutset conditioning e per generare le soluzioni man mano.
+        Per maggiori info vedi cspsolver.structure.solve_tree
+
+        Esempio
+        -------
+          # al più 3 variabili nell'insieme di taglio, altrimenti risolvo normalmente
+          try:
+              solutions = list(solver.solve_tree(one_solution=False, max_cutset=3))
+          except ValueError:
+              solutions = solver.solve(one_solution=False)
+
+        Parametri
+        -------
+        one_solution : bool = True
+            booleano che indica se fermarsi o no alla prima soluzione trovata.
+        max_cutset : int = None
+            se indicato, numero massimo di variabili dell'insieme di taglio
+
+        Return
+        -------
+        Iterator[Dict[str, Any]]
+            le soluzioni del problema come dizionari {nome variabile: valore}
+
+        Errors
+        ------
+        ValueError
+            se il problema ha vincoli su più di due variabili (o vincoli globali),
+            o se l'insieme di taglio ha più di max_cutset variabili
+        """
+
+        return solve_tree(self, one_solution, max_cutset)
+
+    def solve_local(self, max_steps: Optional[int] = 100000, walk_probability: float = 0.02, tabu_tenure: int = 10,
+                    restarts: Optional[Iterable[int]] = None, seed: Optional[int] = None,
+                    target: Union[None, TextIO, TraceSink] = None, statistics: bool = False,
+                    callback: Optional[Callable[[Statistics], None]] = None,
+                    timeout: Optional[float] = None) -> List[Dict[str, Any]]:
+        """
+        Cerca una soluzione con la ricerca locale min-conflicts (con lista tabu, random walk e riavvii),
+        adatta ai problemi grandi con molte soluzioni (es. le N regine con migliaia di regine),
+        su cui la ricerca sistematica è troppo lenta. La ricerca è incompleta: se non trova
+        una soluzione entro i limiti solver.status è Status.LIMIT_REACHED,
+        ma il problema potrebbe comunque avere soluzioni.
+        L'algoritmo e la politica del solver non vengono utilizzati, l'albero di decisione non viene registrato.
+        Per maggiori info vedi cspsolver.local_search.LocalSearch
+
+        Esempio
+        -------
+          # al massimo 10000 passi, ripartendo da capo secondo la sequenza di Luby
+          solver.solve_local(max_steps=10000, restarts=Restart.Luby(500), seed=1)
+
+        Parametri
+        -------
+        max_steps : int = 100000
+            numero massimo di passi (cambi di valore di una variabile), None per nessun limite
+        walk_probability : float = 0.02
+            probabilità di assegnare un valore casuale invece di quello con meno conflitti
+        tabu_tenure : int = 10
+            numero di passi per cui una variabile non può riprendere il valore appena lasciato
+        restarts : Iterable[int] = None
+            soglie di passi dopo le quali si riparte da un assegnamento casuale (vedi cspsolver.Restart),
+            finite le soglie la ricerca prosegue senza altri riavvii
+        seed : int = None
+            seme del generatore di numeri casuali
+        target : TextIO or cspsolver.trace.TraceSink = None
+            vedi solve
+        statistics : bool = False
+            vedi solve, i passi sono contati come nodi
+        callback : Callable[[Statistics], None] = None
+            vedi solve
+        timeout : float = None
+            se indicato, la ricerca si ferma dopo timeout secondi
+
+        Return
+        -------
+        List[Dict[str, Any]]
+            una lista con la soluzione trovata, come dizionario {nome variabile: valore},
+            o una lista vuota se non è stata trovata una soluzione
+
+        Errors
+        ------
+        ValueError
+            se max_steps è minore di 1, walk_probability non è tra 0 e 1 o tabu_tenure è negativo
+        """
+
+        self._compile()
+        target = as_sink(target)
+        if target: target.emit((MESSAGE, str(self._root)))
+
+        search = LocalSearch(self._root, self._constraints, max_steps, walk_probability, tabu_tenure, restarts, seed,
+                             target, statistics=Statistics() if statistics or callback else None,
+                             callback=callback, timeout=timeout)
+        self._search = search
+        solution = search.run()
+        self._solutions = [solution] if solution is not None else []
+        self._root.children = []
+
+        return self._solutions
+
+    def apply_node_consistency(self, target: Union[None, TextIO, TraceSink] = None) -> bool:
         """
         Applica la node consistency.
 
@@ -194,9 +726,10 @@ class CSPSolver:
             True se le variabili sono node consistenti, altrimenti False
         """
 
-        return node_consistency(self._root, self._constraints, 0, target)
+        self._compile()
+        return node_consistency(self._root, self._constraints, 0, as_sink(target))
 
-    def apply_arc_consistency(self, target: Optional[TextIO] = None):
+    def apply_arc_consistency(self, target: Union[None, TextIO, TraceSink] = None):
         """
         Applica la arc consistency.
 
@@ -218,47 +751,79 @@ class CSPSolver:
             True se le variabili sono arc consistenti, altrimenti False
         """
         
-        return Algorithm.AC3(self._root, self._constraints, 0, target)
+        self._compile()
+        return Algorithm.AC3(self._root, self._constraints, 0, as_sink(target))
 
-    def _next_step(self, current_node: Node, tree_depth: int, one_solution: bool, target: Optional[TextIO]):
-        # assegno la variabile e faccio uno snapshot delle variabili
-        # in questo modo se quella assegnazione fallisce, posso tornare allo snapshot
-        variable = self._policy(current_node, self._constraints, tree_depth)
-        
-        # ciclo sui valori della variabile da assegnare
-        for value in variable.domain:
-            # Costruiamo il prossimo nodo
-            child_node = Node(current_node, deepcopy(current_node.get_variables()))
-            current_node.add_child(child_node)
-
-            # Assegna un valore alla variabile da assegnare
-            child_node.assign_variable(variable.name, value)
-
-            if target: print("Assegno: {variable} = {value}".format(variable=variable.name, value=value), file = target)
-
-            # Algoritmo applicato al child node: i domini delle variabili non assegnate verranno modificati (a seconda dell"algoritmo scelto)
-            if self._algorithm(child_node, self._constraints, tree_depth, target):
-                if tree_depth + 1 == len(child_node.get_variables()):
-                    child_node.set_solution()
-                    self._solutions.append(child_node)
-                    if target: print(str(child_node) + "\n", file = target)
-                    
-                    # Voglio una sola soluzione: blocco tutti i cicli
-                    if one_solution: # one_solution è un parametro indicato dal"utente
-                        self._found_solution = True
-                        break
-                else:
-                    self._next_step(child_node, tree_depth + 1, one_solution, target)
-                    if self._found_solution:
-                        break
-            else:
-                # Descrizione del fallimento
-                if target: print("Assegnamento {variable} = {value} fallito".format(variable=variable.name, value=value), file = target)
-                child_node.set_failure()
+    # prepara una nuova ricerca a partire dal nodo radice
+    def _new_search(self, one_solution: bool, target: Union[None, TextIO, TraceSink], trail: bool, record_tree: str,
+                    statistics: bool = False, callback: Optional[Callable[[Statistics], None]] = None,
+                    backjumping: bool = False, nogoods: int = 0,
+                    timeout: Optional[float] = None, max_nodes: Optional[int] = None, max_backtracks: Optional[int] = None,
+                    restarts: Optional[Iterable[int]] = None, algorithm: Optional[Callable] = None) -> Search:
+        if record_tree not in RECORD_TREE_MODES:
+            raise ValueError("record_tree must be one of " + ", ".join(RECORD_TREE_MODES) + ".")
+        if (backjumping or nogoods > 0) and self._algorithm not in (Algorithm.StandardBacktracking, Algorithm.ForwardChecking):
+            raise ValueError("backjumping and nogoods require the StandardBacktracking or ForwardChecking algorithm.")
+
+        self._compile()
+        target = as_sink(target)
+        if target: target.emit((MESSAGE, str(self._root)))
+
+        self._root.children = []
+
+        return Search(self._root, self._constraints, algorithm or self._algorithm, self._policy,
+                      one_solution, record_tree, trail, target,
+                      statistics=Statistics() if statistics or callback else None, callback=callback,
+                      value_order=self._value_order, backjumping=backjumping,
+                      nogoods=NogoodStore(nogoods) if nogoods > 0 else None,
+                      timeout=timeout, max_nodes=max_nodes, max_backtracks=max_backtracks, restarts=restarts)
+
+    # True se solve può risolvere il problema in base alla struttura del grafo dei vincoli:
+    # nessuna opzione osserva o controlla la ricerca e l'algoritmo verifica solo i vincoli
+    def _uses_structure(self, record_tree: str, target, statistics: bool, callback, backjumping: bool, nogoods: int,
+                        timeout: Optional[float], max_nodes: Optional[int], max_backtracks: Optional[int],
+                        restarts: Optional[Iterable[int]]) -> bool:
+        return (record_tree == "off" and target is None and not statistics and callback is None
+                and not backjumping and nogoods <= 0 and timeout is None and max_nodes is None
+                and max_backtracks is None and restarts is None and self._algorithm in STRUCTURE_ALGORITHMS)
+
+    def _compile(self):
+        # compila l'indice dei vincoli (solo se sono stati aggiunti variabili o vincoli)
+        if self._precompile:
+            self._constraints.precompile(self._root.get_variables())
+        else:
+            self._constraints.compile(self._root.get_variables())
+
+    def interrupt(self):
+        """
+        Interrompe la ricerca in corso prima del passo successivo
+        (ad esempio da un altro thread), solve restituisce le soluzioni trovate fino a quel momento.
+        """
+        if self._search is not None:
+            self._search.interrupt()
 
     def get_root(self) -> Node:
         return self._root
 
+    @property
+    def stats(self) -> Optional[Statistics]:
+        """
+        Le statistiche dell'ultima ricerca (vedi solve), None se non sono state raccolte.
+        """
+        if self._search is None:
+            return None
+        return self._search.get_statistics()
+
+    @property
+    def status(self) -> Optional[str]:
+        """
+        L'esito dell'ultima ricerca (vedi cspsolver.Status): COMPLETE, LIMIT_REACHED o INTERRUPTED,
+        None se non è ancora stata eseguita una ricerca o se è ancora in corso.
+        """
+        if self._search is None:
+            return self._status
+        return self._search.get_status()
+
     def __str__(self):
         return "Nodo radice del problema:\n" + str(self._root)
 
@@ -277,13 +842,16 @@ class CSPSolver:
         if self._solutions:
             print("Le soluzioni trovate sono:", file = target)
             for solution in self._solutions:
-                print(solution, file = target)
+                print(solution_to_str(solution), file = target)
         else:
             print("Non sono state trovate soluzioni", file = target)
         
     def _print_node(self, node: Node, index: int, target: TextIO = sys.stdout):
-        print(str(index) + " - " + str(node), file = target)
-        index += 1
-        for child in node.get_children():
-            index = self._print_node(child, index, target)
-        return index
\ No newline at end of file
+        # visita depth-first iterativa, l'albero può essere più profondo del limite di ricorsione
+        stack = [node]
+        while stack:
+            node = stack.pop()
+            print(str(index) + " - " + str(node), file = target)
+            index += 1
+            stack.extend(reversed(node.get_children()))
+        return index
@@ -0,0 +1,137 @@
+from typing import Dict, Tuple, Iterator, Iterable
+
+
+class ValueTable:
+    """
+    Tabella dei valori di un dominio, condivisa da tutti i domini (e dalle loro copie)
+    costruiti sugli stessi valori: ad ogni valore corrisponde un bit.
+    """
+
+    def __init__(self, values: Iterable):
+        # valori senza ripetizioni nell'ordine del dominio
+        # (non con dict.fromkeys: prima di python 3.7 i dizionari non mantengono l'ordine)
+        unique = []
+        seen = set()
+        for value in values:
+            if value not in seen:
+                seen.add(value)
+                unique.append(value)
+        self.values = tuple(unique)
+        self.positions = {value: position for position, value in enumerate(self.values)}
+        self.full_mask = (1 << len(self.values)) - 1
+
+    @staticmethod
+    def intern(values: Iterable, tables: Dict[Tuple, "ValueTable"]) -> "ValueTable":
+        """
+        Restituisce la tabella per i valori passati come parametro,
+        riutilizzando quella già presente in tables se esiste.
+        """
+        key = tuple(values)
+        table = tables.get(key)
+        if table is None:
+            table = ValueTable(key)
+            tables[key] = table
+        return table
+
+
+class BitsetDomain:
+    """
+    Dominio compatto: i valori presenti sono rappresentati da una maschera di bit (int)
+    sulla tabella dei valori (cspsolver.domain.ValueTable).
+    Rimozione, appartenenza, dimensione e copia costano O(1) (o una parola per la copia),
+    l'interfaccia è quella di una lista, quindi gli algoritmi e le politiche
+    funzionano senza modifiche.
+
+    Esempio
+    -------
+      domain = BitsetDomain(ValueTable([1, 2, 3]))
+      domain.remove(2)
+      list(domain) # [1, 3]
+    """
+
+    __slots__ = ("_table", "_mask", "_size")
+
+    def __init__(self, table: ValueTable, mask: int = -1, size: int = -1):
+        if mask == -1:
+            mask = table.full_mask
+        if size == -1:
+            size = bin(mask).count("1")
+
+        self._table = table
+        self._mask = mask
+        self._size = size
+
+    @property
+    def mask(self) -> int:
+        return self._mask
+
+    @property
+    def table(self) -> ValueTable:
+        return self._table
+
+    def __len__(self):
+        return self._size
+
+    def __bool__(self):
+        return self._size > 0
+
+    def __contains__(self, value):
+        position = self._table.positions.get(value)
+        return position is not None and (self._mask >> position) & 1 == 1
+
+    def __iter__(self) -> Iterator:
+        values = self._table.values
+        mask = self._mask
+        while mask:
+            low = mask & -mask
+            yield values[low.bit_length() - 1]
+            mask ^= low
+
+    # domain[:] restituisce una copia (costa una parola), domain[i] l'i-esimo valore presente
+    def __getitem__(self, key):
+        if key == slice(None):
+            return self.copy()
+
+        return list(self)[key]
+
+    # posizione (bit) del valore, usata dal trail insieme a insert
+    def index(self, value) -> int:
+        if value not in self:
+            raise ValueError("{0} is not in domain".format(value))
+        return self._table.positions[value]
+
+    def remove(self, value):
+        position = self.index(value)
+        self._mask &= ~(1 << position)
+        self._size -= 1
+
+    # reinserisce il valore, la posizione è quella restituita da index
+    def insert(self, index: int, value):
+        bit = 1 << index
+        if not self._mask & bit:
+            self._mask |= bit
+            self._size += 1
+
+    def append(self, value):
+        position = self._table.positions.get(value)
+        if position is None:
+            raise ValueError("{0} is not in the value table of this domain".format(value))
+        self.insert(position, value)
+
+    def copy(self) -> "BitsetDomain":
+        return BitsetDomain(self._table, self._mask, self._size)
+
+    def __copy__(self):
+        return self.copy()
+
+    # la tabella dei valori è condivisa anche dalle copie profonde
+    def __deepcopy__(self, memo):
+        return self.copy()
+
+    def __eq__(self, other):
+        if isinstance(other, BitsetDomain) and self._table is other._table:
+            return self._mask == other._mask
+        return list(self) == list(other)
+
+    def __repr__(self):
+        return repr(list(self))
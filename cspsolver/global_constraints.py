@@ -0,0 +1,518 @@
+from typing import Dict, Tuple, List, Any, Optional, Set, Callable, Iterable
+from abc import ABC, abstractmethod
+import itertools
+from .trace import TraceSink, PRUNE
+
+
+class GlobalConstraint(ABC):
+    """
+    Vincolo su un numero qualsiasi di variabili (scope), aggiunto con Constraints.add_global.
+    Gli algoritmi utilizzano il vincolo con tre livelli di verifica, a seconda della loro forza:
+      - check / check_variable: verifica delle variabili assegnate (GenerateAndTest, StandardBacktracking)
+      - forward: eliminazione dei valori incompatibili con le variabili assegnate (ForwardChecking)
+      - propagate: eliminazione dei valori senza supporto nei domini delle altre variabili (AC3, AC2001)
+    Le variabili sono passate come lista di cspsolver.variable.Variable, nell'ordine degli indici compilati.
+
+    Parametri
+    -------
+    names : Tuple[str, ...]
+        i nomi delle variabili nello scope del vincolo
+    """
+
+    def __init__(self, names: Tuple[str, ...]):
+        self.names = tuple(names)
+        # indici delle variabili, assegnati da compile
+        self.indices = []  # type: List[int]
+
+    def compile(self, indices: Dict[str, int]):
+        self.indices = [indices[name] for name in self.names]
+
+    # True se i valori (un valore per ogni variabile dello scope) soddisfano il vincolo
+    @abstractmethod
+    def verify(self, values: Dict[str, Any]) -> bool:
+        pass
+
+    # True se le variabili assegnate dello scope non violano il vincolo
+    @abstractmethod
+    def check(self, variables: List) -> bool:
+        pass
+
+    # come check, dopo l'assegnamento della variabile con indice index
+    def check_variable(self, variables: List, index: int) -> bool:
+        return self.check(variables)
+
+    # elimina i valori incompatibili con le variabili assegnate dopo l'assegnamento della variabile con indice index,
+    # restituisce False se un dominio diventa vuoto
+    @abstractmethod
+    def forward(self, variables: List, index: int, target: Optional[TraceSink]) -> bool:
+        pass
+
+    # elimina i valori senza supporto, aggiunge a changed gli indici delle variabili modificate,
+    # restituisce False se un dominio diventa vuoto
+    @abstractmethod
+    def propagate(self, variables: List, changed: Set[int], target: Optional[TraceSink]) -> bool:
+        pass
+
+    # numero di violazioni del vincolo che coinvolgono la variabile con indice index,
+    # con tutte le variabili dello scope assegnate (utilizzato dalla ricerca locale, vedi cspsolver.local_search)
+    def conflicts(self, variables: List, index: int) -> int:
+        return 0 if self.check(variables) else 1
+
+    # indici delle variabili dello scope il cui numero di conflitti può essere cambiato
+    # dopo che la variabile con indice index è passata da old_value al valore attuale
+    def affected(self, variables: List, index: int, old_value: Any) -> Iterable[int]:
+        return self.indices
+
+    # elimina value dal dominio di variable e invia l'evento a target
+    def _delete(self, variable, value: Any, changed: Optional[Set[int]], target: Optional[TraceSink]):
+        variable.delete_value(value)
+        if changed is not None:
+            changed.add(variable.index)
+        if target: target.emit((PRUNE, variable.name, value, str(self), None, variable.domain))
+
+    def __str__(self):
+        return type(self).__name__ + "(" + ", ".join(self.names) + ")"
+
+
+class AllDifferent(GlobalConstraint):
+    """
+    Vincolo globale: le variabili nello scope devono assumere valori tutti diversi.
+    Sostituisce gli n * (n - 1) / 2 vincoli binari lambda x, y: x != y tra le variabili.
+
+    Il vincolo offre tre livelli di verifica, utilizzati dagli algoritmi a seconda della loro forza:
+      - check / check_variable: i valori delle variabili assegnate sono tutti diversi
+        (GenerateAndTest, StandardBacktracking)
+      - forward: il valore dell'ultima variabile assegnata viene eliminato dai domini
+        delle altre variabili dello scope (ForwardChecking)
+      - propagate: vengono eliminati tutti i valori che non fanno parte di alcun assegnamento
+        con valori tutti diversi (arc-consistenza generalizzata, algoritmo di Régin:
+        matching massimo tra variabili e valori e componenti fortemente connesse
+        del grafo del matching) (AC3, AC2001)
+
+    Parametri
+    -------
+    names : Tuple[str, ...]
+        i nomi delle variabili nello scope del vincolo
+    """
+
+    def __init__(self, names: Tuple[str, ...]):
+        super().__init__(names)
+        # ultimo matching trovato (valore per ogni variabile dello scope), riutilizzato alla chiamata successiva
+        self._matching = [None] * len(self.names)
+
+    def compile(self, indices: Dict[str, int]):
+        super().compile(indices)
+        self._matching = [None] * len(self.names)
+
+    def verify(self, values: Dict[str, Any]) -> bool:
+        return len(set(values[name] for name in self.names)) == len(self.names)
+
+    # True se i valori delle variabili assegnate dello scope sono tutti diversi
+    def check(self, variables: List) -> bool:
+        values = [variables[index].value for index in self.indices if variables[index].value is not None]
+        return len(values) == len(set(values))
+
+    # True se il valore della variabile con indice index è diverso da quello delle altre variabili assegnate dello scope
+    def check_variable(self, variables: List, index: int) -> bool:
+        value = variables[index].value
+        for other_index in self.indices:
+            if other_index != index and variables[other_index].value == value:
+                return False
+
+        return True
+
+    # numero di altre variabili dello scope con lo stesso valore
+    def conflicts(self, variables: List, index: int) -> int:
+        value = variables[index].value
+        return sum(1 for other_index in self.indices if other_index != index and variables[other_index].value == value)
+
+    # cambiano solo i conflitti delle variabili con il vecchio o con il nuovo valore
+    def affected(self, variables: List, index: int, old_value: Any) -> Iterable[int]:
+        value = variables[index].value
+        return [other_index for other_index in self.indices
+                if variables[other_index].value == value or variables[other_index].value == old_value]
+
+    def forward(self, variables: List, index: int, target: Optional[TraceSink]) -> bool:
+        """
+        Elimina il valore della variabile con indice index dai domini delle variabili
+        non assegnate dello scope, restituisce False se un dominio diventa vuoto.
+        """
+        variable = variables[index]
+        value = variable.value
+
+        for other_index in self.indices:
+            other = variables[other_index]
+            if other.value is not None:
+                if other_index != index and other.value == value:
+                    return False
+                continue
+
+            if value in other.domain:
+                other.delete_value(value)
+                if target: target.emit((PRUNE, other.name, value, variable.name, value, other.domain))
+                if not other.domain:
+                    return False
+
+        return True
+
+    def propagate(self, variables: List, changed: Set[int], target: Optional[TraceSink]) -> bool:
+        """
+        Elimina dai domini delle variabili non assegnate dello scope i valori che non compaiono
+        in nessun matching massimo tra variabili e valori (Régin, 1994).
+        Per le variabili assegnate il dominio è il solo valore assegnato.
+        Gli indici delle variabili modificate vengono aggiunti a changed,
+        restituisce False se non esiste un assegnamento con valori tutti diversi.
+        """
+        scope = [variables[index] for index in self.indices]
+        domains = [[variable.value] if variable.value is not None else list(variable.domain) for variable in scope]
+        n_variables = len(scope)
+
+        matching = self._find_matching(domains)
+        if matching is None:
+            return False
+
+        # grafo orientato del matching: nodi 0..n_variables-1 per le variabili, n_variables.. per i valori,
+        # archi variabile -> valore per il matching, valore -> variabile per gli altri valori del dominio
+        value_ids = {}  # type: Dict[Any, int]
+        for domain in domains:
+            for value in domain:
+                if value not in value_ids:
+                    value_ids[value] = n_variables + len(value_ids)
+
+        n_nodes = n_variables + len(value_ids)
+        edges = [[] for _ in range(n_nodes)]  # type: List[List[int]]
+        matched_values = set()
+        for position, domain in enumerate(domains):
+            matched = matching[position]
+            matched_values.add(matched)
+            edges[position].append(value_ids[matched])
+            for value in domain:
+                if value != matched:
+                    edges[value_ids[value]].append(position)
+
+        # nodi raggiungibili con un cammino alternato da un valore libero
+        reachable = [False] * n_nodes
+        stack = [node for value, node in value_ids.items() if value not in matched_values]
+        for node in stack:
+            reachable[node] = True
+        while stack:
+            for next_node in edges[stack.pop()]:
+                if not reachable[next_node]:
+                    reachable[next_node] = True
+                    stack.append(next_node)
+
+        components = _strongly_connected_components(edges)
+
+        # un valore non nel matching è consistente se l'arco è su un ciclo alternato (stessa componente)
+        # o su un cammino alternato che parte da un valore libero
+        for position, variable in enumerate(scope):
+            if variable.value is not None:
+                continue
+
+            matched = matching[position]
+            for value in domains[position]:
+                node = value_ids[value]
+                if value == matched or reachable[node] or components[node] == components[position]:
+                    continue
+
+                self._delete(variable, value, changed, target)
+
+        return True
+
+    # matching massimo che copre tutte le variabili (un valore per variabile, tutti diversi),
+    # None se non esiste
+    def _find_matching(self, domains: List[List]) -> Optional[List]:
+        matching = [None] * len(domains)  # type: List[Any]
+        owners = {}  # type: Dict[Any, int]
+
+        # parto dal matching precedente, tenendo solo le coppie ancora valide
+        for position, value in enumerate(self._matching):
+            if value is not None and value not in owners and value in domains[position]:
+                matching[position] = value
+                owners[value] = position
+
+        for position in range(len(domains)):
+            if matching[position] is None and not _augment(position, domains, matching, owners):
+                return None
+
+        self._matching = matching
+        return matching
+
+
+class Table(GlobalConstraint):
+    """
+    Vincolo in estensione: le variabili dello scope devono assumere i valori di una delle tuple ammesse.
+
+    La propagazione è quella di compact-table: ogni tupla corrisponde ad un bit e per ogni valore
+    di ogni variabile viene salvata la maschera delle tuple che lo contengono.
+    Le tuple ancora valide sono l'AND, su tutte le variabili, dell'OR delle maschere dei valori nel dominio,
+    un valore ha supporto se la sua maschera interseca le tuple valide.
+    Le tuple valide vengono ricalcolate dai domini ad ogni chiamata (nessuno stato da ripristinare
+    quando si torna indietro), quindi il vincolo funziona sia con le copie dei nodi che con il trail.
+
+      - check / check_variable: esiste una tupla compatibile con i valori delle variabili assegnate
+      - forward: elimina i valori senza una tupla compatibile con le variabili assegnate
+      - propagate: elimina i valori senza una tupla valida (arc-consistenza generalizzata)
+
+    Parametri
+    -------
+    names : Tuple[str, ...]
+        i nomi delle variabili nello scope del vincolo
+    tuples : Iterable[Tuple]
+        le tuple ammesse, i valori nello stesso ordine di names
+    """
+
+    def __init__(self, names: Tuple[str, ...], tuples: Iterable[Tuple]):
+        super().__init__(names)
+        # tuple senza ripetizioni nell'ordine dato (dict.fromkeys non mantiene l'ordine prima di python 3.7)
+        unique = []  # type: List[Tuple]
+        seen = set()  # type: Set[Tuple]
+        for values in tuples:
+            values = tuple(values)
+            if values not in seen:
+                seen.add(values)
+                unique.append(values)
+        self.tuples = tuple(unique)
+
+        # supports[posizione][valore]: maschera delle tuple con quel valore in quella posizione
+        self._supports = [{} for _ in self.names]  # type: List[Dict[Any, int]]
+        for bit, values in enumerate(self.tuples):
+            for position, value in enumerate(values):
+                supports = self._supports[position]
+                supports[value] = supports.get(value, 0) | (1 << bit)
+
+        self._all = (1 << len(self.tuples)) - 1
+        self._tuple_set = set(self.tuples)
+
+    def verify(self, values: Dict[str, Any]) -> bool:
+        return tuple(values[name] for name in self.names) in self._tuple_set
+
+    # tuple compatibili con i valori delle variabili assegnate
+    def _assigned_tuples(self, variables: List) -> int:
+        current = self._all
+        for position, index in enumerate(self.indices):
+            value = variables[index].value
+            if value is not None:
+                current &= self._supports[position].get(value, 0)
+                if not current:
+                    return 0
+        return current
+
+    # tuple valide: compatibili con i valori delle variabili assegnate e con i domini delle altre
+    def _valid_tuples(self, variables: List) -> int:
+        current = self._all
+        for position, index in enumerate(self.indices):
+            variable = variables[index]
+            supports = self._supports[position]
+            if variable.value is not None:
+                current &= supports.get(variable.value, 0)
+            else:
+                mask = 0
+                for value in variable.domain:
+                    mask |= supports.get(value, 0)
+                current &= mask
+
+            if not current:
+                return 0
+        return current
+
+    def check(self, variables: List) -> bool:
+        return self._assigned_tuples(variables) != 0
+
+    def forward(self, variables: List, index: int, target: Optional[TraceSink]) -> bool:
+        return self._filter(variables, self._assigned_tuples(variables), None, target)
+
+    def propagate(self, variables: List, changed: Set[int], target: Optional[TraceSink]) -> bool:
+        return self._filter(variables, self._valid_tuples(variables), changed, target)
+
+    # elimina dai domini delle variabili non assegnate i valori che non compaiono in nessuna tupla di current
+    def _filter(self, variables: List, current: int, changed: Optional[Set[int]], target: Optional[TraceSink]) -> bool:
+        if not current:
+            return False
+
+        for position, index in enumerate(self.indices):
+            variable = variables[index]
+            if variable.value is not None:
+                continue
+
+            supports = self._supports[position]
+            for value in variable.domain[:]:
+                if not current & supports.get(value, 0):
+                    self._delete(variable, value, changed, target)
+
+            if not variable.domain:
+                return False
+
+        return True
+
+
+class Predicate(GlobalConstraint):
+    """
+    Vincolo n-ario definito da una funzione, es. lambda a, b, c: a + b == c,
+    i parametri della funzione sono nello stesso ordine di names.
+
+      - check / check_variable: la funzione viene verificata quando tutte le variabili dello scope sono assegnate
+      - forward: quando resta una sola variabile non assegnata vengono eliminati i suoi valori
+        che non verificano la funzione
+      - propagate: se il numero di combinazioni dei domini non supera ENUMERATION_LIMIT
+        vengono eliminati i valori che non compaiono in nessuna combinazione che verifica la funzione
+        (arc-consistenza generalizzata), altrimenti come forward.
+        Per vincoli su molte variabili con domini grandi conviene un vincolo Table.
+
+    Parametri
+    -------
+    names : Tuple[str, ...]
+        i nomi delle variabili nello scope del vincolo
+    constraint : Callable[..., bool]
+        la funzione che descrive il vincolo
+    """
+
+    # numero massimo di combinazioni dei domini enumerate da propagate
+    ENUMERATION_LIMIT = 10000
+
+    def __init__(self, names: Tuple[str, ...], constraint: Callable[..., bool]):
+        super().__init__(names)
+        self.constraint = constraint
+
+    def verify(self, values: Dict[str, Any]) -> bool:
+        return bool(self.constraint(*[values[name] for name in self.names]))
+
+    def check(self, variables: List) -> bool:
+        values = [variables[index].value for index in self.indices]
+        if None in values:
+            return True
+        return bool(self.constraint(*values))
+
+    def forward(self, variables: List, index: int, target: Optional[TraceSink]) -> bool:
+        return self._forward(variables, None, target)
+
+    def propagate(self, variables: List, changed: Set[int], target: Optional[TraceSink]) -> bool:
+        scope = [variables[index] for index in self.indices]
+        domains = [[variable.value] if variable.value is not None else variable.domain[:] for variable in scope]
+
+        combinations = 1
+        for domain in domains:
+            combinations *= len(domain)
+        if combinations > self.ENUMERATION_LIMIT:
+            return self._forward(variables, changed, target)
+
+        # valori che compaiono in almeno una combinazione che verifica la funzione
+        supported = [set() for _ in scope]  # type: List[Set]
+        for values in itertools.product(*domains):
+            if self.constraint(*values):
+                for position, value in enumerate(values):
+                    supported[position].add(value)
+
+        for position, variable in enumerate(scope):
+            if not supported[position]:
+                return False
+            if variable.value is not None:
+                continue
+
+            for value in domains[position]:
+                if value not in supported[position]:
+                    self._delete(variable, value, changed, target)
+
+        return True
+
+    # con una sola variabile non assegnata elimina i suoi valori che non verificano la funzione
+    def _forward(self, variables: List, changed: Optional[Set[int]], target: Optional[TraceSink]) -> bool:
+        values = [variables[index].value for index in self.indices]
+        unassigned = [position for position, value in enumerate(values) if value is None]
+
+        if not unassigned:
+            return bool(self.constraint(*values))
+        if len(unassigned) > 1:
+            return True
+
+        position = unassigned[0]
+        variable = variables[self.indices[position]]
+        for value in variable.domain[:]:
+            values[position] = value
+            if not self.constraint(*values):
+                self._delete(variable, value, changed, target)
+
+        return len(variable.domain) > 0
+
+
+# cerca un cammino alternato dalla variabile start ad un valore libero e aggiorna il matching,
+# restituisce False se non esiste
+def _augment(start: int, domains: List[List], matching: List, owners: Dict[Any, int]) -> bool:
+    # variabile da cui è stato raggiunto ogni valore visitato
+    parents = {}
+    stack = [start]
+
+    while stack:
+        position = stack.pop()
+        for value in domains[position]:
+            if value in parents:
+                continue
+            parents[value] = position
+
+            owner = owners.get(value)
+            if owner is not None:
+                stack.append(owner)
+                continue
+
+            # valore libero: scambio gli archi lungo il cammino
+            while value is not None:
+                position = parents[value]
+                previous = matching[position]
+                matching[position] = value
+                owners[value] = position
+                value = previous
+            return True
+
+    return False
+
+
+# componente fortemente connessa di ogni nodo (Tarjan, iterativo)
+def _strongly_connected_components(edges: List[List[int]]) -> List[int]:
+    n_nodes = len(edges)
+    index = [-1] * n_nodes
+    lowlink = [0] * n_nodes
+    on_stack = [False] * n_nodes
+    components = [-1] * n_nodes
+    stack = []
+    counter = 0
+    n_components = 0
+
+    for root in range(n_nodes):
+        if index[root] != -1:
+            continue
+
+        work = [(root, 0)]
+        while work:
+            node, edge = work.pop()
+            if edge == 0:
+                index[node] = lowlink[node] = counter
+                counter += 1
+                stack.append(node)
+                on_stack[node] = True
+
+            # visito i successori a partire da edge, fermandomi al primo non ancora visitato
+            node_edges = edges[node]
+            while edge < len(node_edges):
+                next_node = node_edges[edge]
+                edge += 1
+                if index[next_node] == -1:
+                    work.append((node, edge))
+                    work.append((next_node, 0))
+                    break
+                if on_stack[next_node]:
+                    lowlink[node] = min(lowlink[node], index[next_node])
+            else:
+                if lowlink[node] == index[node]:
+                    while True:
+                        other = stack.pop()
+                        on_stack[other] = False
+                        components[other] = n_components
+                        if other == node:
+                            break
+                    n_components += 1
+
+                if work:
+                    parent = work[-1][0]
+                    lowlink[parent] = min(lowlink[parent], lowlink[node])
+
+    return components
@@ -0,0 +1,355 @@
+from typing import Callable, List, Optional, Iterable, Dict, Any, Tuple
+from time import perf_counter
+import random
+from .node import Node
+from .constraints import Constraints
+from .variable import Variable
+from .statistics import Statistics
+from .search import Status
+from .trace import TraceSink, ASSIGN, SOLUTION, MESSAGE
+
+
+class LocalSearch:
+    """
+    Ricerca locale min-conflicts: si parte da un assegnamento completo casuale e ad ogni passo
+    si sceglie a caso una variabile in conflitto e le si assegna il valore che minimizza
+    il numero di conflitti (a parità di conflitti un valore a caso).
+    Il numero di conflitti di ogni variabile viene aggiornato in modo incrementale
+    dopo ogni passo, visitando solo le variabili vincolate con quella modificata.
+    Per uscire dai minimi locali:
+      - lista tabu: il valore appena lasciato da una variabile non può essere ripreso
+        per tabu_tenure passi, a meno che non porti al minimo numero di conflitti mai raggiunto
+      - random walk: con probabilità walk_probability il valore viene scelto a caso
+      - riavvii: dopo un numero di passi dato da una strategia (vedi cspsolver.Restart)
+        si riparte da un nuovo assegnamento casuale
+
+    La ricerca è incompleta: trova una soluzione (spesso molto più velocemente della ricerca
+    sistematica sui problemi grandi con molte soluzioni), ma non può dimostrare che non ne esistono.
+    I vincoli unari vengono applicati ai domini prima di iniziare,
+    i vincoli globali contano i conflitti con GlobalConstraint.conflicts.
+    Le variabili già assegnate nel nodo radice non vengono modificate.
+
+    Parametri
+    -------
+    root : cspsolver.node.Node
+        il nodo radice del problema, non viene modificato
+    constraints : cspsolver.constraints.Constraints
+        i vincoli del problema, già compilati
+    max_steps : int = 100000
+        numero massimo di passi (in totale, compresi i riavvii), None per nessun limite
+    walk_probability : float = 0.02
+        probabilità di assegnare un valore casuale invece di quello con meno conflitti
+    tabu_tenure : int = 10
+        numero di passi per cui il valore lasciato da una variabile non può essere ripreso, 0 per nessuna lista tabu
+    restarts : Iterable[int] = None
+        soglie di passi dopo le quali si riparte da un nuovo assegnamento casuale,
+        es. cspsolver.Restart.Luby(1000), None per nessun riavvio.
+        Se le soglie finiscono la ricerca prosegue senza altri riavvii
+    seed : int = None
+        seme del generatore di numeri casuali, con lo stesso seme la ricerca è ripetibile
+    target : cspsolver.trace.TraceSink = None
+        riceve un evento ASSIGN per ogni passo, i riavvii e la soluzione
+    statistics : cspsolver.statistics.Statistics = None
+        se indicato vengono raccolte le statistiche: i passi sono contati come nodi
+    callback : Callable[[Statistics], None] = None
+        chiamata con le statistiche ogni Statistics.CALLBACK_INTERVAL passi, alla soluzione e alla fine
+    timeout : float = None
+        se indicato, la ricerca si ferma dopo timeout secondi
+
+    Errors
+    ------
+    ValueError
+        se max_steps è minore di 1, walk_probability non è tra 0 e 1 o tabu_tenure è negativo
+    """
+
+    def __init__(self, root: Node, constraints: Constraints, max_steps: Optional[int] = 100000,
+                 walk_probability: float = 0.02, tabu_tenure: int = 10, restarts: Optional[Iterable[int]] = None,
+                 seed: Optional[int] = None, target: Optional[TraceSink] = None, statistics: Optional[Statistics] = None,
+                 callback: Optional[Callable[[Statistics], None]] = None, timeout: Optional[float] = None):
+        if max_steps is not None and max_steps < 1:
+            raise ValueError("max_steps must be at least 1.")
+        if not 0 <= walk_probability <= 1:
+            raise ValueError("walk_probability must be between 0 and 1.")
+        if tabu_tenure < 0:
+            raise ValueError("tabu_tenure cannot be negative.")
+
+        self._root = root
+        self._constraints = constraints
+        self._max_steps = max_steps
+        self._walk_probability = walk_probability
+        self._tabu_tenure = tabu_tenure
+        self._restarts = restarts
+        self._random = random.Random(seed)
+        self._target = target
+        self._statistics = statistics
+        self._callback = callback
+        self._timeout = timeout
+        self._interrupted = False
+        self._status = None  # type: Optional[str]
+
+        # stato della ricerca, vedi _prepare()
+        self._variables = []  # type: List[Variable]
+        self._values = []  # type: List[List]
+        self._positions = []  # type: List[int]
+        self._conflicts = []  # type: List[int]
+        self._total = 0
+        # variabili in conflitto (indici) e posizione di ognuna nella lista, per la scelta casuale in O(1)
+        self._conflicted = []  # type: List[int]
+        self._conflicted_positions = {}  # type: Dict[int, int]
+        # vincoli globali su ogni variabile, con il loro numero nella lista dei vincoli globali
+        self._variable_globals = []  # type: List[List[Tuple[int, Any]]]
+        # conflitti di ogni variabile dovuti ad ogni vincolo globale {numero del vincolo: {indice: conflitti}}
+        self._global_conflicts = {}  # type: Dict[int, Dict[int, int]]
+        # passo fino al quale ogni valore (posizione nella lista dei valori) di ogni variabile è tabu
+        self._tabu = []  # type: List[List[int]]
+
+    def interrupt(self):
+        """
+        Interrompe la ricerca prima del prossimo passo,
+        può essere chiamato anche da un altro thread.
+        """
+        self._interrupted = True
+
+    def is_interrupted(self) -> bool:
+        return self._interrupted
+
+    # esito della ricerca (vedi Status): COMPLETE se è stata trovata una soluzione
+    # o se un dominio è vuoto, LIMIT_REACHED se sono finiti i passi o il tempo
+    def get_status(self) -> Optional[str]:
+        return self._status
+
+    def get_statistics(self) -> Optional[Statistics]:
+        return self._statistics
+
+    def run(self) -> Optional[Dict[str, Any]]:
+        """
+        Esegue la ricerca e restituisce la soluzione come dizionario {nome variabile: valore},
+        None se non è stata trovata.
+        """
+        statistics = self._statistics
+        if statistics is not None:
+            statistics.attach(self._constraints, self._root.get_variables())
+            statistics.start()
+
+        try:
+            return self._run(self._target, statistics)
+        finally:
+            if statistics is not None:
+                statistics.stop()
+                statistics.detach(self._constraints)
+                if self._callback: self._callback(statistics)
+
+    def _run(self, target: Optional[TraceSink], statistics: Optional[Statistics]) -> Optional[Dict[str, Any]]:
+        if not self._prepare():
+            if target: target.emit((MESSAGE, "Un dominio e' vuoto, il problema non ha soluzione"))
+            self._status = Status.COMPLETE
+            return None
+
+        deadline = perf_counter() + self._timeout if self._timeout is not None else None
+        cutoffs = iter(self._restarts if self._restarts is not None else ())
+        cutoff = next(cutoffs, None)
+
+        self._initialize()
+        best = self._total
+        steps = 0
+        restart_steps = 0
+
+        while self._conflicted and not self._interrupted:
+            if self._max_steps is not None and steps >= self._max_steps or deadline is not None and perf_counter() >= deadline:
+                if target: target.emit((MESSAGE, "Limite raggiunto, ricerca interrotta"))
+                break
+
+            if cutoff is not None and restart_steps >= cutoff:
+                if target: target.emit((MESSAGE, "Riavvio della ricerca dopo {0} passi".format(restart_steps)))
+                if statistics is not None: statistics.restarts += 1
+                self._initialize()
+                best = self._total
+                restart_steps = 0
+                cutoff = next(cutoffs, None)
+                continue
+
+            index = self._random.choice(self._conflicted)
+            position = self._choose(index, steps, best)
+            self._move(index, position, steps)
+            steps += 1
+            restart_steps += 1
+            best = min(best, self._total)
+
+            if target: target.emit((ASSIGN, self._variables[index].name, self._variables[index].value))
+            if statistics is not None:
+                statistics.nodes += 1
+                if self._callback and statistics.nodes % statistics.CALLBACK_INTERVAL == 0:
+                    self._callback(statistics)
+
+        if self._interrupted:
+            self._status = Status.INTERRUPTED
+        elif self._conflicted:
+            self._status = Status.LIMIT_REACHED
+        else:
+            self._status = Status.COMPLETE
+
+        if self._conflicted:
+            return None
+
+        solution = {variable.name: variable.value for variable in self._variables}
+        if target: target.emit((SOLUTION, solution))
+        if statistics is not None: statistics.solutions += 1
+        return solution
+
+    # copia le variabili e calcola i valori possibili di ognuna (il dominio filtrato con i vincoli unari),
+    # restituisce False se una variabile non ha valori
+    def _prepare(self) -> bool:
+        constraints = self._constraints
+        self._variables = [variable.copy() for variable in self._root.get_variables()]
+        self._values = []
+        for variable in self._variables:
+            if variable.value is not None:
+                values = [variable.value]
+            else:
+                values = [value for value in variable.domain if constraints.check_unary(variable.index, value)]
+            if not values:
+                return False
+            self._values.append(values)
+
+        global_constraints = constraints.get_globals()
+        numbers = {id(constraint): number for number, constraint in enumerate(global_constraints)}
+        self._variable_globals = [[(numbers[id(constraint)], constraint) for constraint in constraints.get_globals(variable.index)]
+                                  for variable in self._variables]
+        return True
+
+    # nuovo assegnamento casuale e conteggio dei conflitti da zero
+    def _initialize(self):
+        variables = self._variables
+        self._positions = []
+        for variable, values in zip(variables, self._values):
+            position = self._random.randrange(len(values))
+            self._positions.append(position)
+            variable.value = values[position]
+
+        self._tabu = [[-1] * len(values) for values in self._values]
+        self._global_conflicts = {}
+        for number, constraint in enumerate(self._constraints.get_globals()):
+            self._global_conflicts[number] = {index: constraint.conflicts(variables, index) for index in constraint.indices}
+
+        self._conflicts = [self._cost(index) for index in range(len(variables))]
+        self._total = sum(self._conflicts)
+        self._conflicted = []
+        self._conflicted_positions = {}
+        for index, conflicts in enumerate(self._conflicts):
+            if conflicts:
+                self._mark(index)
+
+    # numero di conflitti della variabile con il suo valore attuale,
+    # il conteggio si ferma appena supera limit (se indicato)
+    def _cost(self, index: int, limit: Optional[int] = None) -> int:
+        constraints = self._constraints
+        variables = self._variables
+        value = variables[index].value
+        cost = 0
+        for _, constraint in self._variable_globals[index]:
+            cost += constraint.conflicts(variables, index)
+        if limit is not None and cost > limit:
+            return cost
+
+        for other_index in constraints.neighbours(index):
+            if not constraints.check(index, value, other_index, variables[other_index].value):
+                cost += 1
+                if limit is not None and cost > limit:
+                    return cost
+        return cost
+
+    # sceglie la posizione del nuovo valore della variabile: quello con meno conflitti tra i valori non tabu
+    # (un valore tabu è ammesso se porta al minimo numero di conflitti mai raggiunto), o uno casuale
+    def _choose(self, index: int, step: int, best: int) -> int:
+        values = self._values[index]
+        if self._random.random() < self._walk_probability:
+            return self._random.randrange(len(values))
+
+        variable = self._variables[index]
+        current = self._positions[index]
+        conflicts = self._conflicts[index]
+        tabu = self._tabu[index]
+
+        best_cost = None
+        candidates = []
+        for position, value in enumerate(values):
+            if position == current:
+                cost = conflicts
+            else:
+                variable.value = value
+                # un valore con più conflitti del migliore trovato non serve contarlo tutto
+                cost = self._cost(index, best_cost)
+                # con i vincoli binari ogni conflitto è contato da entrambe le variabili
+                if tabu[position] >= step and self._total + 2 * (cost - conflicts) >= best:
+                    continue
+
+            if best_cost is None or cost < best_cost:
+                best_cost = cost
+                candidates = [position]
+            elif cost == best_cost:
+                candidates.append(position)
+        variable.value = values[current]
+
+        if not candidates:
+            return self._random.randrange(len(values))
+        return self._random.choice(candidates)
+
+    # assegna alla variabile il valore in posizione position e aggiorna i conflitti delle variabili vincolate
+    def _move(self, index: int, position: int, step: int):
+        current = self._positions[index]
+        if position == current:
+            return
+
+        constraints = self._constraints
+        variables = self._variables
+        variable = variables[index]
+        old_value = variable.value
+        value = self._values[index][position]
+        variable.value = value
+        self._positions[index] = position
+        self._tabu[index][current] = step + self._tabu_tenure
+
+        for other_index in constraints.neighbours(index):
+            other_value = variables[other_index].value
+            before = not constraints.check(index, old_value, other_index, other_value)
+            after = not constraints.check(index, value, other_index, other_value)
+            if before != after:
+                self._update(other_index, after - before)
+
+        for number, constraint in self._variable_globals[index]:
+            counts = self._global_conflicts[number]
+            for other_index in constraint.affected(variables, index, old_value):
+                if other_index == index:
+                    continue
+                conflicts = constraint.conflicts(variables, other_index)
+                if conflicts != counts[other_index]:
+                    self._update(other_index, conflicts - counts[other_index])
+                    counts[other_index] = conflicts
+            counts[index] = constraint.conflicts(variables, index)
+
+        self._update(index, self._cost(index) - self._conflicts[index])
+
+    def _update(self, index: int, delta: int):
+        self._conflicts[index] += delta
+        self._total += delta
+        if self._conflicts[index]:
+            self._mark(index)
+        else:
+            self._unmark(index)
+
+    # aggiunge la variabile a quelle in conflitto
+    def _mark(self, index: int):
+        if index not in self._conflicted_positions:
+            self._conflicted_positions[index] = len(self._conflicted)
+            self._conflicted.append(index)
+
+    # toglie la variabile da quelle in conflitto, spostando l'ultima al suo posto
+    def _unmark(self, index: int):
+        position = self._conflicted_positions.pop(index, None)
+        if position is None:
+            return
+
+        last = self._conflicted.pop()
+        if last != index:
+            self._conflicted[position] = last
+            self._conflicted_positions[last] = position
@@ -0,0 +1,199 @@
+from typing import List, Dict, Any, Callable, Tuple
+from .domain import BitsetDomain
+
+try:
+    import numpy
+except ImportError:
+    numpy = None  # type: ignore
+
+
+class CompatibilityMatrices:
+    """
+    Matrici di compatibilità dei vincoli binari, calcolate una sola volta sui domini iniziali.
+
+    Per ogni coppia di variabili vincolate (i, j) viene costruita una matrice booleana (numpy)
+    in cui l'elemento [a, b] è True se i = values_i[a] e j = values_j[b] soddisfano
+    tutti i vincoli tra le due variabili, la matrice è salvata in entrambi i versi.
+    Durante la risoluzione le righe delle matrici sostituiscono le chiamate ai vincoli:
+    se il dominio della variabile vincolata è un cspsolver.domain.BitsetDomain
+    ogni riga è anche salvata come maschera di bit, quindi un intero dominio viene
+    filtrato con una sola operazione.
+
+    Parametri
+    -------
+    constraints : cspsolver.constraints.Constraints
+        i vincoli del problema, già compilati
+    variables : List[cspsolver.variable.Variable]
+        le variabili del problema, nell'ordine di compilazione
+    vectorize : bool = True
+        se True ogni vincolo viene prima chiamato una sola volta con due array numpy
+        (funziona per vincoli come lambda a, b: a != b + 1), se il risultato non è
+        una matrice booleana della forma corretta il vincolo viene valutato coppia per coppia.
+        Gli array contengono gli stessi oggetti python dei domini, quindi il risultato
+        è sempre lo stesso della valutazione coppia per coppia.
+        Con False i vincoli vengono sempre valutati coppia per coppia.
+        La vettorizzazione vale solo per i domini numerici: con altri valori (stringhe, tuple, ...)
+        i vincoli vengono valutati coppia per coppia e le matrici accelerano solo la ricerca.
+
+    Errors
+    ------
+    ImportError
+        se numpy non è installato
+    """
+
+    def __init__(self, constraints, variables: List, vectorize: bool = True):
+        if numpy is None:
+            raise ImportError("numpy is required to precompile the constraints, install it with: pip install numpy")
+
+        self._vectorize = vectorize
+        self._values = []
+        self._positions = []
+        self._bitsets = []
+
+        for variable in variables:
+            if isinstance(variable.domain, BitsetDomain):
+                values = variable.domain.table.values
+            else:
+                values = tuple(variable.domain)
+
+            self._values.append(values)
+            self._positions.append({value: position for position, value in enumerate(values)})
+            self._bitsets.append(isinstance(variable.domain, BitsetDomain))
+
+        # matrici numpy e le loro righe come liste python / maschere di bit
+        self.matrices = [{} for _ in variables]  # type: List[Dict[int, Any]]
+        self._rows = [{} for _ in variables]  # type: List[Dict[int, List[List[bool]]]]
+        self._masks = [{} for _ in variables]  # type: List[Dict[int, List[int]]]
+
+        for index_1 in range(len(variables)):
+            for index_2 in constraints.neighbours(index_1):
+                if index_2 > index_1:
+                    matrix = self._evaluate(constraints.get_arc(index_1, index_2), index_1, index_2)
+                    self._store(index_1, index_2, matrix)
+                    self._store(index_2, index_1, numpy.ascontiguousarray(matrix.T))
+
+    # calcola la matrice di compatibilità dei vincoli tra index_1 e index_2
+    def _evaluate(self, arc: Tuple[List[Callable], List[Callable]], index_1: int, index_2: int):
+        values_1 = self._values[index_1]
+        values_2 = self._values[index_2]
+        shape = (len(values_1), len(values_2))
+
+        column_1 = self._as_array(values_1)
+        column_2 = self._as_array(values_2)
+        if column_1 is not None and column_2 is not None:
+            column_1 = column_1[:, None]
+            column_2 = column_2[None, :]
+
+        matrix = numpy.ones(shape, dtype=bool)
+        forward, backward = arc
+
+        for constraint in forward:
+            result = self._apply(constraint, column_1, column_2, shape)
+            if result is None:
+                result = numpy.array([[bool(constraint(value_1, value_2)) for value_2 in values_2] for value_1 in values_1], dtype=bool).reshape(shape)
+            matrix &= result
+
+        for constraint in backward:
+            result = self._apply(constraint, column_2, column_1, shape)
+            if result is None:
+                result = numpy.array([[bool(constraint(value_2, value_1)) for value_2 in values_2] for value_1 in values_1], dtype=bool).reshape(shape)
+            matrix &= result
+
+        return matrix
+
+    # array numpy dei valori, solo per valori numerici (altrimenti None).
+    # L'array è di oggetti python: le operazioni del vincolo hanno la stessa semantica
+    # della chiamata coppia per coppia (interi senza overflow, divisione per zero che solleva un'eccezione,
+    # True + True == 2), quindi le matrici non cambiano mai le soluzioni
+    def _as_array(self, values: Tuple):
+        if not self._vectorize or not values:
+            return None
+
+        try:
+            array = numpy.asarray(values)
+        except (ValueError, TypeError):
+            # valori non omogenei, es. tuple di lunghezza diversa
+            return None
+
+        if array.ndim != 1 or array.dtype.kind not in "biuf":
+            return None
+
+        return numpy.asarray(values, dtype=object)
+
+    # prova a valutare il vincolo con una sola chiamata sugli array,
+    # restituisce None se il vincolo non supporta gli array
+    def _apply(self, constraint: Callable, argument_1, argument_2, shape):
+        if argument_1 is None or argument_2 is None:
+            return None
+
+        try:
+            result = constraint(argument_1, argument_2)
+        except Exception:
+            return None
+
+        if isinstance(result, numpy.ndarray) and result.dtype == bool and result.shape == shape:
+            return result
+
+        return None
+
+    def _store(self, index_1: int, index_2: int, matrix):
+        self.matrices[index_1][index_2] = matrix
+        self._rows[index_1][index_2] = matrix.tolist()
+
+        if self._bitsets[index_2] and matrix.shape[1] > 0:
+            packed = numpy.packbits(matrix, axis=1, bitorder="little")
+            self._masks[index_1][index_2] = [int.from_bytes(row.tobytes(), "little") for row in packed]
+
+    # come Constraints.check
+    def check(self, index_1: int, value_1: Any, index_2: int, value_2: Any) -> bool:
+        rows = self._rows[index_1].get(index_2)
+        if rows is None:
+            return True
+
+        return rows[self._positions[index_1][value_1]][self._positions[index_2][value_2]]
+
+    # come Constraints.has_support
+    def has_support(self, index_1: int, value_1: Any, variable_2) -> bool:
+        index_2 = variable_2.index
+        position = self._positions[index_1][value_1]
+
+        masks = self._masks[index_1].get(index_2)
+        if masks is not None:
+            return masks[position] & variable_2.domain.mask != 0
+
+        rows = self._rows[index_1].get(index_2)
+        if rows is None:
+            return len(variable_2.domain) > 0
+
+        row = rows[position]
+        positions_2 = self._positions[index_2]
+        for value_2 in variable_2.domain:
+            if row[positions_2[value_2]]:
+                return True
+
+        return False
+
+    # come Constraints.unsupported_values
+    def unsupported_values(self, index_1: int, value_1: Any, variable_2) -> List:
+        index_2 = variable_2.index
+        position = self._positions[index_1][value_1]
+
+        masks = self._masks[index_1].get(index_2)
+        if masks is not None:
+            # tutti i valori non supportati del dominio con una sola operazione
+            removed = variable_2.domain.mask & ~masks[position]
+            values = self._values[index_2]
+            unsupported = []
+            while removed:
+                low = removed & -removed
+                unsupported.append(values[low.bit_length() - 1])
+                removed ^= low
+            return unsupported
+
+        rows = self._rows[index_1].get(index_2)
+        if rows is None:
+            return []
+
+        row = rows[position]
+        positions_2 = self._positions[index_2]
+        return [value_2 for value_2 in variable_2.domain if not row[positions_2[value_2]]]
@@ -1,44 +1,66 @@
-from typing import List, Optional
+from typing import List, Optional, Dict, Any
 from collections import OrderedDict
 from .variable import Variable
 
 class Node:
     def __init__(self, parent: Optional["Node"], variables: List[Variable]):
         self._variables = OrderedDict()
+        # le variabili anche come lista, per l'accesso per indice in O(1)
+        self._variables_list = []  # type: List[Variable]
         self.parent = parent
         self.children = []
         self.solution = False
         self.failure = False
         self._node_consistent = parent.is_node_consistent() if parent else False
+        self._arc_consistent = parent.is_arc_consistent() if parent else False
+        # arc-consistenza prima dell'ultimo assegnamento, vedi assign_variable
+        self._arc_consistent_before_assignment = False
         self._last_assigned_variable = Variable.Null()
+        self._trail = None
 
         for variable in variables:
             self.add_variable(variable)
 
     # aggiunge una variabile al nodo
     def add_variable(self, variable: Variable):
+        if variable.name in self._variables:
+            self._variables_list[self._variables_list.index(self._variables[variable.name])] = variable
+        else:
+            self._variables_list.append(variable)
         self._variables[variable.name] = variable
     
     # aggiunge un nodo figlio
     def add_child(self, child: "Node"):
         self.children.append(child)
 
-    # restituisce la lista delle variabili
-    def get_variables(self):
-        return list(self._variables.values())
+    # restituisce la lista delle variabili (la lista non va modificata)
+    def get_variables(self) -> List[Variable]:
+        return self._variables_list
 
     # assegna un valore ad una variabile
+    # l'assegnamento rende il nodo non più arc-consistente,
+    # ma ricorda se lo era prima (in quel caso basta propagare a partire dalla variabile assegnata)
     def assign_variable(self, name: str, value):
-        self._last_assigned_variable = self.get_variable_by_name(name)
+        self._set_attribute("_arc_consistent_before_assignment", self._arc_consistent)
+        self._set_attribute("_arc_consistent", False)
+        self._set_attribute("_last_assigned_variable", self.get_variable_by_name(name))
         self._last_assigned_variable.assign_value(value)
 
-    # restituisce una variabile dato il nome
+    # restituisce una variabile dato il nome, None se non esiste
     def get_variable_by_name(self, name : str):
-        return self._variables[name]
+        return self._variables.get(name)
 
     # restituisce una variabile dato l'indice
     def get_variable_by_index(self, index : int):
-        return list(self._variables.items())[index][1]
+        return self._variables_list[index]
+
+    # restituisce l'assegnamento delle variabili come dizionario {nome: valore}
+    def get_assignment(self) -> Dict[str, Any]:
+        return {name: variable.value for name, variable in self._variables.items()}
+
+    # restituisce il trail collegato al nodo, None se il nodo non è condiviso
+    def get_trail(self):
+        return self._trail
 
     def get_last_assigned_variable(self) -> Variable:
         return self._last_assigned_variable
@@ -56,11 +78,38 @@ class Node:
         self.solution = True
 
     def set_node_consistent(self):
-        self._node_consistent = True
+        self._set_attribute("_node_consistent", True)
 
     def is_node_consistent(self) -> bool:
         return self._node_consistent
+
+    def set_arc_consistent(self):
+        self._set_attribute("_arc_consistent", True)
+
+    def is_arc_consistent(self) -> bool:
+        return self._arc_consistent
+
+    # True se il nodo era arc-consistente prima dell'ultimo assegnamento
+    def was_arc_consistent(self) -> bool:
+        return self._arc_consistent_before_assignment
+
+    # restituisce una copia di questo nodo da inserire nell'albero di decisione come figlio di parent,
+    # utilizzato quando le variabili sono condivise tramite il trail
+    def snapshot(self, parent: Optional["Node"]) -> "Node":
+        node = Node(parent, [variable.copy() for variable in self.get_variables()])
+        node._node_consistent = self._node_consistent
+        node._arc_consistent = self._arc_consistent
+        node._arc_consistent_before_assignment = self._arc_consistent_before_assignment
+        if self._last_assigned_variable.name:
+            node._last_assigned_variable = node.get_variable_by_name(self._last_assigned_variable.name)
+        return node
     
+    # modifica un attributo del nodo registrandolo sul trail (se presente)
+    def _set_attribute(self, name: str, value):
+        if self._trail is not None:
+            self._trail.record_attribute(self, name, getattr(self, name))
+        setattr(self, name, value)
+
     def __str__(self):
         string = ""
         if self.solution:
@@ -0,0 +1,97 @@
+from typing import Dict, List, Tuple, Any, Optional
+from collections import OrderedDict
+
+
+class NogoodStore:
+    """
+    Archivio dei nogood appresi durante la ricerca: assegnamenti parziali
+    {variabile: valore} che non possono essere estesi ad una soluzione.
+
+    Ogni nogood è una tupla di letterali (indice della variabile, valore), indicizzata
+    per letterale, quindi quando una variabile viene assegnata si verificano solo
+    i nogood che contengono quell'assegnamento (i nogood non vengono propagati
+    ai domini delle variabili non assegnate). L'archivio ha una capacità massima:
+    quando è pieno viene eliminato il nogood utilizzato meno di recente (LRU),
+    ogni nogood torna in fondo alla coda quando viene appreso o quando taglia un ramo.
+    I valori dei domini devono essere hashable.
+
+    Parametri
+    -------
+    capacity : int
+        numero massimo di nogood conservati
+    """
+
+    def __init__(self, capacity: int):
+        if capacity < 1:
+            raise ValueError("The capacity of a nogood store must be at least 1.")
+
+        self.capacity = capacity
+        # nogood nell'ordine di utilizzo, il primo è il meno recente
+        self._nogoods = OrderedDict()  # type: OrderedDict[Tuple[Tuple[int, Any], ...], None]
+        # letterale (indice, valore) -> nogood che lo contengono
+        self._watches = {}  # type: Dict[Tuple[int, Any], Dict[Tuple[Tuple[int, Any], ...], None]]
+        self.learned = 0
+        self.hits = 0
+        self.evicted = 0
+
+    def __len__(self):
+        return len(self._nogoods)
+
+    def __contains__(self, nogood: Tuple[Tuple[int, Any], ...]):
+        return tuple(sorted(nogood, key=_literal_key)) in self._nogoods
+
+    def add(self, nogood: List[Tuple[int, Any]]):
+        """
+        Aggiunge un nogood (lista di letterali (indice della variabile, valore)),
+        il nogood vuoto non viene salvato.
+        """
+        if not nogood:
+            return
+
+        key = tuple(sorted(nogood, key=_literal_key))
+        if key in self._nogoods:
+            self._nogoods.move_to_end(key)
+            return
+
+        self._nogoods[key] = None
+        for literal in key:
+            self._watches.setdefault(literal, {})[key] = None
+        self.learned += 1
+
+        if len(self._nogoods) > self.capacity:
+            oldest, _ = self._nogoods.popitem(last=False)
+            for literal in oldest:
+                watches = self._watches[literal]
+                del watches[oldest]
+                if not watches:
+                    del self._watches[literal]
+            self.evicted += 1
+
+    def find(self, variables: List, index: int, value: Any) -> Optional[Tuple[Tuple[int, Any], ...]]:
+        """
+        Restituisce un nogood violato dall'assegnamento variables[index] = value,
+        ovvero che contiene il letterale (index, value) e le cui altre variabili
+        sono assegnate ai valori del nogood, None se non ce ne sono.
+        """
+        watches = self._watches.get((index, value))
+        if not watches:
+            return None
+
+        for nogood in watches:
+            for other_index, other_value in nogood:
+                if other_index != index and variables[other_index].value != other_value:
+                    break
+            else:
+                self._nogoods.move_to_end(nogood)
+                self.hits += 1
+                return nogood
+
+        return None
+
+    # restituisce i nogood salvati, dal meno recente
+    def get_nogoods(self) -> List[Tuple[Tuple[int, Any], ...]]:
+        return list(self._nogoods)
+
+
+def _literal_key(literal: Tuple[int, Any]):
+    return literal[0]
@@ -0,0 +1,141 @@
+from typing import Callable, Dict, Any, Optional, Iterator, Union, TextIO
+from functools import wraps
+import math
+from .node import Node
+from .trace import TraceSink, MESSAGE
+
+
+class SumObjective:
+    """
+    Funzione obiettivo separabile: la somma di un costo per ogni variabile,
+    con i limiti calcolati automaticamente per il branch and bound
+    (per le variabili non assegnate il costo minimo, o massimo, sul dominio attuale).
+
+    Esempio
+    -------
+      # minimizzo a + 2 * b
+      objective = SumObjective({"a": lambda a: a, "b": lambda b: 2 * b})
+      for solution in solver.minimize(objective):
+          print(solution, objective(solution))
+
+    Parametri
+    -------
+    costs : Dict[str, Callable[[Any], float]]
+        per ogni variabile la funzione che restituisce il costo di un valore,
+        le variabili non presenti non hanno costo
+    """
+
+    def __init__(self, costs: Dict[str, Callable[[Any], float]]):
+        self.costs = dict(costs)
+
+    # valore dell'obiettivo su un assegnamento completo {nome variabile: valore}
+    def __call__(self, assignment: Dict[str, Any]) -> float:
+        return sum(cost(assignment[name]) for name, cost in self.costs.items())
+
+    # limite inferiore del costo di qualsiasi soluzione che estende il nodo
+    def bound(self, node: Node) -> float:
+        return self._bound(node, min)
+
+    # limite superiore del costo di qualsiasi soluzione che estende il nodo
+    def upper_bound(self, node: Node) -> float:
+        return self._bound(node, max)
+
+    def _bound(self, node: Node, best: Callable) -> float:
+        total = 0  # type: float
+        for name, cost in self.costs.items():
+            variable = node.get_variable_by_name(name)
+            if variable.value is not None:
+                total += cost(variable.value)
+            elif variable.domain:
+                total += best(cost(value) for value in variable.domain)
+        return total
+
+
+def minimize(solver, objective: Callable[[Dict[str, Any]], float], bound: Optional[Callable[[Node], float]] = None,
+             target: Union[None, TextIO, TraceSink] = None, trail: bool = False, statistics: bool = False,
+             callback: Optional[Callable] = None, timeout: Optional[float] = None, max_nodes: Optional[int] = None,
+             max_backtracks: Optional[int] = None) -> Iterator[Dict[str, Any]]:
+    """
+    Branch and bound in profondità: la ricerca è quella di CSPSolver.iter_solutions,
+    ma dopo l'algoritmo ogni nodo viene scartato (come un fallimento) se il limite inferiore
+    del costo delle sue soluzioni (bound) non è minore del costo della migliore soluzione trovata,
+    e ogni soluzione viene accettata solo se migliora la precedente.
+    Vengono restituite le soluzioni man mano che migliorano, l'ultima è ottima
+    (se la ricerca non è stata fermata da un limite, vedi CSPSolver.status).
+
+    Parametri
+    -------
+    solver : cspsolver.CSPSolver
+        il problema da risolvere
+    objective : Callable[[Dict[str, Any]], float]
+        costo di un assegnamento completo {nome variabile: valore}
+    bound : Callable[[Node], float] = None
+        limite inferiore del costo di qualsiasi soluzione che estende il nodo (deve essere ammissibile,
+        mai maggiore del costo vero), se None viene utilizzato objective.bound se esiste
+        (es. cspsolver.optimize.SumObjective), altrimenti i nodi vengono scartati solo quando sono completi
+    target, trail, statistics, callback, timeout, max_nodes, max_backtracks
+        vedi CSPSolver.solve
+
+    Return
+    -------
+    Iterator[Dict[str, Any]]
+        le soluzioni, ognuna con costo minore della precedente
+    """
+    if bound is None:
+        bound = getattr(objective, "bound", None)
+
+    # costo della migliore soluzione trovata, condiviso con l'algoritmo
+    incumbent = [math.inf]
+    algorithm = _bounded(solver._algorithm, objective, bound, incumbent, len(solver.get_root().get_variables()))
+
+    solver._search = solver._new_search(False, target, trail, "off", statistics, callback,
+                                        timeout=timeout, max_nodes=max_nodes, max_backtracks=max_backtracks,
+                                        algorithm=algorithm)
+    return _improving(solver._search.solutions(), objective, incumbent)
+
+
+def maximize(solver, objective: Callable[[Dict[str, Any]], float], bound: Optional[Callable[[Node], float]] = None,
+             **options) -> Iterator[Dict[str, Any]]:
+    """
+    Come minimize, ma cerca la soluzione con il valore di objective più alto:
+    bound deve essere un limite superiore del valore di qualsiasi soluzione che estende il nodo,
+    se None viene utilizzato objective.upper_bound se esiste.
+    """
+    if bound is None:
+        bound = getattr(objective, "upper_bound", None)
+
+    negated_bound = None
+    if bound is not None:
+        negated_bound = lambda node: -bound(node)
+
+    return minimize(solver, lambda assignment: -objective(assignment), negated_bound, **options)
+
+
+def _improving(solutions: Iterator[Dict[str, Any]], objective: Callable, incumbent: list) -> Iterator[Dict[str, Any]]:
+    for solution in solutions:
+        incumbent[0] = objective(solution)
+        yield solution
+
+
+# l'algoritmo con il taglio dei nodi che non possono migliorare la soluzione migliore
+def _bounded(algorithm: Callable, objective: Callable, bound: Optional[Callable], incumbent: list, n_variables: int) -> Callable:
+
+    @wraps(algorithm)
+    def bounded_algorithm(node: Node, constraints, tree_depth: int, target: Optional[TraceSink]) -> bool:
+        if not algorithm(node, constraints, tree_depth, target):
+            return False
+
+        if tree_depth + 1 == n_variables:
+            cost = objective(node.get_assignment())
+        elif bound is not None:
+            cost = bound(node)
+        else:
+            return True
+
+        if cost >= incumbent[0]:
+            if target: target.emit((MESSAGE, "Costo {0} non migliore della soluzione trovata ({1})".format(cost, incumbent[0])))
+            return False
+
+        return True
+
+    return bounded_algorithm
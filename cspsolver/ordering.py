@@ -0,0 +1,147 @@
+from typing import List, Optional
+from .variable import Variable
+
+
+class VariableQueue:
+    """
+    Coda a bucket delle variabili non assegnate, ordinate per dimensione del dominio,
+    utilizzata dalle politiche che scelgono la variabile con meno valori rimasti
+    (vedi cspsolver.Policy.MinimumRemainingValues).
+
+    Per ogni dimensione del dominio c'è un bucket, una maschera di bit (int) sugli indici
+    delle variabili (variable.index), quindi spostare una variabile costa O(1) e tra le
+    variabili con la stessa dimensione viene scelta quella inserita prima.
+    La coda viene collegata al trail della ricerca (vedi cspsolver.trail.Trail), che la
+    avvisa quando un dominio si riduce o una variabile viene assegnata e quando le modifiche
+    vengono annullate al backtrack, quindi non va mai ricostruita.
+
+    Parametri
+    -------
+    variables : List[cspsolver.variable.Variable]
+        le variabili del nodo condiviso dalla ricerca, con gli indici già compilati
+    """
+
+    def __init__(self, variables: List[Variable]):
+        self._variables = variables
+        self._sizes = [len(variable.domain) for variable in variables]
+        self._buckets = [0] * (max(self._sizes, default=0) + 1)
+        # limite inferiore della dimensione minima tra le variabili in coda
+        self._minimum = 0
+
+        for variable in variables:
+            if variable.value is None:
+                self._buckets[self._sizes[variable.index]] |= 1 << variable.index
+
+    @staticmethod
+    def of(node) -> Optional["VariableQueue"]:
+        """
+        Restituisce la coda collegata al trail del nodo, creandola se non esiste ancora,
+        None se il nodo non è condiviso tramite un trail (ogni nodo è una copia del padre).
+        """
+        trail = node.get_trail()
+        if trail is None:
+            return None
+
+        queue = trail.listener
+        if queue is None:
+            queue = VariableQueue(node.get_variables())
+            trail.listener = queue
+        return queue
+
+    # il dominio di variable ha ora size valori (la variabile può anche essere stata de-assegnata)
+    def resized(self, variable: Variable, size: int):
+        index = variable.index
+        bit = 1 << index
+        self._buckets[self._sizes[index]] &= ~bit
+        self._sizes[index] = size
+
+        if variable.value is None:
+            self._buckets[size] |= bit
+            if size < self._minimum:
+                self._minimum = size
+
+    # la variabile sta per essere assegnata: esce dalla coda
+    def assigned(self, variable: Variable):
+        index = variable.index
+        self._buckets[self._sizes[index]] &= ~(1 << index)
+
+    # restituisce la maschera delle variabili non assegnate con il dominio più piccolo
+    def minimum(self) -> int:
+        buckets = self._buckets
+        size = self._minimum
+        while size < len(buckets) and not buckets[size]:
+            size += 1
+
+        self._minimum = size
+        return buckets[size] if size < len(buckets) else 0
+
+    # restituisce la variabile non assegnata con meno valori rimasti nel dominio
+    def get_minimum(self) -> Variable:
+        mask = self.minimum()
+        if not mask:
+            return Variable.Null()
+        return self._variables[(mask & -mask).bit_length() - 1]
+
+    # restituisce le variabili della maschera, nell'ordine di inserimento
+    def variables(self, mask: int) -> List[Variable]:
+        variables = []
+        while mask:
+            low = mask & -mask
+            variables.append(self._variables[low.bit_length() - 1])
+            mask ^= low
+        return variables
+
+
+class ConflictWeights:
+    """
+    Stato delle politiche adattive (vedi cspsolver.Policy.DomainOverWeightedDegree
+    e cspsolver.Policy.ActivityBased), mantenuto per tutta la ricerca.
+
+    Ogni vincolo (arco o vincolo globale) parte con peso 1, il peso viene incrementato
+    ogni volta che il vincolo svuota un dominio (o fallisce la verifica), vedi
+    Constraints.record_failure. Il grado pesato di una variabile è la somma dei pesi
+    dei suoi vincoli, anche di quelli con tutte le altre variabili già assegnate:
+    viene salvato solo il grado pesato (variable_weights), aggiornato ad ogni fallimento
+    per tutte le variabili del vincolo.
+
+    L'attività di una variabile viene incrementata ad ogni passo in cui il suo dominio
+    si riduce e moltiplicata per ACTIVITY_DECAY ad ogni passo (solo se tracks_activity è True).
+
+    Parametri
+    -------
+    constraints : cspsolver.constraints.Constraints
+        i vincoli del problema, già compilati
+    n_variables : int
+        il numero di variabili del problema
+    """
+
+    # fattore di decadimento dell'attività ad ogni passo
+    ACTIVITY_DECAY = 0.999
+
+    def __init__(self, constraints, n_variables: int):
+        # grado pesato di ogni variabile: inizialmente il numero dei suoi vincoli
+        self.variable_weights = [len(constraints.neighbours(index)) + len(constraints.get_globals(index))
+                                 for index in range(n_variables)]
+        self.activity = [0.0] * n_variables
+        self.tracks_activity = False
+
+    # l'arco tra le due variabili ha svuotato un dominio
+    def arc_failure(self, index_1: int, index_2: int):
+        self.variable_weights[index_1] += 1
+        self.variable_weights[index_2] += 1
+
+    # il vincolo globale ha svuotato un dominio
+    def global_failure(self, constraint):
+        for index in constraint.indices:
+            self.variable_weights[index] += 1
+
+    # aggiorna l'attività dopo un passo, sizes sono le dimensioni dei domini prima del passo
+    def update_activity(self, variables: List[Variable], sizes: List[int]):
+        activity = self.activity
+        decay = self.ACTIVITY_DECAY
+        for variable in variables:
+            index = variable.index
+            value = activity[index] * decay
+            if len(variable.domain) < sizes[index]:
+                value += 1.0
+            activity[index] = value
@@ -0,0 +1,203 @@
+from typing import Dict, List, Any, Optional, Set, cast
+from concurrent.futures import ProcessPoolExecutor, FIRST_COMPLETED, wait
+import multiprocessing
+import os
+import pickle
+import threading
+from copy import deepcopy
+from .search import Search
+
+# stato del processo worker, inizializzato da _init_worker
+_worker = {}  # type: Dict[str, Any]
+
+
+class _Model:
+    # descrizione del problema da inviare ai processi worker:
+    # variabili, vincoli e configurazione del solver.
+    # Con names solo il sottoproblema su quelle variabili (vedi cspsolver.structure),
+    # i vincoli globali vengono copiati perchè la compilazione ne modifica gli indici
+    def __init__(self, solver, names: Optional[Set[str]] = None):
+        self.variables = [(variable.name, list(variable.domain)) for variable in solver._root.get_variables()
+                          if names is None or variable.name in names]
+        self.constraints = [(constraint_names, list(constraints))
+                            for constraint_names, constraints in solver._constraints._constraints.items()
+                            if names is None or names.issuperset(constraint_names)]
+        if names is None:
+            self.global_constraints = list(solver._constraints.get_globals())
+        else:
+            self.global_constraints = [deepcopy(constraint) for constraint in solver._constraints.get_globals()
+                                       if names.issuperset(constraint.names)]
+        self.algorithm = solver._algorithm
+        self.policy = solver._policy
+        self.value_order = solver._value_order
+        self.compact_domains = solver._compact_domains
+        self.precompile = solver._precompile
+
+    def build(self):
+        from .cspsolver import CSPSolver
+
+        solver = CSPSolver(self.algorithm, self.policy, compact_domains=self.compact_domains, precompile=self.precompile,
+                           value_order=self.value_order)
+        for name, domain in self.variables:
+            solver.add_variable(name, domain)
+        for names, constraints in self.constraints:
+            for constraint in constraints:
+                solver.add_constraint(names, constraint)
+        for constraint in self.global_constraints:
+            solver._constraints.add_global(constraint)
+        solver._compile()
+        return solver
+
+
+def solve_parallel(solver, workers: Optional[int] = None, split_depth: Optional[int] = None,
+                   one_solution: bool = True, trail: bool = True) -> List[Dict[str, Any]]:
+    """
+    Risolve il problema dividendo l'albero di decisione in sottoproblemi indipendenti,
+    risolti in parallelo da un pool di processi (concurrent.futures.ProcessPoolExecutor).
+
+    Ogni sottoproblema è un assegnamento consistente delle prime split_depth variabili
+    (scelte dalla politica del solver), nel worker i domini di queste variabili
+    vengono ridotti al valore assegnato e il resto del problema viene risolto normalmente.
+
+    Il problema viene inviato ai worker tramite fork, quindi i vincoli possono essere lambda.
+    Dove fork non è disponibile (es. Windows) il problema viene serializzato con pickle:
+    in quel caso i vincoli devono essere funzioni definite a livello di modulo.
+
+    Parametri
+    -------
+    solver : cspsolver.CSPSolver
+        il problema da risolvere
+    workers : int = None
+        numero di processi, di default il numero di cpu
+    split_depth : int = None
+        profondità a cui dividere l'albero di decisione (0 o più), di default la più piccola
+        profondità con almeno 4 sottoproblemi per ogni processo.
+        Con 0 il problema non viene diviso: viene risolto da un solo processo
+    one_solution : bool = True
+        se True la ricerca si ferma (in tutti i processi) alla prima soluzione trovata
+    trail : bool = True
+        vedi CSPSolver.solve
+
+    Return
+    -------
+    List[Dict[str, Any]]
+        le soluzioni come dizionari {nome variabile: valore}
+
+    Errors
+    ------
+    ValueError
+        se split_depth è negativo,
+        o se fork non è disponibile e il problema non può essere serializzato
+    """
+    if split_depth is not None and split_depth < 0:
+        raise ValueError("split_depth must be 0 or more.")
+
+    workers = workers or os.cpu_count() or 1
+    model = _Model(solver)
+    context = _context(model)
+
+    solver._compile()
+    subproblems = _split(solver, workers, split_depth, trail)
+
+    solutions = [[] for _ in subproblems]  # type: List[List[Dict[str, Any]]]
+    stop = context.Event()
+
+    with ProcessPoolExecutor(max_workers=workers, mp_context=context,
+                             initializer=_init_worker, initargs=(model, stop)) as executor:
+        futures = {executor.submit(_solve_subproblem, subproblem, one_solution, trail): index
+                   for index, subproblem in enumerate(subproblems)}
+        pending = set(futures)
+
+        while pending:
+            done, pending = wait(pending, return_when=FIRST_COMPLETED)
+            for future in done:
+                if future.cancelled():
+                    continue
+                solutions[futures[future]] = future.result()
+
+            # prima soluzione trovata: fermo tutti i processi
+            if one_solution and any(solutions):
+                stop.set()
+                for future in pending:
+                    future.cancel()
+
+    # le soluzioni vengono unite nell'ordine dei sottoproblemi
+    merged = [solution for subproblem_solutions in solutions for solution in subproblem_solutions]
+    return merged[:1] if one_solution else merged
+
+
+# contesto dei processi worker: fork se disponibile (il problema non viene serializzato),
+# altrimenti il problema deve poter essere serializzato con pickle
+def _context(model):
+    if "fork" in multiprocessing.get_all_start_methods():
+        return multiprocessing.get_context("fork")
+
+    try:
+        pickle.dumps(model)
+    except Exception as error:
+        raise ValueError("The problem cannot be sent to the worker processes (" + str(error) + "), "
+                         "use constraints defined at module level instead of lambdas.")
+    return multiprocessing.get_context()
+
+
+# assegnamenti parziali consistenti delle prime split_depth variabili
+def _split(solver, workers: int, split_depth: Optional[int], trail: bool) -> List[Dict[str, Any]]:
+    # profondità 0: un solo sottoproblema senza variabili assegnate
+    if split_depth == 0:
+        return [{}]
+
+    n_variables = len(solver._root.get_variables())
+    depth = split_depth if split_depth is not None else 1
+
+    while True:
+        search = Search(solver._root, solver._constraints, solver._algorithm, solver._policy,
+                        False, "off", trail, max_depth=depth, value_order=solver._value_order)
+        # senza albero di decisione le soluzioni sono dizionari
+        subproblems = [{name: value for name, value in cast(Dict[str, Any], assignment).items() if value is not None}
+                       for assignment in search.solutions()]
+
+        if split_depth is not None or len(subproblems) >= 4 * workers or depth >= n_variables or not subproblems:
+            return subproblems
+
+        depth += 1
+
+
+def _init_worker(model: _Model, stop):
+    _worker["solver"] = model.build()
+    _worker["search"] = None
+    _worker["stopped"] = False
+
+    # attende il segnale di stop del processo principale e interrompe la ricerca in corso
+    def watch():
+        stop.wait()
+        _worker["stopped"] = True
+        search = _worker["search"]
+        if search is not None:
+            search.interrupt()
+
+    threading.Thread(target=watch, daemon=True).start()
+
+
+def _solve_subproblem(assignment: Dict[str, Any], one_solution: bool, trail: bool) -> List[Dict[str, Any]]:
+    if _worker["stopped"]:
+        return []
+
+    solver = _worker["solver"]
+
+    # riduco il dominio delle variabili del sottoproblema al valore assegnato
+    root = solver._root.snapshot(None)
+    for name, value in assignment.items():
+        variable = root.get_variable_by_name(name)
+        for other_value in list(variable.domain):
+            if other_value != value:
+                variable.delete_value(other_value)
+
+    search = Search(root, solver._constraints, solver._algorithm, solver._policy, one_solution, "off", trail,
+                    value_order=solver._value_order)
+    _worker["search"] = search
+    if _worker["stopped"]:
+        search.interrupt()
+
+    solutions = [cast(Dict[str, Any], solution) for solution in search.solutions()]
+    _worker["search"] = None
+    return solutions
@@ -42,6 +42,17 @@ def draw_constraint_graph(solver: CSPSolver, target = "constraint_graph.pdf"):
                 if cs1 or cs2:
                     graph.add_edges([(index_1, index_2)])
 
+    # i vincoli globali collegano tutte le coppie di variabili nello scope non già collegate
+    indices = {variable.name: index for index, variable in enumerate(solver._root.get_variables())}
+    edges = set(graph.get_edgelist())
+    for constraint in solver._constraints.get_globals():
+        for position, name_1 in enumerate(constraint.names):
+            for name_2 in constraint.names[position + 1:]:
+                edge = tuple(sorted((indices[name_1], indices[name_2])))
+                if edge not in edges:
+                    edges.add(edge)
+                    graph.add_edges([edge])
+
     visual_style = {}
     visual_style["margin"] = 50
     visual_style["vertex_size"] = 24
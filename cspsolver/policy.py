@@ -2,6 +2,7 @@ import math
 from .node import Node
 from .constraints import Constraints
 from .variable import Variable
+from .ordering import VariableQueue
 
 class Policy:
     """
@@ -37,11 +38,19 @@ class Policy:
     def MinimumRemainingValues(node: Node, constraints: Constraints, tree_depth: int) -> Variable:
         """
         Viene restituita la variabile non assegnata con meno valori rimasti nel dominio
+        (a parità di valori quella inserita prima).
+        Se la ricerca usa il trail la variabile viene presa da una coda a bucket aggiornata
+        ad ogni modifica dei domini (vedi cspsolver.ordering.VariableQueue),
+        altrimenti vengono scorse tutte le variabili.
         """
 
+        queue = VariableQueue.of(node)
+        if queue is not None:
+            return queue.get_minimum()
+
         min_values = math.inf
         chosen_variable = Variable.Null()
-        for variable in [v for v in node.get_variables() if not v.value]:
+        for variable in [v for v in node.get_variables() if v.value is None]:
             domain_len = len(variable.domain)
             if domain_len < min_values:
                 min_values = domain_len
@@ -53,14 +62,90 @@ class Policy:
     def MostConstrainedPrinciple(node: Node, constraints: Constraints, tree_depth: int) -> Variable:
         """
         Viene restituita la variabile non assegnata con più vincoli
+        (a parità di vincoli quella inserita prima).
+        Il numero di vincoli di ogni variabile viene calcolato una sola volta alla compilazione
+        dei vincoli, vedi Constraints.get_degree_order.
+        """
+
+        constraints.compile(node.get_variables())
+        variables = node.get_variables()
+        for index in constraints.get_degree_order():
+            variable = variables[index]
+            if variable.value is None:
+                return variable
+
+        return Variable.Null()
+
+    @staticmethod
+    def MinimumRemainingValuesDegree(node: Node, constraints: Constraints, tree_depth: int) -> Variable:
+        """
+        Viene restituita la variabile non assegnata con meno valori rimasti nel dominio,
+        a parità di valori quella con più vincoli (e poi quella inserita prima).
         """
 
+        constraints.compile(node.get_variables())
+        queue = VariableQueue.of(node)
+        if queue is not None:
+            candidates = queue.variables(queue.minimum())
+        else:
+            unassigned = [v for v in node.get_variables() if v.value is None]
+            min_values = min((len(v.domain) for v in unassigned), default=0)
+            candidates = [v for v in unassigned if len(v.domain) == min_values]
+
         max_constraints = -1
         chosen_variable = Variable.Null()
-        for variable in [v for v in node.get_variables() if not v.value]:
-            n_constraints = len(constraints.get_variable_constraints(variable.name))
+        for variable in candidates:
+            n_constraints = constraints.get_degree(variable.index)
             if n_constraints > max_constraints:
                 max_constraints = n_constraints
                 chosen_variable = variable
 
         return chosen_variable
+
+    @staticmethod
+    def DomainOverWeightedDegree(node: Node, constraints: Constraints, tree_depth: int) -> Variable:
+        """
+        Viene restituita la variabile non assegnata con il rapporto più basso tra
+        il numero di valori rimasti nel dominio e il grado pesato (dom/wdeg):
+        il peso di un vincolo aumenta ogni volta che svuota un dominio durante la ricerca,
+        quindi vengono scelte prima le variabili coinvolte nei conflitti
+        (vedi cspsolver.ordering.ConflictWeights).
+        """
+
+        weights = constraints.get_conflicts().variable_weights
+
+        min_ratio = math.inf
+        chosen_variable = Variable.Null()
+        for variable in node.get_variables():
+            if variable.value is None:
+                ratio = len(variable.domain) / weights[variable.index] if weights[variable.index] else math.inf
+                if ratio < min_ratio or chosen_variable.name == "":
+                    min_ratio = ratio
+                    chosen_variable = variable
+
+        return chosen_variable
+
+    @staticmethod
+    def ActivityBased(node: Node, constraints: Constraints, tree_depth: int) -> Variable:
+        """
+        Viene restituita la variabile non assegnata con il rapporto più alto tra l'attività
+        e il numero di valori rimasti nel dominio (a parità di rapporto quella con meno valori):
+        l'attività di una variabile aumenta ogni volta che il suo dominio viene ridotto
+        e decade ad ogni passo (vedi cspsolver.ordering.ConflictWeights).
+        """
+
+        conflicts = constraints.get_conflicts()
+        conflicts.tracks_activity = True
+        activity = conflicts.activity
+
+        best = None
+        chosen_variable = Variable.Null()
+        for variable in node.get_variables():
+            if variable.value is None:
+                domain_len = len(variable.domain)
+                key = (activity[variable.index] / domain_len if domain_len else math.inf, -domain_len)
+                if best is None or key > best:
+                    best = key
+                    chosen_variable = variable
+
+        return chosen_variable
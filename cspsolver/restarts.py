@@ -0,0 +1,86 @@
+from typing import Iterator, Iterable
+
+
+class Restart:
+    """
+    Strategie di riavvio della ricerca (vedi CSPSolver.solve(restarts=...)):
+    la ricerca riparte dalla radice ogni volta che il numero di fallimenti supera una soglia,
+    le soglie successive sono date da una sequenza crescente, quindi la ricerca resta completa.
+    Ha senso insieme ad un ordinamento dei valori casuale (cspsolver.ValueOrder.Random)
+    o ad una politica adattiva (es. cspsolver.Policy.DomainOverWeightedDegree),
+    i cui pesi vengono mantenuti tra un riavvio e l'altro.
+
+    Ogni strategia è un Iterable[int] di soglie, ogni iterazione riparte dalla prima soglia.
+    """
+
+    @staticmethod
+    def Luby(scale: int = 100) -> Iterable[int]:
+        """
+        Soglie secondo la sequenza di Luby moltiplicata per scale: scale * (1, 1, 2, 1, 1, 2, 4, 1, ...).
+
+        Parametri
+        -------
+        scale : int = 100
+            numero di fallimenti dell'unità della sequenza
+        """
+        if scale < 1:
+            raise ValueError("The scale of a restart strategy must be at least 1.")
+        return _Luby(scale)
+
+    @staticmethod
+    def Geometric(base: int = 100, factor: float = 1.5) -> Iterable[int]:
+        """
+        Soglie in progressione geometrica: base, base * factor, base * factor^2, ...
+
+        Parametri
+        -------
+        base : int = 100
+            numero di fallimenti prima del primo riavvio
+        factor : float = 1.5
+            fattore di crescita delle soglie, maggiore di 1
+        """
+        if base < 1 or factor <= 1:
+            raise ValueError("A geometric restart strategy needs base >= 1 and factor > 1.")
+        return _Geometric(base, factor)
+
+
+class _Luby:
+    def __init__(self, scale: int):
+        self.scale = scale
+
+    def __iter__(self) -> Iterator[int]:
+        index = 1
+        while True:
+            yield self.scale * luby(index)
+            index += 1
+
+    def __repr__(self):
+        return "Restart.Luby({0})".format(self.scale)
+
+
+class _Geometric:
+    def __init__(self, base: int, factor: float):
+        self.base = base
+        self.factor = factor
+
+    def __iter__(self) -> Iterator[int]:
+        cutoff = float(self.base)
+        while True:
+            yield int(cutoff)
+            cutoff *= self.factor
+
+    def __repr__(self):
+        return "Restart.Geometric({0}, {1})".format(self.base, self.factor)
+
+
+def luby(index: int) -> int:
+    """
+    Restituisce l'index-esimo elemento (da 1) della sequenza di Luby: 1, 1, 2, 1, 1, 2, 4, 1, 1, 2, ...
+    """
+    # k tale che 2^(k-1) <= index < 2^k
+    k = index.bit_length()
+    while True:
+        if index == (1 << k) - 1:
+            return 1 << (k - 1)
+        index -= (1 << (k - 1)) - 1
+        k = index.bit_length()
@@ -0,0 +1,476 @@
+from typing import Callable, List, Optional, Iterator, Iterable, Union, Dict, Any, Set, Tuple
+from copy import deepcopy
+from time import perf_counter
+from .node import Node
+from .constraints import Constraints
+from .trail import Trail
+from .statistics import Statistics
+from .nogoods import NogoodStore
+from .trace import TraceSink, ASSIGN, FAIL, SOLUTION, MESSAGE
+
+
+class Status:
+    """
+    Esito di una ricerca (vedi CSPSolver.status).
+    """
+    # l'albero di decisione è stato esplorato completamente (o fino alla prima soluzione),
+    # se non ci sono soluzioni il problema non ha soluzione
+    COMPLETE = "complete"
+    # la ricerca è stata fermata da un limite (tempo, nodi o backtrack): non si sa se esistono
+    # (altre) soluzioni, sono disponibili quelle trovate e le statistiche raccolte fino a quel momento
+    LIMIT_REACHED = "limit_reached"
+    # la ricerca è stata interrotta con interrupt()
+    INTERRUPTED = "interrupted"
+
+
+class _Frame:
+    # un livello dell'albero di decisione: la variabile scelta dalla politica e i valori ancora da provare
+    # con il backjumping (o i nogood) anche l'insieme dei conflitti (profondità delle variabili responsabili dei fallimenti),
+    # se il dominio della variabile era già stato ridotto dagli assegnamenti precedenti
+    # e se nel sottoalbero è stata trovata una soluzione (si torna indietro in ordine cronologico)
+    __slots__ = ("node", "tree_node", "depth", "variable_name", "values", "position", "child",
+                 "index", "conflicts", "pruned", "chronological")
+
+    def __init__(self, node: Node, tree_node: Optional[Node], depth: int, variable_name: str, values: List):
+        self.node = node
+        self.tree_node = tree_node
+        self.depth = depth
+        self.variable_name = variable_name
+        self.values = values
+        self.position = 0
+        self.child = None  # type: Optional[Node]
+        self.index = -1
+        self.conflicts = set()  # type: Set[int]
+        self.pruned = False
+        self.chronological = False
+
+
+class Search:
+    """
+    Motore di ricerca iterativo: l'albero di decisione viene esplorato in profondità
+    con uno stack esplicito invece che con la ricorsione, quindi non c'è limite
+    al numero di variabili (oltre a quello della memoria).
+    Le soluzioni vengono restituite da solutions() man mano che vengono trovate,
+    la ricerca può essere interrotta tra un passo e l'altro con interrupt().
+
+    Parametri
+    -------
+    root : cspsolver.node.Node
+        il nodo radice del problema, non viene modificato
+    constraints : cspsolver.constraints.Constraints
+        i vincoli del problema, già compilati
+    algorithm : Callable[[Node, Constraints, int, Optional[TraceSink]], bool]
+        vedi cspsolver.Algorithm
+    policy : Callable[[Node, Constraints, int], Variable]
+        vedi cspsolver.Policy
+    one_solution : bool
+        se True la ricerca si ferma alla prima soluzione
+    record_tree : str
+        "off", "failures" o "full", vedi CSPSolver.solve
+    trail : bool
+        se True le variabili vivono in un unico nodo e le modifiche vengono annullate
+        con un cspsolver.trail.Trail, altrimenti ogni figlio è una copia del padre
+    target : cspsolver.trace.TraceSink = None
+        dove inviare gli eventi della risoluzione
+    max_depth : int = None
+        se indicato, i nodi consistenti a questa profondità vengono restituiti come soluzioni
+        (con le sole variabili assegnate fino a quel punto) senza esplorarne il sottoalbero,
+        utilizzato per dividere il problema in sottoproblemi indipendenti
+    statistics : cspsolver.statistics.Statistics = None
+        se indicato, vengono raccolte le statistiche della ricerca
+        (algoritmo, politica e vincoli vengono misurati solo in questo caso)
+    callback : Callable[[Statistics], None] = None
+        chiamata con le statistiche ogni Statistics.CALLBACK_INTERVAL nodi,
+        ad ogni soluzione e alla fine della ricerca
+    value_order : Callable[[Node, Constraints, Variable], List] = None
+        vedi cspsolver.ValueOrder, se None i valori vengono provati nell'ordine del dominio
+    backjumping : bool = False
+        se True, quando i valori di una variabile sono esauriti la ricerca torna direttamente
+        all'ultima variabile responsabile dei fallimenti (conflict-directed backjumping),
+        invece che alla variabile precedente. I fallimenti vengono attribuiti ai vincoli
+        segnalati dall'algoritmo (vedi Constraints.record_failure), quindi è corretto solo
+        con algoritmi che eliminano valori a partire dalle variabili assegnate
+        (StandardBacktracking e ForwardChecking)
+    nogoods : cspsolver.nogoods.NogoodStore = None
+        se indicato, quando i valori di una variabile sono esauriti l'assegnamento delle variabili
+        responsabili (come per il backjumping) viene salvato come nogood, e ogni assegnamento
+        che completa un nogood salvato fallisce senza applicare l'algoritmo.
+        Valgono le stesse limitazioni sugli algoritmi del backjumping
+    timeout : float = None
+        se indicato, la ricerca si ferma dopo timeout secondi
+    max_nodes : int = None
+        se indicato, la ricerca si ferma dopo aver creato max_nodes nodi
+    max_backtracks : int = None
+        se indicato, la ricerca si ferma dopo max_backtracks backtrack
+    restarts : Iterable[int] = None
+        soglie di fallimenti dopo le quali la ricerca riparte dalla radice, vedi cspsolver.Restart.
+        Se le soglie finiscono la ricerca prosegue fino alla fine senza altri riavvii.
+        Ha senso solo se la ricerca si ferma alla prima soluzione
+    """
+
+    def __init__(self, root: Node, constraints: Constraints, algorithm: Callable, policy: Callable,
+                 one_solution: bool, record_tree: str, trail: bool, target: Optional[TraceSink] = None,
+                 max_depth: Optional[int] = None, statistics: Optional[Statistics] = None,
+                 callback: Optional[Callable[[Statistics], None]] = None, value_order: Optional[Callable] = None,
+                 backjumping: bool = False, nogoods: Optional[NogoodStore] = None,
+                 timeout: Optional[float] = None, max_nodes: Optional[int] = None, max_backtracks: Optional[int] = None,
+                 restarts: Optional[Iterable[int]] = None):
+        self._root = root
+        self._constraints = constraints
+        self._algorithm = algorithm
+        self._policy = policy
+        self._value_order = value_order
+        self._statistics = statistics
+        self._callback = callback
+        if statistics is not None:
+            self._algorithm = statistics.wrap_algorithm(algorithm)
+            self._policy = statistics.wrap_policy(policy)
+        self._one_solution = one_solution
+        self._record_tree = record_tree
+        self._target = target
+        self._trail = Trail() if trail else None
+        self._max_depth = max_depth
+        self._backjumping = backjumping
+        self._nogoods = nogoods
+        # l'analisi dei conflitti serve sia al backjumping che ai nogood
+        self._analysis = backjumping or nogoods is not None
+        # per l'analisi dei conflitti: profondità a cui è assegnata ogni variabile, variabili vincolate con ogni variabile
+        # (anche tramite vincoli globali) e dimensione iniziale dei domini
+        self._depths = {}  # type: Dict[int, int]
+        self._conflict_neighbours = []  # type: List[List[int]]
+        self._initial_sizes = []  # type: List[int]
+        self._timeout = timeout
+        self._max_nodes = max_nodes
+        self._max_backtracks = max_backtracks
+        self._deadline = None  # type: Optional[float]
+        self._restarts = restarts
+        self._interrupted = False
+        self._completed = False
+        self._status = None  # type: Optional[str]
+
+    def interrupt(self):
+        """
+        Interrompe la ricerca prima del prossimo passo,
+        può essere chiamato anche da un altro thread.
+        """
+        self._interrupted = True
+
+    def is_interrupted(self) -> bool:
+        return self._interrupted
+
+    # True se l'albero di decisione è stato esplorato completamente (o fino alla prima soluzione)
+    def is_completed(self) -> bool:
+        return self._completed
+
+    # esito della ricerca (vedi Status), None se la ricerca non è terminata
+    def get_status(self) -> Optional[str]:
+        return self._status
+
+    def get_statistics(self) -> Optional[Statistics]:
+        return self._statistics
+
+    def solutions(self) -> Iterator[Union[Node, Dict[str, Any]]]:
+        """
+        Esplora l'albero di decisione e restituisce le soluzioni man mano che vengono trovate:
+        dei Node se record_tree è "full", altrimenti dei dizionari {nome variabile: valore}.
+        """
+        target = self._target
+        statistics = self._statistics
+        # i pesi delle politiche adattive valgono per una sola ricerca
+        self._constraints.reset_conflicts()
+        if statistics is not None:
+            statistics.attach(self._constraints, self._root.get_variables())
+            statistics.start()
+
+        try:
+            yield from self._explore(target, statistics)
+        finally:
+            if statistics is not None:
+                statistics.stop()
+                statistics.detach(self._constraints)
+                if self._callback: self._callback(statistics)
+
+    def _explore(self, target: Optional[TraceSink], statistics: Optional[Statistics]) -> Iterator[Union[Node, Dict[str, Any]]]:
+        # profondità a cui un nodo consistente è una soluzione
+        solution_depth = len(self._root.get_variables())
+        if self._max_depth is not None:
+            solution_depth = min(solution_depth, self._max_depth)
+
+        if self._trail is not None:
+            # nodo di lavoro condiviso, il nodo radice resta la situazione iniziale
+            node = self._root.snapshot(None)
+            self._trail.attach(node)
+        else:
+            node = self._root
+
+        if self._analysis:
+            self._prepare_conflicts()
+
+        limited = self._timeout is not None or self._max_nodes is not None or self._max_backtracks is not None
+        if self._timeout is not None:
+            self._deadline = perf_counter() + self._timeout
+        limit_reached = False
+        nodes = 0
+        backtracks = 0
+
+        # soglia di fallimenti per il prossimo riavvio (None senza riavvii o quando le soglie sono finite)
+        cutoffs = iter(self._restarts if self._restarts is not None else ())
+        cutoff = next(cutoffs, None)
+        failures = 0
+
+        stack = []
+        if solution_depth:
+            stack.append(self._frame(node, self._root if self._record_tree != "off" else None, 0))
+
+        while stack and not self._interrupted:
+            if limited and self._limit_reached(nodes, backtracks):
+                limit_reached = True
+                if target: target.emit((MESSAGE, "Limite raggiunto, ricerca interrotta"))
+                break
+
+            # troppi fallimenti dall'ultimo riavvio: riparto dalla radice,
+            # i pesi delle politiche adattive e i nogood appresi vengono mantenuti
+            if cutoff is not None and failures >= cutoff:
+                if target: target.emit((MESSAGE, "Riavvio della ricerca dopo {0} fallimenti".format(failures)))
+                if statistics is not None: statistics.restarts += 1
+                if self._trail is not None:
+                    while self._trail.depth():
+                        self._trail.undo()
+                # l'albero di decisione registrato è quello dell'ultimo riavvio
+                self._root.children = []
+                failures = 0
+                cutoff = next(cutoffs, None)
+                stack = [self._frame(node, self._root if self._record_tree != "off" else None, 0)]
+                continue
+
+            frame = stack[-1]
+
+            # valori della variabile esauriti: torno al livello precedente
+            # (o, con il backjumping, all'ultima variabile responsabile dei fallimenti)
+            if frame.position == len(frame.values):
+                stack.pop()
+                jump_depth = self._jump_depth(frame, stack) if self._analysis else frame.depth - 1
+                if stack and target and jump_depth < frame.depth - 1:
+                    name = stack[jump_depth].variable_name if jump_depth >= 0 else "inizio"
+                    target.emit((MESSAGE, "Backjumping da {0} a {1}".format(frame.variable_name, name)))
+
+                while stack:
+                    self._backtrack(stack[-1])
+                    if stack[-1].depth <= jump_depth:
+                        break
+                    stack.pop()
+
+                if stack:
+                    backtracks += 1
+                    if statistics is not None: statistics.backtracks += 1
+                continue
+
+            value = frame.values[frame.position]
+            frame.position += 1
+            depth = frame.depth
+            nodes += 1
+
+            if statistics is not None:
+                statistics.nodes += 1
+                statistics.max_depth = max(statistics.max_depth, depth + 1)
+                if self._callback and statistics.nodes % statistics.CALLBACK_INTERVAL == 0:
+                    self._callback(statistics)
+
+            # Costruiamo il prossimo nodo: una copia del padre oppure lo stesso nodo di lavoro
+            if self._trail is not None:
+                self._trail.mark()
+                child_node = frame.node
+            else:
+                child_node = Node(frame.node, deepcopy(frame.node.get_variables()))
+
+            # Assegna un valore alla variabile da assegnare
+            child_node.assign_variable(frame.variable_name, value)
+
+            if target: target.emit((ASSIGN, frame.variable_name, value))
+
+            # l'assegnamento completa un nogood già appreso: il ramo fallisce senza applicare l'algoritmo
+            nogood = self._nogoods.find(child_node.get_variables(), frame.index, value) if self._nogoods is not None else None
+            if nogood is not None:
+                consistent = False
+                frame.conflicts.update(self._depths[index] for index, _ in nogood if index != frame.index)
+                if target: target.emit((MESSAGE, "{0} = {1} completa un nogood".format(frame.variable_name, value)))
+                if statistics is not None: statistics.nogood_prunes += 1
+            else:
+                # la politica misura quali domini vengono ridotti dall'algoritmo, vedi Policy.ActivityBased
+                activity = self._constraints.tracks_activity()
+                if activity:
+                    sizes = [len(variable.domain) for variable in child_node.get_variables()]
+
+                # Algoritmo applicato al child node: i domini delle variabili non assegnate verranno modificati (a seconda dell'algoritmo scelto)
+                consistent = self._algorithm(child_node, self._constraints, depth, target)
+
+                if activity:
+                    self._constraints.get_conflicts().update_activity(child_node.get_variables(), sizes)
+
+                if self._analysis:
+                    failure = self._constraints.pop_failure()
+                    if not consistent and failure is not None:
+                        frame.conflicts |= self._culprits(child_node, failure)
+
+            frame.child = self._add_to_tree(frame, child_node)
+
+            if consistent:
+                if depth + 1 == solution_depth:
+                    if self._analysis:
+                        # i valori successivi delle variabili sulla pila possono portare ad altre soluzioni:
+                        # da questo punto si torna indietro in ordine cronologico e non si apprendono nogood
+                        for other in stack:
+                            other.chronological = True
+
+                    if statistics is not None:
+                        statistics.solutions += 1
+                        if self._callback: self._callback(statistics)
+                    yield self._solution(frame.child or child_node)
+
+                    # Voglio una sola soluzione: fermo la ricerca
+                    if self._one_solution:
+                        stack.clear()
+                        break
+
+                    self._backtrack(frame)
+                else:
+                    # scendo di un livello, l'assegnamento verrà annullato quando il livello sarà esaurito
+                    stack.append(self._frame(child_node, frame.child, depth + 1))
+            else:
+                # Descrizione del fallimento
+                if target: target.emit((FAIL, frame.variable_name, value))
+                if frame.child: frame.child.set_failure()
+                if statistics is not None: statistics.failures += 1
+                failures += 1
+                self._backtrack(frame)
+
+        if self._trail is not None:
+            self._trail.detach(node)
+
+        self._completed = not self._interrupted and not limit_reached
+        if self._interrupted:
+            self._status = Status.INTERRUPTED
+        elif limit_reached:
+            self._status = Status.LIMIT_REACHED
+        else:
+            self._status = Status.COMPLETE
+
+    # True se è stato raggiunto uno dei limiti della ricerca
+    def _limit_reached(self, nodes: int, backtracks: int) -> bool:
+        if self._max_nodes is not None and nodes >= self._max_nodes:
+            return True
+        if self._max_backtracks is not None and backtracks >= self._max_backtracks:
+            return True
+        return self._deadline is not None and perf_counter() >= self._deadline
+
+    # costruisce il livello successivo scegliendo la variabile da assegnare con la politica
+    def _frame(self, node: Node, tree_node: Optional[Node], depth: int) -> _Frame:
+        variable = self._policy(node, self._constraints, depth)
+        # il dominio può essere modificato (e ripristinato) durante la ricerca, ne salvo una copia
+        if self._value_order is not None:
+            values = self._value_order(node, self._constraints, variable)
+        else:
+            values = list(variable.domain)
+
+        frame = _Frame(node, tree_node, depth, variable.name, values)
+        if self._analysis:
+            frame.index = variable.index
+            frame.pruned = len(variable.domain) < self._initial_sizes[variable.index]
+            self._depths[variable.index] = depth
+        return frame
+
+    def _prepare_conflicts(self):
+        constraints = self._constraints
+        variables = self._root.get_variables()
+        self._initial_sizes = [len(variable.domain) for variable in variables]
+        self._conflict_neighbours = []
+        for variable in variables:
+            neighbours = set(constraints.neighbours(variable.index))
+            for constraint in constraints.get_globals(variable.index):
+                neighbours.update(constraint.indices)
+            neighbours.discard(variable.index)
+            self._conflict_neighbours.append(sorted(neighbours))
+
+    # profondità delle variabili assegnate responsabili del fallimento di un vincolo sulle variabili scope:
+    # le variabili assegnate del vincolo e, per quelle non assegnate (il cui dominio è stato svuotato),
+    # le variabili assegnate vincolate con esse, che possono averne eliminato i valori
+    def _culprits(self, node: Node, scope: Tuple[int, ...]) -> Set[int]:
+        variables = node.get_variables()
+        depths = self._depths
+        culprits = set()
+        for index in scope:
+            if variables[index].value is not None:
+                culprits.add(depths[index])
+            else:
+                for other in self._conflict_neighbours[index]:
+                    if variables[other].value is not None:
+                        culprits.add(depths[other])
+        return culprits
+
+    # i valori della variabile del livello sono esauriti: restituisce la profondità a cui tornare,
+    # con il backjumping la più profonda tra le variabili responsabili, altrimenti la precedente
+    # (-1 se non ci sono variabili responsabili, la ricerca è finita), e le passa alla variabile di quel livello.
+    # L'assegnamento delle variabili responsabili è un nogood
+    def _jump_depth(self, frame: _Frame, stack: List[_Frame]) -> int:
+        if frame.chronological:
+            return frame.depth - 1
+
+        conflicts = frame.conflicts
+        variables = frame.node.get_variables()
+        if frame.pruned:
+            # il dominio è stato ridotto dalle variabili assegnate vincolate con questa
+            for other in self._conflict_neighbours[frame.index]:
+                if variables[other].value is not None:
+                    conflicts.add(self._depths[other])
+
+        conflicts.discard(frame.depth)
+        if self._nogoods is not None:
+            self._nogoods.add([(stack[depth].index, variables[stack[depth].index].value) for depth in conflicts])
+            if self._statistics is not None: self._statistics.nogoods = self._nogoods.learned
+
+        if not conflicts:
+            return -1
+
+        jump_depth = max(conflicts) if self._backjumping else frame.depth - 1
+        conflicts.discard(jump_depth)
+        stack[jump_depth].conflicts |= conflicts
+        return jump_depth
+
+    # inserisce il nodo nell'albero di decisione (se registrato) e lo restituisce
+    def _add_to_tree(self, frame: _Frame, node: Node) -> Optional[Node]:
+        # senza albero registrato i livelli non hanno un nodo dell'albero
+        tree_node = frame.tree_node
+        if tree_node is None:
+            return None
+
+        if self._trail is not None:
+            node = node.snapshot(tree_node)
+
+        tree_node.add_child(node)
+        return node
+
+    # l'ultimo valore provato nel livello è stato esplorato completamente
+    def _backtrack(self, frame: _Frame):
+        if self._trail is not None:
+            self._trail.undo()
+
+        # tengo il figlio solo se nel suo sottoalbero c'è almeno un fallimento
+        if self._record_tree == "failures":
+            child = frame.child
+            tree_node = frame.tree_node
+            if child is not None and tree_node is not None and not child.failure and not child.get_children():
+                tree_node.children.pop()
+
+    # con l'albero completo la soluzione è il nodo stesso,
+    # altrimenti viene salvato solo l'assegnamento
+    def _solution(self, node: Node) -> Union[Node, Dict[str, Any]]:
+        if self._record_tree == "full":
+            node.set_solution()
+            solution = node  # type: Union[Node, Dict[str, Any]]
+        else:
+            solution = node.get_assignment()
+
+        if self._target: self._target.emit((SOLUTION, solution))
+
+        return solution
+
@@ -0,0 +1,213 @@
+from typing import Callable, Dict, List, Any
+from time import perf_counter
+
+# metodi di Constraints sostituiti da attach per contare le verifiche dei vincoli
+_COUNTED = ("check", "check_unary", "has_support", "unsupported_values")
+
+
+class Statistics:
+    """
+    Statistiche raccolte durante la risoluzione (vedi CSPSolver.solve(statistics=True)).
+
+    Attributi
+    -------
+    nodes : int
+        numero di nodi creati, ovvero di assegnamenti provati
+    failures : int
+        numero di assegnamenti falliti
+    backtracks : int
+        numero di volte in cui la ricerca è tornata alla variabile precedente
+    solutions : int
+        numero di soluzioni trovate
+    max_depth : int
+        profondità massima raggiunta nell'albero di decisione
+    nogoods : int
+        numero di nogood appresi (vedi CSPSolver.solve(nogoods=...))
+    nogood_prunes : int
+        numero di assegnamenti scartati perchè completano un nogood
+    restarts : int
+        numero di riavvii della ricerca (vedi CSPSolver.solve(restarts=...))
+    constraint_checks : Dict[Tuple[str, ...], int]
+        numero di verifiche dei vincoli per ogni coppia di variabili (o variabile, per i vincoli unari)
+    pruned : Dict[str, int]
+        numero di valori eliminati dai domini per ogni algoritmo
+    calls : Dict[str, int]
+        numero di chiamate per ogni algoritmo e politica
+    time : Dict[str, float]
+        tempo in secondi speso in ogni algoritmo e politica
+    elapsed : float
+        durata della ricerca in secondi
+    """
+
+    # ogni quanti nodi viene chiamata la callback
+    CALLBACK_INTERVAL = 1000
+
+    def __init__(self):
+        self.nodes = 0
+        self.failures = 0
+        self.backtracks = 0
+        self.solutions = 0
+        self.max_depth = 0
+        self.nogoods = 0
+        self.nogood_prunes = 0
+        self.restarts = 0
+        self.constraint_checks = {}
+        self.pruned = {}
+        self.calls = {}
+        self.time = {}
+        self.elapsed = 0.0
+
+        self._checks = {}
+        self._saved_checks = None
+        self._start = 0.0
+
+    def total_constraint_checks(self) -> int:
+        return sum(self.constraint_checks.values())
+
+    def start(self):
+        self._start = perf_counter()
+
+    def stop(self):
+        self.elapsed += perf_counter() - self._start
+
+    def wrap_algorithm(self, algorithm: Callable) -> Callable:
+        """
+        Restituisce l'algoritmo con la misura di tempo, chiamate e valori eliminati.
+        """
+        name = _name(algorithm)
+        self.calls.setdefault(name, 0)
+        self.time.setdefault(name, 0.0)
+        self.pruned.setdefault(name, 0)
+
+        def measured_algorithm(node, constraints, tree_depth, target):
+            variables = node.get_variables()
+            values_before = sum(len(variable.domain) for variable in variables)
+
+            start = perf_counter()
+            result = algorithm(node, constraints, tree_depth, target)
+            self.time[name] += perf_counter() - start
+
+            self.calls[name] += 1
+            self.pruned[name] += values_before - sum(len(variable.domain) for variable in variables)
+            return result
+
+        return measured_algorithm
+
+    def wrap_policy(self, policy: Callable) -> Callable:
+        """
+        Restituisce la politica con la misura di tempo e chiamate.
+        """
+        name = _name(policy)
+        self.calls.setdefault(name, 0)
+        self.time.setdefault(name, 0.0)
+
+        def measured_policy(node, constraints, tree_depth):
+            start = perf_counter()
+            variable = policy(node, constraints, tree_depth)
+            self.time[name] += perf_counter() - start
+            self.calls[name] += 1
+            return variable
+
+        return measured_policy
+
+    def attach(self, constraints, variables: List):
+        """
+        Inizia a contare le verifiche dei vincoli, sostituendo check e check_unary
+        dell'istanza di Constraints con versioni che contano le chiamate.
+        Con le matrici di compatibilità (vedi Constraints.precompile) has_support e unsupported_values
+        non chiamano check: ogni chiamata conta una verifica per ogni valore del dominio
+        dell'altra variabile, confrontato con la riga della matrice.
+        """
+        checks = self._checks
+        check = constraints.check
+        check_unary = constraints.check_unary
+        has_support = constraints.has_support
+        unsupported_values = constraints.unsupported_values
+        self._saved_checks = tuple(constraints.__dict__.get(attribute) for attribute in _COUNTED)
+        self._names = [variable.name for variable in variables]
+
+        def counted_check(index_1, value_1, index_2, value_2):
+            key = (index_1, index_2) if index_1 < index_2 else (index_2, index_1)
+            checks[key] = checks.get(key, 0) + 1
+            return check(index_1, value_1, index_2, value_2)
+
+        def counted_check_unary(index, value):
+            key = (index,)
+            checks[key] = checks.get(key, 0) + 1
+            return check_unary(index, value)
+
+        def counted_has_support(index_1, value_1, variable_2):
+            index_2 = variable_2.index
+            key = (index_1, index_2) if index_1 < index_2 else (index_2, index_1)
+            checks[key] = checks.get(key, 0) + len(variable_2.domain)
+            return has_support(index_1, value_1, variable_2)
+
+        def counted_unsupported_values(index_1, value_1, variable_2):
+            index_2 = variable_2.index
+            key = (index_1, index_2) if index_1 < index_2 else (index_2, index_1)
+            checks[key] = checks.get(key, 0) + len(variable_2.domain)
+            return unsupported_values(index_1, value_1, variable_2)
+
+        constraints.check = counted_check
+        constraints.check_unary = counted_check_unary
+        if constraints.get_matrices() is not None:
+            constraints.has_support = counted_has_support
+            constraints.unsupported_values = counted_unsupported_values
+
+    def detach(self, constraints):
+        """
+        Smette di contare le verifiche dei vincoli e ripristina i metodi originali.
+        """
+        for attribute, saved in zip(_COUNTED, self._saved_checks):
+            if saved is None:
+                constraints.__dict__.pop(attribute, None)
+            else:
+                setattr(constraints, attribute, saved)
+
+        for key, count in self._checks.items():
+            names = tuple(self._names[index] for index in key)
+            self.constraint_checks[names] = self.constraint_checks.get(names, 0) + count
+        self._checks = {}
+
+    def as_dict(self) -> Dict[str, Any]:
+        return {
+            "nodes": self.nodes,
+            "failures": self.failures,
+            "backtracks": self.backtracks,
+            "solutions": self.solutions,
+            "max_depth": self.max_depth,
+            "nogoods": self.nogoods,
+            "nogood_prunes": self.nogood_prunes,
+            "restarts": self.restarts,
+            "constraint_checks": self.total_constraint_checks(),
+            "pruned": dict(self.pruned),
+            "calls": dict(self.calls),
+            "time": dict(self.time),
+            "elapsed": self.elapsed
+        }
+
+    def __str__(self):
+        lines = [
+            "Nodi: {0}".format(self.nodes),
+            "Fallimenti: {0}".format(self.failures),
+            "Backtrack: {0}".format(self.backtracks),
+            "Soluzioni: {0}".format(self.solutions),
+            "Profondita' massima: {0}".format(self.max_depth),
+            "Verifiche dei vincoli: {0}".format(self.total_constraint_checks())
+        ]
+        if self.nogoods:
+            lines.append("Nogood appresi: {0}, rami tagliati: {1}".format(self.nogoods, self.nogood_prunes))
+        if self.restarts:
+            lines.append("Riavvii: {0}".format(self.restarts))
+        for name in self.calls:
+            line = "{0}: {1} chiamate, {2:.4f} s".format(name, self.calls[name], self.time[name])
+            if name in self.pruned:
+                line += ", {0} valori eliminati".format(self.pruned[name])
+            lines.append(line)
+        lines.append("Tempo totale: {0:.4f} s".format(self.elapsed))
+
+        return "\n".join(lines)
+
+
+def _name(function: Callable) -> str:
+    return getattr(function, "__name__", type(function).__name__)
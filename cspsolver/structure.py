@@ -0,0 +1,466 @@
+from typing import Dict, List, Any, Optional, Iterator, Tuple, Set, cast
+from concurrent.futures import ProcessPoolExecutor, FIRST_COMPLETED, wait
+import itertools
+import os
+from .constraints import Constraints
+from .parallel import _Model, _context
+from .value_order import ValueOrder
+
+# sottoproblemi del processo worker, inizializzati da _init_worker
+_worker = {}  # type: Dict[str, Any]
+
+
+def connected_components(constraints: Constraints, n_variables: int) -> List[List[int]]:
+    """
+    Restituisce le componenti connesse del grafo dei vincoli (lo stesso disegnato da
+    cspsolver.draw_constraint_graph): due variabili sono collegate se hanno un vincolo binario
+    o se sono nello scope dello stesso vincolo globale. Le variabili senza vincoli
+    (o con soli vincoli unari) formano una componente da sole.
+
+    Parametri
+    -------
+    constraints : cspsolver.constraints.Constraints
+        i vincoli del problema, già compilati
+    n_variables : int
+        numero di variabili del problema
+
+    Return
+    -------
+    List[List[int]]
+        gli indici delle variabili di ogni componente, in ordine crescente,
+        le componenti sono ordinate per indice della prima variabile
+    """
+    component_of = [-1] * n_variables
+    components = []  # type: List[List[int]]
+
+    for start in range(n_variables):
+        if component_of[start] != -1:
+            continue
+
+        number = len(components)
+        component_of[start] = number
+        component = [start]
+        stack = [start]
+        while stack:
+            index = stack.pop()
+            adjacent = list(constraints.neighbours(index))
+            for constraint in constraints.get_globals(index):
+                adjacent.extend(constraint.indices)
+
+            for other_index in adjacent:
+                if component_of[other_index] == -1:
+                    component_of[other_index] = number
+                    component.append(other_index)
+                    stack.append(other_index)
+
+        components.append(sorted(component))
+
+    return components
+
+
+def solve_components(solver, one_solution: bool = True, trail: bool = False,
+                     workers: Optional[int] = None) -> Iterator[Dict[str, Any]]:
+    """
+    Risolve separatamente ogni componente connessa del grafo dei vincoli:
+    un fallimento in una componente non fa ripetere la ricerca nelle altre
+    e il numero di nodi è la somma, non il prodotto, di quelli delle componenti.
+    Le soluzioni del problema sono il prodotto cartesiano delle soluzioni delle componenti,
+    generato man mano che vengono richieste (vengono tenute in memoria solo le soluzioni delle componenti).
+    Ogni componente viene risolta con l'algoritmo, la politica e l'ordinamento dei valori del solver,
+    se una componente non ha soluzioni le successive non vengono risolte.
+
+    Con workers le componenti vengono risolte in parallelo su un pool di processi,
+    valgono le stesse condizioni di cspsolver.parallel.solve_parallel.
+
+    Parametri
+    -------
+    solver : cspsolver.CSPSolver
+        il problema da risolvere
+    one_solution : bool = True
+        se True viene cercata solo la prima soluzione di ogni componente
+    trail : bool = False
+        vedi CSPSolver.solve
+    workers : int = None
+        se indicato, numero di processi con cui risolvere le componenti,
+        se None le componenti vengono risolte una dopo l'altra nel processo corrente
+
+    Return
+    -------
+    Iterator[Dict[str, Any]]
+        le soluzioni come dizionari {nome variabile: valore}, nell'ordine delle variabili del problema
+
+    Errors
+    ------
+    ValueError
+        se workers è indicato, fork non è disponibile e il problema non può essere serializzato
+    """
+    solver._compile()
+    variables = solver.get_root().get_variables()
+    components = connected_components(solver._constraints, len(variables))
+    models = [_Model(solver, set(variables[index].name for index in component)) for component in components]
+
+    if workers is None:
+        solutions = _solve_sequential(models, one_solution, trail)
+    else:
+        solutions = _solve_pool(models, one_solution, trail, workers or os.cpu_count() or 1)
+
+    return _product([variable.name for variable in variables], solutions)
+
+
+def solve_structured(solver, one_solution: bool = True, trail: bool = False) -> Optional[List[Dict[str, Any]]]:
+    """
+    Risolve il problema sfruttando la struttura del grafo dei vincoli, se possibile
+    (utilizzato da CSPSolver.solve, vedi il parametro decompose):
+      - se ci sono solo vincoli unari e binari, il grafo è una foresta
+        (numero di vincoli binari uguale al numero di variabili meno il numero di componenti)
+        e i valori vengono provati nell'ordine del dominio (ValueOrder.InsertOrder)
+        il problema viene risolto senza backtracking come in solve_tree,
+        che prova i valori sempre nell'ordine del dominio
+      - altrimenti, se il grafo ha più componenti connesse, ognuna viene risolta separatamente
+        come in solve_components (e ogni componente può essere a sua volta un albero)
+    Il riconoscimento costa O(n + e) per n variabili ed e vincoli binari.
+
+    Parametri
+    -------
+    solver : cspsolver.CSPSolver
+        il problema da risolvere
+    one_solution : bool = True
+        se True viene restituita solo la prima soluzione
+    trail : bool = False
+        vedi CSPSolver.solve, utilizzato per le componenti
+
+    Return
+    -------
+    List[Dict[str, Any]] or None
+        le soluzioni come dizionari {nome variabile: valore},
+        None se il grafo ha una sola componente con dei cicli (o dei vincoli globali):
+        in quel caso il problema va risolto con la ricerca normale
+    """
+    solver._compile()
+    constraints = solver._constraints
+    variables = solver.get_root().get_variables()
+    if not variables:
+        return None
+
+    components = connected_components(constraints, len(variables))
+    if not constraints.get_globals() and solver._value_order is ValueOrder.InsertOrder:
+        arcs = sum(len(constraints.neighbours(index)) for index in range(len(variables))) // 2
+        if arcs == len(variables) - len(components):
+            solutions = _tree_solutions(constraints, variables, [])
+            return list(itertools.islice(solutions, 1)) if one_solution else list(solutions)
+
+    if len(components) < 2:
+        return None
+
+    models = [_Model(solver, set(variables[index].name for index in component)) for component in components]
+    solutions = _product([variable.name for variable in variables], _solve_sequential(models, one_solution, trail))
+    return list(itertools.islice(solutions, 1)) if one_solution else list(solutions)
+
+
+# le soluzioni di ogni componente, None se una componente non ha soluzioni
+def _solve_sequential(models: List[_Model], one_solution: bool, trail: bool) -> Optional[List[List[Dict[str, Any]]]]:
+    solutions = []
+    for model in models:
+        component_solutions = _solve(model, one_solution, trail)
+        if not component_solutions:
+            return None
+        solutions.append(component_solutions)
+
+    return solutions
+
+
+def _solve_pool(models: List[_Model], one_solution: bool, trail: bool, workers: int) -> Optional[List[List[Dict[str, Any]]]]:
+    context = _context(models)
+    solutions = [None] * len(models)  # type: List[Optional[List[Dict[str, Any]]]]
+
+    with ProcessPoolExecutor(max_workers=workers, mp_context=context,
+                             initializer=_init_worker, initargs=(models,)) as executor:
+        futures = {executor.submit(_solve_component, number, one_solution, trail): number
+                   for number in range(len(models))}
+        pending = set(futures)
+
+        while pending:
+            done, pending = wait(pending, return_when=FIRST_COMPLETED)
+            for future in done:
+                if future.cancelled():
+                    continue
+                solutions[futures[future]] = future.result()
+
+            # una componente senza soluzioni: il problema non ha soluzioni
+            if any(component_solutions == [] for component_solutions in solutions):
+                for future in pending:
+                    future.cancel()
+                return None
+
+    # tutte le componenti sono state risolte
+    return cast(List[List[Dict[str, Any]]], solutions)
+
+
+def _solve(model: _Model, one_solution: bool, trail: bool) -> List[Dict[str, Any]]:
+    component_solver = model.build()
+    return component_solver.solve(one_solution=one_solution, trail=trail, record_tree="off")
+
+
+def _init_worker(models: List[_Model]):
+    _worker["models"] = models
+
+
+def _solve_component(number: int, one_solution: bool, trail: bool) -> List[Dict[str, Any]]:
+    return _solve(_worker["models"][number], one_solution, trail)
+
+
+# prodotto cartesiano delle soluzioni delle componenti, ogni soluzione nell'ordine delle variabili
+def _product(names: List[str], solutions: Optional[List[List[Dict[str, Any]]]]) -> Iterator[Dict[str, Any]]:
+    if solutions is None:
+        return
+
+    for combination in itertools.product(*solutions):
+        assignment = {}
+        for component_solution in combination:
+            assignment.update(component_solution)
+        yield {name: assignment[name] for name in names}
+
+
+def cycle_cutset(constraints: Constraints, n_variables: int) -> List[int]:
+    """
+    Restituisce un insieme di variabili (cycle cutset) che, tolte dal grafo dei vincoli binari,
+    lo lasciano senza cicli (una foresta). Se il grafo è già una foresta l'insieme è vuoto.
+    L'insieme viene costruito in modo greedy: si tolgono ripetutamente le variabili con al più
+    un vicino (che non possono stare su un ciclo), poi si sposta nell'insieme la variabile
+    con più vicini tra quelle rimaste, fino a svuotare il grafo. Non è garantito che sia il più piccolo.
+
+    Parametri
+    -------
+    constraints : cspsolver.constraints.Constraints
+        i vincoli del problema, già compilati
+    n_variables : int
+        numero di variabili del problema
+
+    Return
+    -------
+    List[int]
+        gli indici delle variabili dell'insieme, nell'ordine in cui sono state scelte
+    """
+    adjacent = [set(constraints.neighbours(index)) for index in range(n_variables)]
+    remaining = set(range(n_variables))
+    cutset = []  # type: List[int]
+
+    def remove(index: int):
+        remaining.discard(index)
+        for other_index in adjacent[index]:
+            adjacent[other_index].discard(index)
+        adjacent[index] = set()
+
+    leaves = [index for index in remaining if len(adjacent[index]) <= 1]
+    while True:
+        while leaves:
+            index = leaves.pop()
+            if index not in remaining:
+                continue
+            others = list(adjacent[index])
+            remove(index)
+            leaves.extend(other_index for other_index in others if len(adjacent[other_index]) <= 1)
+
+        if not remaining:
+            return cutset
+
+        index = max(remaining, key=lambda index: (len(adjacent[index]), -index))
+        others = list(adjacent[index])
+        cutset.append(index)
+        remove(index)
+        leaves.extend(other_index for other_index in others if len(adjacent[other_index]) <= 1)
+
+
+def solve_tree(solver, one_solution: bool = True, max_cutset: Optional[int] = None) -> Iterator[Dict[str, Any]]:
+    """
+    Risolve i problemi il cui grafo dei vincoli è un albero (o una foresta) senza backtracking:
+    le variabili di ogni albero vengono ordinate dalla radice alle foglie, la arc consistency
+    direzionale (dalle foglie alla radice) elimina i valori del padre senza supporto nel figlio
+    e poi ogni variabile viene assegnata con un valore compatibile con il padre, che esiste sempre.
+    Il costo è O(n * d^2) per n variabili con domini di d valori.
+
+    Se il grafo ha dei cicli viene utilizzato il cycle cutset conditioning (vedi cycle_cutset):
+    si enumerano gli assegnamenti consistenti delle variabili dell'insieme, per ognuno
+    i domini delle altre variabili vengono ridotti ai valori compatibili e la foresta
+    che resta viene risolta come sopra. Il costo è O(d^c * n * d^2) con c variabili nell'insieme.
+
+    Sono supportati solo vincoli unari e binari.
+
+    Parametri
+    -------
+    solver : cspsolver.CSPSolver
+        il problema da risolvere
+    one_solution : bool = True
+        se True viene restituita solo la prima soluzione
+    max_cutset : int = None
+        se indicato, numero massimo di variabili dell'insieme di taglio
+
+    Return
+    -------
+    Iterator[Dict[str, Any]]
+        le soluzioni come dizionari {nome variabile: valore}, nell'ordine delle variabili del problema
+
+    Errors
+    ------
+    ValueError
+        se il problema ha dei vincoli globali (o vincoli su più di due variabili),
+        o se l'insieme di taglio ha più di max_cutset variabili
+    """
+    solver._compile()
+    constraints = solver._constraints
+    variables = solver.get_root().get_variables()
+
+    if constraints.get_globals():
+        raise ValueError("The tree solver supports only unary and binary constraints.")
+
+    cutset = cycle_cutset(constraints, len(variables))
+    if max_cutset is not None and len(cutset) > max_cutset:
+        raise ValueError("The cycle cutset has {0} variables, more than max_cutset ({1}).".format(len(cutset), max_cutset))
+
+    solutions = _tree_solutions(constraints, variables, cutset)
+    return itertools.islice(solutions, 1) if one_solution else solutions
+
+
+def _tree_solutions(constraints: Constraints, variables: List, cutset: List[int]) -> Iterator[Dict[str, Any]]:
+    # valori possibili di ogni variabile: il dominio filtrato con i vincoli unari
+    domains = []
+    for variable in variables:
+        if variable.value is not None:
+            domains.append([variable.value])
+        else:
+            domains.append([value for value in variable.domain if constraints.check_unary(variable.index, value)])
+
+    in_cutset = set(cutset)
+    order, parents = _forest_order(constraints, len(variables), in_cutset)
+    cutset_neighbours = {index: [other_index for other_index in constraints.neighbours(index) if other_index in in_cutset]
+                         for index in order}
+    values = [None] * len(variables)
+
+    for _ in _cutset_assignments(constraints, cutset, domains, values):
+        # domini della foresta ridotti ai valori compatibili con l'assegnamento dell'insieme di taglio
+        forest_domains = {}
+        for index in order:
+            forest_domains[index] = [value for value in domains[index]
+                                     if all(constraints.check(index, value, other_index, values[other_index])
+                                            for other_index in cutset_neighbours[index])]
+
+        if not _directional_arc_consistency(constraints, order, parents, forest_domains):
+            continue
+
+        for _ in _forest_assignments(constraints, order, parents, forest_domains, values):
+            yield {variable.name: values[variable.index] for variable in variables}
+
+
+# ordine delle variabili della foresta (tolto l'insieme di taglio) dalle radici alle foglie,
+# con il padre di ogni variabile (-1 per le radici)
+def _forest_order(constraints: Constraints, n_variables: int, cutset: Set[int]) -> Tuple[List[int], List[int]]:
+    parents = [-1] * n_variables
+    visited = [False] * n_variables
+    order = []  # type: List[int]
+
+    for root in range(n_variables):
+        if root in cutset or visited[root]:
+            continue
+
+        visited[root] = True
+        position = len(order)
+        order.append(root)
+        while position < len(order):
+            index = order[position]
+            position += 1
+            for other_index in constraints.neighbours(index):
+                if other_index not in cutset and not visited[other_index]:
+                    visited[other_index] = True
+                    parents[other_index] = index
+                    order.append(other_index)
+
+    return order, parents
+
+
+# assegnamenti consistenti delle variabili dell'insieme di taglio, scritti in values
+def _cutset_assignments(constraints: Constraints, cutset: List[int], domains: List[List], values: List) -> Iterator[None]:
+    if not cutset:
+        yield
+        return
+
+    # ricerca in profondità: positions[k] è la posizione del prossimo valore da provare per cutset[k]
+    positions = [0]
+    while positions:
+        depth = len(positions) - 1
+        index = cutset[depth]
+        domain = domains[index]
+        if positions[depth] == len(domain):
+            positions.pop()
+            values[index] = None
+            continue
+
+        value = domain[positions[depth]]
+        positions[depth] += 1
+        if all(constraints.check(index, value, other_index, values[other_index]) for other_index in cutset[:depth]):
+            values[index] = value
+            if depth + 1 == len(cutset):
+                yield
+            else:
+                positions.append(0)
+
+
+# arc consistency direzionale: dalle foglie alle radici, elimina i valori del padre senza supporto nel figlio,
+# restituisce False se un dominio diventa vuoto
+def _directional_arc_consistency(constraints: Constraints, order: List[int], parents: List[int],
+                                 domains: Dict[int, List]) -> bool:
+    for index in order:
+        if not domains[index]:
+            return False
+
+    for index in reversed(order):
+        parent = parents[index]
+        if parent == -1:
+            continue
+
+        child_domain = domains[index]
+        domains[parent] = [value for value in domains[parent]
+                           if any(constraints.check(parent, value, index, child_value) for child_value in child_domain)]
+        if not domains[parent]:
+            return False
+
+    return True
+
+
+# assegnamenti della foresta dopo la arc consistency direzionale, scritti in values:
+# ogni valore compatibile con il padre si estende ad una soluzione, quindi non si torna mai indietro su un fallimento
+def _forest_assignments(constraints: Constraints, order: List[int], parents: List[int],
+                        domains: Dict[int, List], values: List) -> Iterator[None]:
+    if not order:
+        yield
+        return
+
+    # candidates[k]: valori di order[k] compatibili con il padre, positions[k]: il prossimo da provare
+    candidates = []
+    positions = []
+
+    def push(depth: int):
+        index = order[depth]
+        parent = parents[index]
+        if parent == -1:
+            candidates.append(domains[index])
+        else:
+            parent_value = values[parent]
+            candidates.append([value for value in domains[index] if constraints.check(index, value, parent, parent_value)])
+        positions.append(0)
+
+    push(0)
+    while positions:
+        depth = len(positions) - 1
+        index = order[depth]
+        if positions[depth] == len(candidates[depth]):
+            candidates.pop()
+            positions.pop()
+            values[index] = None
+            continue
+
+        values[index] = candidates[depth][positions[depth]]
+        positions[depth] += 1
+        if depth + 1 == len(order):
+            yield
+        else:
+            push(depth + 1)
@@ -0,0 +1,282 @@
+from typing import Tuple, Any, Optional, TextIO, Union, BinaryIO, Dict, List
+import json
+import queue
+import threading
+
+# tipi di evento, il primo elemento della tupla di ogni evento:
+#   (ASSIGN, variabile, valore)
+#   (FAIL, variabile, valore)
+#   (PRUNE, variabile, valore, causa, valore della causa, nuovo dominio)
+#     causa None: il valore non verifica i vincoli unari
+#     valore della causa None: il valore non è compatibile con nessun valore della causa
+#   (SOLUTION, soluzione) Node o dizionario {nome variabile: valore}
+#   (MESSAGE, testo)
+ASSIGN = "assign"
+FAIL = "fail"
+PRUNE = "prune"
+SOLUTION = "solution"
+MESSAGE = "message"
+
+
+class Verbosity:
+    """
+    Livelli di dettaglio della traccia, ogni livello include i precedenti.
+    """
+    # solo le soluzioni
+    SOLUTIONS = 1
+    # assegnamenti e fallimenti
+    SEARCH = 2
+    # valori eliminati dai domini
+    PRUNING = 3
+    # messaggi degli algoritmi (default)
+    ALL = 4
+
+
+_LEVELS = {SOLUTION: Verbosity.SOLUTIONS, ASSIGN: Verbosity.SEARCH, FAIL: Verbosity.SEARCH,
+           PRUNE: Verbosity.PRUNING, MESSAGE: Verbosity.ALL}
+
+str_value_not_compatible = "{not_assigned} = {not_assigned_value} non e' compatibile con {variable} = {value} -> Nuovo dominio di {not_assigned}: {not_assigned_domain}"
+str_var_not_compatible = "{not_assigned} = {not_assigned_value} non e' compatibile con i valori di {variable} -> Nuovo dominio di {not_assigned}: {not_assigned_domain}"
+str_unary_not_compatible = "{variable} = {value} non e' compatibile con i vincoli unari -> Nuovo dominio di {variable}: {domain}"
+
+
+class TraceSink:
+    """
+    Destinazione degli eventi della risoluzione, passata agli algoritmi come target.
+
+    Gli algoritmi e il motore di ricerca chiamano emit con una tupla (vedi i tipi di evento
+    all'inizio del modulo), gli eventi con livello superiore a level vengono scartati,
+    gli altri sono passati a handle, da implementare nelle sottoclassi.
+    Gli oggetti contenuti negli eventi (es. i domini) sono validi solo durante la chiamata:
+    un sink che conserva gli eventi deve copiarne il contenuto.
+
+    Il sink ha anche un metodo write, quindi print(..., file = target) negli algoritmi
+    definiti dall'utente continua a funzionare: ogni riga diventa un evento MESSAGE.
+
+    Parametri
+    -------
+    level : int = Verbosity.ALL
+        livello di dettaglio, vedi cspsolver.trace.Verbosity
+    """
+
+    def __init__(self, level: int = Verbosity.ALL):
+        self.level = level
+        self._line = ""
+
+    def emit(self, event: Tuple):
+        if _LEVELS[event[0]] <= self.level:
+            self.handle(event)
+
+    def handle(self, event: Tuple):
+        raise NotImplementedError
+
+    def write(self, text: str):
+        lines = (self._line + text).split("\n")
+        self._line = lines.pop()
+        for line in lines:
+            self.emit((MESSAGE, line))
+
+    def flush(self):
+        pass
+
+    def close(self):
+        if self._line:
+            self.emit((MESSAGE, self._line))
+            self._line = ""
+        self.flush()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exception):
+        self.close()
+
+
+class TextRenderer(TraceSink):
+    """
+    Stampa gli eventi come testo su target (es. sys.stdout), è il sink utilizzato
+    quando a solve viene passato un file.
+
+    Parametri
+    -------
+    target : TextIO
+        dove stampare gli eventi
+    level : int = Verbosity.ALL
+        livello di dettaglio, vedi cspsolver.trace.Verbosity
+    """
+
+    def __init__(self, target: TextIO, level: int = Verbosity.ALL):
+        super().__init__(level)
+        self._target = target
+
+    def handle(self, event: Tuple):
+        print(render(event), file = self._target)
+
+    def flush(self):
+        self._target.flush()
+
+
+class JSONLinesWriter(TraceSink):
+    """
+    Scrive gli eventi su file, un oggetto JSON per riga (es. {"event": "assign", "variable": "a", "value": 1}).
+
+    Gli eventi vengono accumulati in un buffer, ogni buffer_size eventi il buffer viene
+    passato ad un thread in background che li codifica e li scrive, quindi la ricerca
+    non attende la scrittura. Degli eventi PRUNE viene salvata solo la dimensione
+    del nuovo dominio (domain_size), il dominio si ricostruisce dalla sequenza degli eventi.
+    I valori non serializzabili in JSON sono scritti come repr.
+    Va chiuso (close o with) al termine per scrivere gli ultimi eventi.
+    Se la scrittura fallisce (es. disco pieno) l'eccezione viene sollevata
+    dalla chiamata successiva di handle, flush o close e gli eventi successivi vengono scartati.
+
+    Esempio
+    -------
+      with JSONLinesWriter("trace.jsonl", Verbosity.SEARCH) as writer:
+          solver.solve(target = writer)
+
+    Parametri
+    -------
+    file : str or BinaryIO
+        percorso del file da creare, oppure file binario già aperto (non viene chiuso)
+    level : int = Verbosity.ALL
+        livello di dettaglio, vedi cspsolver.trace.Verbosity
+    buffer_size : int = 4096
+        numero di eventi per ogni scrittura
+    """
+
+    def __init__(self, file: Union[str, BinaryIO], level: int = Verbosity.ALL, buffer_size: int = 4096):
+        super().__init__(level)
+        if isinstance(file, str):
+            self._file = open(file, "wb")  # type: BinaryIO
+            self._owns_file = True
+        else:
+            self._file = file
+            self._owns_file = False
+
+        self._buffer_size = buffer_size
+        self._buffer = []  # type: List[Tuple]
+        self._batches = queue.Queue()  # type: queue.Queue
+        # eccezione sollevata dal thread durante la scrittura, non ancora sollevata al chiamante
+        self._error = None  # type: Optional[BaseException]
+        self._thread = threading.Thread(target=self._write_batches, daemon=True)
+        self._thread.start()
+        self._closed = False
+
+    def handle(self, event: Tuple):
+        kind = event[0]
+        # copio subito il contenuto che può cambiare durante la ricerca
+        if kind == PRUNE:
+            event = event[:5] + (len(event[5]),)
+        elif kind == SOLUTION and not isinstance(event[1], dict):
+            event = (SOLUTION, event[1].get_assignment())
+
+        self._buffer.append(event)
+        if len(self._buffer) >= self._buffer_size:
+            self._batches.put(self._buffer)
+            self._buffer = []
+            self._raise_error()
+
+    def flush(self):
+        # scrive gli eventi nel buffer e attende che il thread abbia finito
+        if self._buffer:
+            self._batches.put(self._buffer)
+            self._buffer = []
+        self._batches.join()
+        self._raise_error()
+        self._file.flush()
+
+    def close(self):
+        if self._closed:
+            return
+
+        # il thread viene fermato e il file chiuso anche se la scrittura è fallita
+        try:
+            super().close()
+        finally:
+            self._batches.put(None)
+            self._thread.join()
+            self._closed = True
+            if self._owns_file:
+                self._file.close()
+        self._raise_error()
+
+    def _raise_error(self):
+        # solleva (una sola volta) l'eccezione del thread di scrittura
+        error = self._error
+        if error is not None:
+            self._error = None
+            raise error
+
+    def _write_batches(self):
+        # dopo un errore il thread continua a consumare i buffer (senza scriverli),
+        # altrimenti flush attenderebbe per sempre
+        failed = False
+        while True:
+            batch = self._batches.get()
+            try:
+                if batch is None:
+                    return
+
+                if not failed:
+                    lines = [json.dumps(_to_record(event), default=repr) for event in batch]
+                    self._file.write(("\n".join(lines) + "\n").encode("utf-8"))
+            except Exception as error:
+                failed = True
+                self._error = error
+            finally:
+                self._batches.task_done()
+
+
+_FIELDS = {ASSIGN: ("variable", "value"), FAIL: ("variable", "value"),
+           PRUNE: ("variable", "value", "cause", "cause_value", "domain_size"),
+           SOLUTION: ("assignment",), MESSAGE: ("text",)}
+
+
+def _to_record(event: Tuple) -> Dict[str, Any]:
+    record = {"event": event[0]}
+    record.update(zip(_FIELDS[event[0]], event[1:]))
+    return record
+
+
+def render(event: Tuple) -> str:
+    """
+    Restituisce l'evento come testo, nel formato della traccia stampata da solve.
+    """
+    kind = event[0]
+
+    if kind == PRUNE:
+        _, variable, value, cause, cause_value, domain = event
+        if cause is None:
+            return str_unary_not_compatible.format(variable=variable, value=value, domain=domain)
+        if cause_value is None:
+            return str_var_not_compatible.format(not_assigned=variable, not_assigned_value=value,
+                                                 variable=cause, not_assigned_domain=domain)
+        return str_value_not_compatible.format(not_assigned=variable, not_assigned_value=value,
+                                               variable=cause, value=cause_value, not_assigned_domain=domain)
+    if kind == ASSIGN:
+        return "Assegno: {variable} = {value}".format(variable=event[1], value=event[2])
+    if kind == FAIL:
+        return "Assegnamento {variable} = {value} fallito".format(variable=event[1], value=event[2])
+    if kind == SOLUTION:
+        return solution_to_str(event[1]) + "\n"
+
+    return event[1]
+
+
+def solution_to_str(solution) -> str:
+    """
+    Restituisce la soluzione come stringa, sia che sia un Node che un dizionario {nome variabile: valore}.
+    """
+    if isinstance(solution, dict):
+        return "Soluzione\n" + "\n".join(["{0}: {1}".format(name, value) for name, value in solution.items()])
+    return str(solution)
+
+
+def as_sink(target: Union[None, TextIO, TraceSink]) -> Optional[TraceSink]:
+    """
+    Restituisce target se è già un TraceSink, altrimenti un TextRenderer che stampa su target
+    (None se target è None).
+    """
+    if target is None or isinstance(target, TraceSink):
+        return target
+    return TextRenderer(target)
@@ -0,0 +1,77 @@
+from typing import Any
+
+
+class Trail:
+    """
+    Registro delle modifiche effettuate durante la ricerca.
+
+    Invece di copiare tutte le variabili ad ogni nodo dell'albero di decisione,
+    le variabili vivono in un unico nodo condiviso e ogni modifica
+    (valore eliminato dal dominio, assegnamento, flag del nodo) viene registrata
+    sul trail. Prima di provare un valore si salva un punto di ripristino con mark(),
+    dopo aver esplorato il sottoalbero si annullano le modifiche con undo().
+
+    Al trail può essere collegato un listener (es. cspsolver.ordering.VariableQueue)
+    che viene avvisato ad ogni modifica e ad ogni ripristino di dominio o assegnamento
+    di una variabile, con i metodi resized(variable, size) e assigned(variable).
+    """
+
+    def __init__(self):
+        self._entries = []
+        self._marks = []
+        self.listener = None
+
+    # collega il trail al nodo e a tutte le sue variabili,
+    # da questo momento le modifiche vengono registrate
+    def attach(self, node):
+        node._trail = self
+        for variable in node.get_variables():
+            variable._trail = self
+
+    # scollega il trail dal nodo e dalle sue variabili
+    def detach(self, node):
+        node._trail = None
+        for variable in node.get_variables():
+            variable._trail = None
+
+    # registra l'eliminazione di value dalla posizione index del dominio di variable
+    # (chiamato prima dell'eliminazione)
+    def record_removal(self, variable, index: int, value: Any):
+        self._entries.append((variable, index, value))
+        if self.listener is not None:
+            self.listener.resized(variable, len(variable.domain) - 1)
+
+    # registra il vecchio valore di un attributo (chiamato prima della modifica)
+    def record_attribute(self, obj, name: str, old_value: Any):
+        self._entries.append((obj, name, old_value))
+        if name == "value" and self.listener is not None:
+            self.listener.assigned(obj)
+
+    # salva un punto di ripristino
+    def mark(self):
+        self._marks.append(len(self._entries))
+
+    # annulla tutte le modifiche effettuate dall'ultimo punto di ripristino
+    def undo(self):
+        entries = self._entries
+        mark = self._marks.pop()
+        listener = self.listener
+
+        while len(entries) > mark:
+            obj, key, old_value = entries.pop()
+            if key.__class__ is int:
+                # valore eliminato da un dominio: lo reinserisco nella posizione originale
+                obj.domain.insert(key, old_value)
+                if listener is not None:
+                    listener.resized(obj, len(obj.domain))
+            else:
+                setattr(obj, key, old_value)
+                if key == "value" and listener is not None:
+                    listener.resized(obj, len(obj.domain))
+
+    # numero di punti di ripristino salvati
+    def depth(self) -> int:
+        return len(self._marks)
+
+    def __len__(self):
+        return len(self._entries)
@@ -0,0 +1,103 @@
+from typing import Callable, List, Any, Optional
+import random
+from .node import Node
+from .constraints import Constraints
+from .variable import Variable
+
+class ValueOrder:
+    """
+    Dopo aver scelto la variabile da assegnare (vedi cspsolver.Policy)
+    viene applicata una funzione che decide l'ordine in cui provare i valori del suo dominio,
+    tale funzione è caratterizzata dall'interfaccia:
+
+    Parametri
+    -------
+    node : cspsolver.node.Node
+        La situazione attuale del problema (variabili e domini)
+    constraints : cspsolver.constraints.Constraints
+        I vincoli del problema
+    variable : cspsolver.variable.Variable
+        La variabile da assegnare
+
+    Return
+    -------
+    List
+        I valori del dominio della variabile nell'ordine in cui provarli,
+        in una nuova lista (il dominio viene modificato durante la ricerca)
+    """
+
+    @staticmethod
+    def InsertOrder(node: Node, constraints: Constraints, variable: Variable) -> List:
+        """
+        I valori vengono provati nell'ordine del dominio.
+        """
+
+        return list(variable.domain)
+
+    @staticmethod
+    def LeastConstrainingValue(node: Node, constraints: Constraints, variable: Variable) -> List:
+        """
+        Vengono provati prima i valori che lasciano più valori compatibili
+        nei domini delle variabili non assegnate vincolate con la variabile
+        (a parità di valori compatibili nell'ordine del dominio).
+        Vengono considerati solo i vincoli binari.
+        """
+
+        variables = node.get_variables()
+        neighbours = [variables[index] for index in constraints.neighbours(variable.index)
+                      if variables[index].value is None]
+
+        supports = {}
+        for value in variable.domain:
+            supports[value] = sum(len(neighbour.domain) - len(constraints.unsupported_values(variable.index, value, neighbour))
+                                  for neighbour in neighbours)
+
+        return sorted(variable.domain, key=lambda value: -supports[value])
+
+    @staticmethod
+    def Random(seed: Optional[int] = None) -> Callable[[Node, Constraints, Variable], List]:
+        """
+        Restituisce una funzione che prova i valori in ordine casuale.
+
+        Esempio
+        -------
+          solver = CSPSolver(value_order = ValueOrder.Random(seed = 42))
+
+        Parametri
+        -------
+        seed : int = None
+            seme del generatore di numeri casuali, il generatore è creato una sola volta,
+            quindi l'ordine è riproducibile solo con una nuova funzione per ogni risoluzione
+        """
+
+        generator = random.Random(seed)
+
+        def random_order(node: Node, constraints: Constraints, variable: Variable) -> List:
+            values = list(variable.domain)
+            generator.shuffle(values)
+            return values
+
+        return random_order
+
+    @staticmethod
+    def ByKey(key: Callable[[Any], Any], reverse: bool = False) -> Callable[[Node, Constraints, Variable], List]:
+        """
+        Restituisce una funzione che prova i valori ordinati secondo key.
+
+        Esempio
+        -------
+          # prima i valori più alti
+          solver = CSPSolver(value_order = ValueOrder.ByKey(lambda value: value, reverse = True))
+
+        Parametri
+        -------
+        key : Callable[[Any], Any]
+            funzione applicata ad ogni valore, come in sorted
+        reverse : bool = False
+            se True i valori vengono provati in ordine decrescente
+        """
+
+        def key_order(node: Node, constraints: Constraints, variable: Variable) -> List:
+            return sorted(variable.domain, key=key, reverse=reverse)
+
+        return key_order
@@ -1,4 +1,5 @@
 from typing import List
+from copy import deepcopy
 
 class Variable:
 
@@ -6,26 +7,52 @@ class Variable:
         self.name = name
         self.domain = domain
         self.value = None
-    
+        # indice assegnato dalla compilazione dei vincoli, vedi Constraints.compile
+        self.index = -1
+        self._trail = None
+
     # assegna un valore a questa variabile,
     # se tale valore è nel dominio
     def assign_value(self, value):
         if value in self.domain:
+            if self._trail is not None:
+                self._trail.record_attribute(self, "value", self.value)
             self.value = value
-    
+
     # rimuove un valore dal dominio di questa variabile,
     # se tale valore è nel dominio
     def delete_value(self, value):
         if value in self.domain:
+            if self._trail is not None:
+                self._trail.record_removal(self, self.domain.index(value), value)
             self.domain.remove(value)
 
+    # copia veloce della variabile: viene copiato solo il dominio,
+    # i valori del dominio sono condivisi con la variabile originale
+    def copy(self) -> "Variable":
+        variable = Variable(self.name, self.domain.copy())
+        variable.value = self.value
+        variable.index = self.index
+        return variable
+
+    # il trail non viene mai copiato insieme alla variabile
+    def __deepcopy__(self, memo):
+        variable = Variable(self.name, deepcopy(self.domain, memo))
+        variable.value = deepcopy(self.value, memo)
+        variable.index = self.index
+        return variable
+
     # null variable (no name, no domain)
     @staticmethod
     def Null() -> "Variable":
         return Variable("", [])
 
+    # True se alla variabile è stato assegnato un valore
+    def is_assigned(self) -> bool:
+        return self.value is not None
+
     def __str__(self):
-        if self.value:
+        if self.value is not None:
             return "{0}: {1}".format(self.name, self.value)
         else:
-            return "{0}: {1}".format(self.name, self.domain)
\ No newline at end of file
+            return "{0}: {1}".format(self.name, self.domain)
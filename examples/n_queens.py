@@ -17,9 +17,8 @@ if __name__ == "__main__":
     for i in range(1, n):
         solver.add_variable("r"+str(i), list(range(1, n)))
 
-    for i in range(1, n):
-        for j in range(i + 1, n):
-            solver.add_constraint(("r" + str(i), "r" + str(j)), lambda xi, xj: xi != xj)
+    # regine su colonne diverse
+    solver.add_all_different(["r" + str(i) for i in range(1, n)])
 
     for i in range(1, n):
         for j in range(i + 1, n):
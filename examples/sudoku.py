@@ -17,24 +17,17 @@ if __name__ == "__main__":
         for j in range(1, 10):
             solver.add_variable("cell_" + str(i) + str(j), list(range(1, 10)))
 
-    different = lambda x, y: x != y
+    # righe e colonne con valori tutti diversi
     for i in range(1, 10):
-        for j in range(1, 10):
-            for k in range(j, 10):
-                solver.add_constraint(("cell_" + str(i) + str(j), "cell_" + str(i) + str(k)), different)
-                solver.add_constraint(("cell_" + str(j) + str(i), "cell_" + str(k) + str(i)), different)
+        solver.add_all_different(["cell_" + str(i) + str(j) for j in range(1, 10)])
+        solver.add_all_different(["cell_" + str(j) + str(i) for j in range(1, 10)])
 
+    # quadrati 3x3 con valori tutti diversi
     start = [1, 4, 7, 10]
 
     for r in range(3):
-        for i in range(start[r], start[r + 1]):
-            for c in range(3):
-                for j in range(start[c], start[c + 1]):
-                    for k in range(start[r], start[r + 1]):
-                        for h in range(start[c], start[c + 1]):
-                            c1, c2 = solver._constraints.get_binary_constraints("cell_" + str(i) + str(j), "cell_" + str(k) + str(h))
-                            if not (c1 or c2):
-                                solver.add_constraint(("cell_" + str(i) + str(j), "cell_" + str(k) + str(h)), different)
+        for c in range(3):
+            solver.add_all_different(["cell_" + str(i) + str(j) for i in range(start[r], start[r + 1]) for j in range(start[c], start[c + 1])])
 
     # situazione iniziale
     solver.add_constraint(("cell_14" ,), lambda x: x == 1)
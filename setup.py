@@ -48,6 +48,9 @@ setup(
     packages=find_packages(),
     install_requires = requirements,
     extras_require={
+        'numpy': [
+            'numpy>=1.17'
+        ],
         'dev': [
             'jedi',
             'mypy'
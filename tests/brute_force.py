@@ -0,0 +1,53 @@
+from typing import Any, Callable, Dict, List, Tuple
+import itertools
+import random
+
+
+def brute_force(variables: Dict[str, List], constraints: List[Tuple[Tuple[str, ...], Callable]]) -> List[Dict[str, Any]]:
+    """
+    Tutte le soluzioni del problema enumerando il prodotto cartesiano dei domini,
+    nell'ordine dei domini (la prima variabile varia più lentamente).
+    """
+    names = list(variables)
+    solutions = []
+    for values in itertools.product(*(variables[name] for name in names)):
+        assignment = dict(zip(names, values))
+        if all(constraint(*(assignment[name] for name in scope)) for scope, constraint in constraints):
+            solutions.append(assignment)
+    return solutions
+
+
+def as_set(solutions: List[Dict[str, Any]]) -> set:
+    """
+    Le soluzioni come insieme, per confrontarle senza tenere conto dell'ordine.
+    """
+    return set(tuple(sorted(solution.items())) for solution in solutions)
+
+
+def random_binary_model(seed: int, n_variables: int = 6, domain_size: int = 4,
+                        density: float = 0.5, tightness: float = 0.4) -> Tuple[Dict[str, List], List]:
+    """
+    CSP binario casuale: ogni coppia di variabili ha un vincolo con probabilità density,
+    ogni vincolo esclude ogni coppia di valori con probabilità tightness.
+    """
+    generator = random.Random(seed)
+    variables = {"x" + str(i): list(range(domain_size)) for i in range(n_variables)}
+    names = list(variables)
+    constraints = []
+    for i, j in itertools.combinations(range(n_variables), 2):
+        if generator.random() < density:
+            forbidden = frozenset(pair for pair in itertools.product(range(domain_size), repeat=2)
+                                  if generator.random() < tightness)
+            constraints.append(((names[i], names[j]), lambda a, b, forbidden=forbidden: (a, b) not in forbidden))
+    return variables, constraints
+
+
+def build(solver, variables: Dict[str, List], constraints: List[Tuple[Tuple[str, ...], Callable]]):
+    """
+    Aggiunge variabili e vincoli al solver, restituisce il solver.
+    """
+    for name, domain in variables.items():
+        solver.add_variable(name, list(domain))
+    for scope, constraint in constraints:
+        solver.add_constraint(scope, constraint)
+    return solver
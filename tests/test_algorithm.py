@@ -0,0 +1,65 @@
+import unittest
+from cspsolver import CSPSolver, Algorithm
+from .brute_force import brute_force, as_set, random_binary_model, build
+
+LOOK_AHEAD = (Algorithm.PartialLookAhead, Algorithm.FullLookAhead)
+
+
+class TestLookAhead(unittest.TestCase):
+
+    def test_empty_domain(self):
+        for algorithm in LOOK_AHEAD:
+            solver = CSPSolver(algorithm)
+            solver.add_variable("a", [0, 1])
+            solver.add_variable("b", [0, 1])
+            solver.add_variable("c", [])
+            solver.add_constraint(("a", "b"), lambda a, b: a != b)
+
+            self.assertEqual(solver.solve(one_solution=False, record_tree="off", decompose=False), [], algorithm.__name__)
+
+    def test_empty_domain_has_no_culprit(self):
+        # il dominio di c è vuoto prima dell'algoritmo: nessun vincolo va incolpato
+        for algorithm in LOOK_AHEAD:
+            solver = CSPSolver(algorithm)
+            solver.add_variable("a", [0, 1])
+            solver.add_variable("b", [0, 1])
+            solver.add_variable("c", [])
+            solver.add_constraint(("a", "b"), lambda a, b: a != b)
+            solver._compile()
+
+            node = solver.get_root().snapshot(None)
+            node.assign_variable("a", 0)
+            self.assertFalse(algorithm(node, solver._constraints, 0, None))
+            self.assertIsNone(solver._constraints.pop_failure(), algorithm.__name__)
+
+    def test_records_emptying_constraint(self):
+        # b viene svuotato dal vincolo con d, c (visitato prima) non c'entra
+        for algorithm in LOOK_AHEAD:
+            solver = CSPSolver(algorithm)
+            solver.add_variable("a", [0])
+            solver.add_variable("b", [0, 1])
+            solver.add_variable("c", [0, 1])
+            solver.add_variable("d", [0, 1])
+            solver.add_constraint(("a", "c"), lambda a, c: True)
+            solver.add_constraint(("c", "d"), lambda c, d: True)
+            solver.add_constraint(("b", "d"), lambda b, d: False)
+            solver._compile()
+
+            node = solver.get_root().snapshot(None)
+            node.assign_variable("a", 0)
+            self.assertFalse(algorithm(node, solver._constraints, 0, None))
+            failure = solver._constraints.pop_failure()
+            self.assertEqual(sorted(failure), [1, 3], algorithm.__name__)
+
+    def test_matches_brute_force(self):
+        for seed in range(10):
+            variables, constraints = random_binary_model(seed)
+            expected = as_set(brute_force(variables, constraints))
+            for algorithm in LOOK_AHEAD:
+                solver = build(CSPSolver(algorithm), variables, constraints)
+                solutions = solver.solve(one_solution=False, record_tree="off", decompose=False)
+                self.assertEqual(as_set(solutions), expected, "seed {0}, {1}".format(seed, algorithm.__name__))
+
+
+if __name__ == "__main__":
+    unittest.main()
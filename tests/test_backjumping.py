@@ -0,0 +1,53 @@
+import unittest
+from cspsolver import CSPSolver, Algorithm, Policy
+from .brute_force import brute_force, as_set, random_binary_model, build
+
+POLICIES = (Policy.InsertOrder, Policy.MinimumRemainingValues, Policy.DomainOverWeightedDegree)
+
+
+class TestBackjumping(unittest.TestCase):
+
+    def test_matches_brute_force(self):
+        for seed in range(30):
+            variables, constraints = random_binary_model(seed, n_variables=7, domain_size=3, density=0.45, tightness=0.4)
+            expected = brute_force(variables, constraints)
+            for algorithm in (Algorithm.StandardBacktracking, Algorithm.ForwardChecking):
+                for policy in POLICIES:
+                    for trail in (False, True):
+                        solver = build(CSPSolver(algorithm, policy), variables, constraints)
+                        solutions = solver.solve(one_solution=False, record_tree="off", trail=trail,
+                                                 backjumping=True, decompose=False)
+                        message = "seed {0}, {1}, trail {2}".format(seed, policy.__name__, trail)
+                        self.assertEqual(len(solutions), len(expected), message)
+                        self.assertEqual(as_set(solutions), as_set(expected), message)
+
+                        first = build(CSPSolver(algorithm, policy), variables, constraints).solve(
+                            record_tree="failures", backjumping=True, decompose=False)
+                        self.assertEqual(len(first), min(1, len(expected)), message)
+                        if first:
+                            self.assertIn(first[0], expected)
+
+    def test_jumps_over_unrelated_variables(self):
+        # a e d sono incompatibili, b e c non hanno vincoli con d:
+        # quando d fallisce per ogni valore la ricerca torna direttamente ad a
+        variables = {"a": [0, 1, 2], "b": [0, 1, 2], "c": [0, 1, 2], "d": [0, 1]}
+        constraints = [(("a", "d"), lambda a, d: a == 2 and d == 0), (("b", "c"), lambda b, c: b != c)]
+        expected = brute_force(variables, constraints)
+
+        chronological = build(CSPSolver(), variables, constraints)
+        chronological.solve(record_tree="off", statistics=True, decompose=False)
+        jumping = build(CSPSolver(), variables, constraints)
+        solutions = jumping.solve(record_tree="off", statistics=True, backjumping=True, decompose=False)
+
+        self.assertEqual(solutions, expected[:1])
+        self.assertLess(jumping.stats.nodes, chronological.stats.nodes)
+
+    def test_requires_checking_algorithm(self):
+        solver = CSPSolver(Algorithm.AC3)
+        solver.add_variable("a", [0, 1])
+        with self.assertRaises(ValueError):
+            solver.solve(backjumping=True)
+
+
+if __name__ == "__main__":
+    unittest.main()
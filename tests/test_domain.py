@@ -0,0 +1,40 @@
+import unittest
+from cspsolver import CSPSolver, Algorithm
+from cspsolver.domain import BitsetDomain, ValueTable
+from .brute_force import brute_force, as_set, random_binary_model, build
+
+
+class TestBitsetDomain(unittest.TestCase):
+
+    def test_keeps_domain_order(self):
+        # valori ripetuti e in un ordine diverso da quello di hash
+        table = ValueTable([30, 2, "b", 2, 1000, "a", 30])
+        self.assertEqual(table.values, (30, 2, "b", 1000, "a"))
+
+        domain = BitsetDomain(table)
+        domain.remove("b")
+        self.assertEqual(list(domain), [30, 2, 1000, "a"])
+        self.assertEqual(len(domain), 4)
+        self.assertNotIn("b", domain)
+
+    def test_insert_order_solutions(self):
+        solver = CSPSolver(compact_domains=True)
+        solver.add_variable("a", [9, 3, 7, 3])
+        solver.add_variable("b", [9, 3, 7])
+        solver.add_constraint(("a", "b"), lambda a, b: a != b)
+
+        solutions = solver.solve(one_solution=False, record_tree="off", decompose=False)
+        self.assertEqual([(s["a"], s["b"]) for s in solutions], [(9, 3), (9, 7), (3, 9), (3, 7), (7, 9), (7, 3)])
+
+    def test_matches_brute_force(self):
+        for seed in range(10):
+            variables, constraints = random_binary_model(seed)
+            expected = as_set(brute_force(variables, constraints))
+            for algorithm in (Algorithm.ForwardChecking, Algorithm.AC3, Algorithm.AC2001):
+                solver = build(CSPSolver(algorithm, compact_domains=True), variables, constraints)
+                solutions = solver.solve(one_solution=False, record_tree="off", decompose=False)
+                self.assertEqual(as_set(solutions), expected, "seed " + str(seed))
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,195 @@
+import itertools
+import random
+import unittest
+from cspsolver import CSPSolver, Algorithm
+from cspsolver.variable import Variable
+from cspsolver.global_constraints import GlobalConstraint, AllDifferent, Table, Predicate
+from .brute_force import brute_force, as_set, build
+
+
+# variabili con domini casuali, alcune assegnate, indicizzate come dopo la compilazione
+def random_variables(generator: random.Random, n_variables: int, n_values: int, assigned: float = 0.2):
+    variables = []
+    for index in range(n_variables):
+        domain = [value for value in range(n_values) if generator.random() < 0.5] or [generator.randrange(n_values)]
+        variable = Variable("x" + str(index), domain)
+        variable.index = index
+        if generator.random() < assigned:
+            variable.value = generator.choice(domain)
+        variables.append(variable)
+    return variables
+
+
+# valori di ogni variabile che compaiono in almeno una tupla di valori ammessa da allowed
+def supported_values(variables, allowed):
+    domains = [[variable.value] if variable.value is not None else list(variable.domain) for variable in variables]
+    supported = [set() for _ in variables]
+    for values in itertools.product(*domains):
+        if allowed(values):
+            for position, value in enumerate(values):
+                supported[position].add(value)
+    return supported
+
+
+class TestGlobalConstraint(unittest.TestCase):
+
+    def test_abstract(self):
+        # un vincolo deve implementare verify, check, forward e propagate
+        class OnlyCheck(GlobalConstraint):
+            def check(self, variables):
+                return True
+
+        with self.assertRaises(TypeError):
+            GlobalConstraint(("a", "b"))
+        with self.assertRaises(TypeError):
+            OnlyCheck(("a", "b"))
+
+
+class TestAllDifferent(unittest.TestCase):
+
+    def test_propagate_matches_brute_force(self):
+        generator = random.Random(0)
+        for _ in range(300):
+            variables = random_variables(generator, generator.randint(2, 5), generator.randint(2, 6))
+            constraint = AllDifferent(tuple(variable.name for variable in variables))
+            constraint.compile({variable.name: variable.index for variable in variables})
+            supported = supported_values(variables, lambda values: len(set(values)) == len(values))
+            domains = [list(variable.domain) for variable in variables]
+
+            changed = set()
+            consistent = constraint.propagate(variables, changed, None)
+
+            self.assertEqual(consistent, all(supported), domains)
+            if not consistent:
+                continue
+            for variable, values, domain in zip(variables, supported, domains):
+                if variable.value is None:
+                    self.assertEqual(set(variable.domain), values, domains)
+                    self.assertEqual(variable.index in changed, len(variable.domain) < len(domain))
+
+            # il matching salvato viene riutilizzato: una seconda propagazione non elimina altro
+            self.assertTrue(constraint.propagate(variables, changed, None))
+            self.assertEqual([set(variable.domain) for variable in variables if variable.value is None],
+                             [values for variable, values in zip(variables, supported) if variable.value is None])
+
+    def test_pigeonhole(self):
+        variables = [Variable(name, [1, 2]) for name in ("a", "b", "c")]
+        constraint = AllDifferent(("a", "b", "c"))
+        constraint.compile({"a": 0, "b": 1, "c": 2})
+        for index, variable in enumerate(variables):
+            variable.index = index
+
+        self.assertFalse(constraint.propagate(variables, set(), None))
+
+    def test_search_matches_brute_force(self):
+        generator = random.Random(1)
+        for seed in range(20):
+            names = ["x" + str(index) for index in range(5)]
+            variables = {name: [value for value in range(5) if generator.random() < 0.7] or [0] for name in names}
+            extra = [((names[0], names[1]), lambda a, b: a < b)]
+            expected = brute_force(variables, extra + [(tuple(names), lambda *values: len(set(values)) == len(values))])
+
+            for algorithm in (Algorithm.StandardBacktracking, Algorithm.ForwardChecking, Algorithm.AC3, Algorithm.AC2001):
+                solver = build(CSPSolver(algorithm), variables, extra)
+                solver.add_all_different(names)
+                solutions = solver.solve(one_solution=False, record_tree="off")
+                self.assertEqual(as_set(solutions), as_set(expected), "seed {0}, {1}".format(seed, algorithm.__name__))
+
+
+class TestTable(unittest.TestCase):
+
+    def setUp(self):
+        self.generator = random.Random(2)
+
+    def random_table(self, variables, n_values: int):
+        n_tuples = self.generator.randint(0, 12)
+        tuples = [tuple(self.generator.randrange(n_values) for _ in variables) for _ in range(n_tuples)]
+        constraint = Table(tuple(variable.name for variable in variables), tuples)
+        constraint.compile({variable.name: variable.index for variable in variables})
+        return constraint, set(tuples)
+
+    def test_propagate_matches_brute_force(self):
+        for _ in range(300):
+            variables = random_variables(self.generator, self.generator.randint(1, 4), self.generator.randint(2, 4))
+            constraint, tuples = self.random_table(variables, 4)
+            supported = supported_values(variables, lambda values: values in tuples)
+
+            consistent = constraint.propagate(variables, set(), None)
+
+            self.assertEqual(consistent, all(supported))
+            if consistent:
+                for variable, values in zip(variables, supported):
+                    if variable.value is None:
+                        self.assertEqual(set(variable.domain), values)
+
+    def test_forward_matches_brute_force(self):
+        for _ in range(300):
+            variables = random_variables(self.generator, self.generator.randint(1, 4), 3, assigned=0.5)
+            constraint, tuples = self.random_table(variables, 3)
+            # valori compatibili con le sole variabili assegnate (i domini delle altre non contano)
+            assigned = [(position, variable.value) for position, variable in enumerate(variables) if variable.value is not None]
+            compatible = [values for values in tuples if all(values[position] == value for position, value in assigned)]
+            expected = [set(values[position] for values in compatible) & set(variable.domain)
+                        for position, variable in enumerate(variables)]
+
+            consistent = constraint.forward(variables, 0, None)
+
+            unassigned = [position for position, variable in enumerate(variables) if variable.value is None]
+            self.assertEqual(consistent, bool(compatible) and all(expected[position] for position in unassigned))
+            self.assertEqual(constraint.check(variables), bool(compatible))
+            if consistent:
+                for position in unassigned:
+                    self.assertEqual(set(variables[position].domain), expected[position])
+
+    def test_search_matches_brute_force(self):
+        for seed in range(20):
+            generator = random.Random(seed)
+            variables = {name: [0, 1, 2] for name in ("a", "b", "c", "d")}
+            tuples = [tuple(generator.randrange(3) for _ in range(3)) for _ in range(8)]
+            extra = [(("c", "d"), lambda c, d: c != d)]
+            expected = brute_force(variables, extra + [(("a", "b", "c"), lambda *values: values in tuples)])
+
+            for algorithm in (Algorithm.StandardBacktracking, Algorithm.ForwardChecking, Algorithm.AC3, Algorithm.AC2001):
+                for compact_domains in (False, True):
+                    solver = build(CSPSolver(algorithm, compact_domains=compact_domains), variables, extra)
+                    solver.add_table_constraint(("a", "b", "c"), tuples)
+                    solutions = solver.solve(one_solution=False, record_tree="off")
+                    self.assertEqual(as_set(solutions), as_set(expected), "seed {0}, {1}".format(seed, algorithm.__name__))
+
+    def test_duplicate_tuples(self):
+        constraint = Table(("a", "b"), [(1, 2), [0, 0], (1, 2), (0, 0), (2, 1)])
+        self.assertEqual(constraint.tuples, ((1, 2), (0, 0), (2, 1)))
+
+
+class TestPredicate(unittest.TestCase):
+
+    def test_propagate_matches_brute_force(self):
+        generator = random.Random(3)
+        function = lambda a, b, c: a + b == c
+        for _ in range(200):
+            variables = random_variables(generator, 3, 5)
+            constraint = Predicate(("x0", "x1", "x2"), function)
+            constraint.compile({"x0": 0, "x1": 1, "x2": 2})
+            supported = supported_values(variables, lambda values: function(*values))
+
+            consistent = constraint.propagate(variables, set(), None)
+
+            self.assertEqual(consistent, all(supported))
+            if consistent:
+                for variable, values in zip(variables, supported):
+                    if variable.value is None:
+                        self.assertEqual(set(variable.domain), values)
+
+    def test_search_matches_brute_force(self):
+        variables = {name: list(range(4)) for name in ("a", "b", "c", "d")}
+        constraints = [(("a", "b", "c"), lambda a, b, c: a + b == c), (("b", "c", "d"), lambda b, c, d: b * c != d)]
+        expected = as_set(brute_force(variables, constraints))
+
+        for algorithm in (Algorithm.GenerateAndTest, Algorithm.StandardBacktracking, Algorithm.ForwardChecking,
+                          Algorithm.AC3, Algorithm.AC2001):
+            solver = build(CSPSolver(algorithm), variables, constraints)
+            self.assertEqual(as_set(solver.solve(one_solution=False, record_tree="off")), expected, algorithm.__name__)
+
+
+if __name__ == "__main__":
+    unittest.main()
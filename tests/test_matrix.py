@@ -0,0 +1,44 @@
+import unittest
+from cspsolver import CSPSolver, Algorithm
+from .brute_force import brute_force, as_set, random_binary_model, build
+
+
+class TestPrecompile(unittest.TestCase):
+
+    def test_matches_constraints(self):
+        for seed in range(10):
+            variables, constraints = random_binary_model(seed)
+            expected = as_set(brute_force(variables, constraints))
+            for compact_domains in (False, True):
+                solver = build(CSPSolver(Algorithm.AC3, compact_domains=compact_domains, precompile=True), variables, constraints)
+                solutions = solver.solve(one_solution=False, record_tree="off", decompose=False)
+                self.assertEqual(as_set(solutions), expected, "seed " + str(seed))
+
+    def test_ragged_values(self):
+        # tuple di lunghezza diversa: numpy non può costruire un array dei valori
+        variables = {"p": [(1,), (1, 2)], "q": [(1,), (2, 3)]}
+        constraints = [(("p", "q"), lambda p, q: p != q)]
+        expected = as_set(brute_force(variables, constraints))
+
+        for precompile in (False, True):
+            solver = build(CSPSolver(precompile=precompile), variables, constraints)
+            solutions = solver.solve(one_solution=False, record_tree="off")
+            self.assertEqual(len(solutions), 3)
+            self.assertEqual(as_set(solutions), expected)
+
+    def test_statistics_count_checks(self):
+        # forward checking confronta ogni valore del dominio: stesse verifiche con e senza matrici
+        variables, constraints = random_binary_model(3)
+        counts = []
+        for precompile in (False, True):
+            solver = build(CSPSolver(Algorithm.ForwardChecking, precompile=precompile), variables, constraints)
+            solver.solve(one_solution=False, record_tree="off", statistics=True)
+            counts.append(solver.stats.constraint_checks)
+            self.assertNotIn("has_support", vars(solver._constraints))
+            self.assertNotIn("check", vars(solver._constraints))
+        self.assertGreater(sum(counts[0].values()), 0)
+        self.assertEqual(counts[0], counts[1])
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,75 @@
+import unittest
+from cspsolver import CSPSolver, Algorithm, Policy
+from cspsolver.nogoods import NogoodStore
+from .brute_force import brute_force, as_set, random_binary_model, build
+
+
+class Assigned:
+    # variabile con il solo valore assegnato, come quelle passate a NogoodStore.find
+    def __init__(self, value):
+        self.value = value
+
+
+class TestNogoodStore(unittest.TestCase):
+
+    def test_find(self):
+        store = NogoodStore(10)
+        store.add([(2, "x"), (0, 1)])
+        variables = [Assigned(1), Assigned(None), Assigned(None)]
+
+        self.assertEqual(store.find(variables, 2, "x"), ((0, 1), (2, "x")))
+        self.assertIsNone(store.find(variables, 2, "y"))
+        variables[0].value = 2
+        self.assertIsNone(store.find(variables, 2, "x"))
+        self.assertEqual(store.learned, 1)
+        self.assertEqual(store.hits, 1)
+
+    def test_least_recently_used_is_evicted(self):
+        store = NogoodStore(2)
+        store.add([(0, 1)])
+        store.add([(1, 1)])
+        # il primo nogood taglia un ramo: diventa il più recente
+        self.assertIsNotNone(store.find([Assigned(1)], 0, 1))
+        store.add([(2, 1)])
+
+        self.assertEqual(store.get_nogoods(), [((0, 1),), ((2, 1),)])
+        self.assertEqual(store.evicted, 1)
+        self.assertIsNone(store.find([Assigned(None), Assigned(1)], 1, 1))
+
+    def test_empty_nogood(self):
+        store = NogoodStore(1)
+        store.add([])
+        self.assertEqual(store.get_nogoods(), [])
+        with self.assertRaises(ValueError):
+            NogoodStore(0)
+
+
+class TestNogoodSearch(unittest.TestCase):
+
+    def test_matches_brute_force(self):
+        for seed in range(25):
+            variables, constraints = random_binary_model(seed, n_variables=7, domain_size=3, density=0.5, tightness=0.35)
+            expected = brute_force(variables, constraints)
+            for algorithm in (Algorithm.StandardBacktracking, Algorithm.ForwardChecking):
+                for capacity in (1, 1000):
+                    for backjumping in (False, True):
+                        solver = build(CSPSolver(algorithm, Policy.MinimumRemainingValues), variables, constraints)
+                        solutions = solver.solve(one_solution=False, record_tree="off", nogoods=capacity,
+                                                 backjumping=backjumping, decompose=False)
+                        message = "seed {0}, capacity {1}, backjumping {2}".format(seed, capacity, backjumping)
+                        self.assertEqual(len(solutions), len(expected), message)
+                        self.assertEqual(as_set(solutions), as_set(expected), message)
+
+    def test_learns_on_unsatisfiable(self):
+        # pigeonhole: 4 variabili, 3 valori, tutte diverse
+        variables = {name: [0, 1, 2] for name in ("a", "b", "c", "d")}
+        names = list(variables)
+        constraints = [((x, y), lambda p, q: p != q) for i, x in enumerate(names) for y in names[i + 1:]]
+
+        solver = build(CSPSolver(), variables, constraints)
+        self.assertEqual(solver.solve(one_solution=False, record_tree="off", nogoods=100, statistics=True), [])
+        self.assertGreater(solver.stats.nogoods, 0)
+
+
+if __name__ == "__main__":
+    unittest.main()
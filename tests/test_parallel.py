@@ -0,0 +1,35 @@
+import unittest
+from cspsolver import CSPSolver, Algorithm
+from .brute_force import brute_force, as_set, random_binary_model, build
+
+
+class TestSolveParallel(unittest.TestCase):
+
+    def test_matches_brute_force(self):
+        for seed in range(3):
+            variables, constraints = random_binary_model(seed, n_variables=7, domain_size=3, tightness=0.3)
+            expected = as_set(brute_force(variables, constraints))
+            for split_depth in (None, 0, 1, 3, 7, 10):
+                solver = build(CSPSolver(Algorithm.ForwardChecking), variables, constraints)
+                solutions = solver.solve_parallel(workers=2, split_depth=split_depth, one_solution=False)
+                self.assertEqual(len(solutions), len(expected), "split_depth " + str(split_depth))
+                self.assertEqual(as_set(solutions), expected, "split_depth " + str(split_depth))
+
+    def test_split_depth_zero(self):
+        solver = CSPSolver()
+        solver.add_variables(["a", "b", "c"], [0, 1, 2])
+        solver.add_constraint(("a", "b"), lambda a, b: a != b)
+        solver.add_constraint(("b", "c"), lambda b, c: b != c)
+
+        self.assertEqual(len(solver.solve_parallel(workers=2, split_depth=0, one_solution=False)), 12)
+        self.assertEqual(len(solver.solve_parallel(workers=2, split_depth=0)), 1)
+
+    def test_negative_split_depth(self):
+        solver = CSPSolver()
+        solver.add_variable("a", [0, 1])
+        with self.assertRaises(ValueError):
+            solver.solve_parallel(split_depth=-1)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,71 @@
+import unittest
+from cspsolver import CSPSolver, Algorithm, Policy
+from .brute_force import brute_force, as_set, random_binary_model, build
+
+ADAPTIVE = (Policy.DomainOverWeightedDegree, Policy.ActivityBased)
+ALGORITHMS = (Algorithm.StandardBacktracking, Algorithm.ForwardChecking, Algorithm.AC3)
+
+
+class TestAdaptivePolicies(unittest.TestCase):
+
+    def test_matches_brute_force(self):
+        for seed in range(10):
+            variables, constraints = random_binary_model(seed, n_variables=7)
+            expected = as_set(brute_force(variables, constraints))
+            for policy in ADAPTIVE:
+                for algorithm in ALGORITHMS:
+                    solver = build(CSPSolver(algorithm, policy), variables, constraints)
+                    solutions = solver.solve(one_solution=False, record_tree="off", decompose=False)
+                    self.assertEqual(as_set(solutions), expected,
+                                     "seed {0}, {1}, {2}".format(seed, policy.__name__, algorithm.__name__))
+
+    @staticmethod
+    def _model(policy):
+        # il vincolo tra x e z fallisce sempre: assegnato x, forward checking svuota z
+        solver = CSPSolver(Algorithm.ForwardChecking, policy)
+        solver.add_variable("x", [0])
+        solver.add_variable("y", [0, 1])
+        solver.add_variable("z", [0, 1])
+        solver.add_variable("w", [0, 1])
+        solver.add_constraint(("x", "z"), lambda x, z: False)
+        solver.add_constraint(("y", "z"), lambda y, z: True)
+        solver.add_constraint(("y", "w"), lambda y, w: True)
+        solver._compile()
+        return solver
+
+    @staticmethod
+    def _assigned_root(solver):
+        node = solver.get_root().snapshot(None)
+        node.assign_variable("x", 0)
+        return node
+
+    def test_failure_bumps_weighted_degree(self):
+        solver = self._model(Policy.DomainOverWeightedDegree)
+        constraints = solver._constraints
+        weights = constraints.get_conflicts().variable_weights
+        self.assertEqual(weights, [1, 2, 2, 1])
+        self.assertEqual(Policy.DomainOverWeightedDegree(self._assigned_root(solver), constraints, 1).name, "y")
+
+        self.assertFalse(Algorithm.ForwardChecking(self._assigned_root(solver), constraints, 0, None))
+        self.assertEqual(weights, [2, 2, 3, 1])
+        self.assertEqual(Policy.DomainOverWeightedDegree(self._assigned_root(solver), constraints, 1).name, "z")
+
+    def test_failure_bumps_activity(self):
+        solver = self._model(Policy.ActivityBased)
+        constraints = solver._constraints
+        self.assertEqual(Policy.ActivityBased(self._assigned_root(solver), constraints, 1).name, "y")
+        self.assertTrue(constraints.tracks_activity())
+
+        # come un passo della ricerca: misura i domini prima e dopo l'algoritmo
+        node = self._assigned_root(solver)
+        sizes = [len(variable.domain) for variable in node.get_variables()]
+        self.assertFalse(Algorithm.ForwardChecking(node, constraints, 0, None))
+        constraints.get_conflicts().update_activity(node.get_variables(), sizes)
+
+        activity = constraints.get_conflicts().activity
+        self.assertEqual(activity[2], 1.0)
+        self.assertEqual(Policy.ActivityBased(self._assigned_root(solver), constraints, 1).name, "z")
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,91 @@
+import unittest
+from cspsolver import CSPSolver, ValueOrder
+from cspsolver.structure import cycle_cutset
+from .brute_force import brute_force, as_set, random_binary_model, build
+
+
+class TestSolveTree(unittest.TestCase):
+
+    def test_forest_matches_brute_force(self):
+        # catena a - b - c più la variabile isolata d
+        variables = {"a": [0, 1, 2], "b": [0, 1, 2], "c": [0, 1, 2], "d": [0, 1]}
+        constraints = [(("a", "b"), lambda a, b: a < b), (("b", "c"), lambda b, c: b != c), (("a",), lambda a: a != 1)]
+        solver = build(CSPSolver(), variables, constraints)
+
+        self.assertEqual(as_set(solver.solve_tree(one_solution=False)), as_set(brute_force(variables, constraints)))
+
+    def test_cutset_matches_brute_force(self):
+        for seed in range(30):
+            variables, constraints = random_binary_model(seed, n_variables=6, domain_size=3, density=0.6)
+            solver = build(CSPSolver(), variables, constraints)
+            expected = brute_force(variables, constraints)
+
+            solutions = list(solver.solve_tree(one_solution=False))
+            self.assertEqual(len(solutions), len(expected), "seed " + str(seed))
+            self.assertEqual(as_set(solutions), as_set(expected), "seed " + str(seed))
+
+            first = list(build(CSPSolver(), variables, constraints).solve_tree())
+            self.assertEqual(len(first), min(1, len(expected)), "seed " + str(seed))
+            if first:
+                self.assertIn(first[0], expected)
+
+    def test_max_cutset(self):
+        # triangolo: serve una variabile nell'insieme di taglio
+        solver = CSPSolver()
+        solver.add_variables(["a", "b", "c"], [0, 1, 2])
+        for names in (("a", "b"), ("b", "c"), ("a", "c")):
+            solver.add_constraint(names, lambda x, y: x != y)
+
+        solver._compile()
+        self.assertEqual(len(cycle_cutset(solver._constraints, 3)), 1)
+        with self.assertRaises(ValueError):
+            solver.solve_tree(max_cutset=0)
+        self.assertEqual(len(list(solver.solve_tree(one_solution=False, max_cutset=1))), 6)
+
+
+class TestSolveComponents(unittest.TestCase):
+
+    def test_matches_brute_force(self):
+        # due triangoli separati e una variabile isolata
+        variables = {name: [0, 1, 2] for name in ("a", "b", "c", "d", "e", "f", "g")}
+        constraints = [(("a", "b"), lambda a, b: a != b), (("b", "c"), lambda b, c: b != c), (("a", "c"), lambda a, c: a < c),
+                       (("d", "e"), lambda d, e: d != e), (("e", "f"), lambda e, f: e > f), (("d", "f"), lambda d, f: d != f)]
+        expected = as_set(brute_force(variables, constraints))
+
+        for workers in (None, 2):
+            solver = build(CSPSolver(), variables, constraints)
+            self.assertEqual(as_set(solver.solve_components(one_solution=False, workers=workers)), expected)
+            self.assertEqual(len(list(solver.solve_components(workers=workers))), 1)
+
+    def test_unsatisfiable_component(self):
+        solver = CSPSolver()
+        solver.add_variables(["a", "b", "c"], [0, 1])
+        solver.add_constraint(("a", "b"), lambda a, b: a == b and a != b)
+
+        for workers in (None, 2):
+            self.assertEqual(list(solver.solve_components(one_solution=False, workers=workers)), [])
+
+
+class TestSolveStructured(unittest.TestCase):
+
+    def test_value_order_on_forest(self):
+        # con un ordinamento dei valori diverso da InsertOrder solve non usa il solver per alberi
+        for decompose in (True, False):
+            solver = CSPSolver(value_order=ValueOrder.ByKey(lambda value: value, reverse=True))
+            solver.add_variables(["a", "b"], [0, 1, 2])
+            solver.add_constraint(("a", "b"), lambda a, b: a != b)
+
+            self.assertEqual(solver.solve(record_tree="off", decompose=decompose), [{"a": 2, "b": 1}])
+
+    def test_forest_matches_search(self):
+        variables = {"a": [0, 1, 2], "b": [0, 1, 2], "c": [0, 1, 2]}
+        constraints = [(("a", "b"), lambda a, b: a != b), (("b", "c"), lambda b, c: b < c)]
+
+        decomposed = build(CSPSolver(), variables, constraints).solve(one_solution=False, record_tree="off", decompose=True)
+        searched = build(CSPSolver(), variables, constraints).solve(one_solution=False, record_tree="off", decompose=False)
+        self.assertEqual(as_set(decomposed), as_set(searched))
+        self.assertEqual(as_set(decomposed), as_set(brute_force(variables, constraints)))
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,63 @@
+import errno
+import io
+import json
+import threading
+import unittest
+from cspsolver import CSPSolver
+from cspsolver.trace import JSONLinesWriter, Verbosity, SOLUTION
+
+
+class FullDisk(io.RawIOBase):
+    # file che fallisce ad ogni scrittura come un disco pieno
+    def writable(self):
+        return True
+
+    def write(self, data):
+        raise OSError(errno.ENOSPC, "No space left on device")
+
+
+def queens(n: int) -> CSPSolver:
+    solver = CSPSolver()
+    names = ["r" + str(i) for i in range(n)]
+    for name in names:
+        solver.add_variable(name, list(range(n)))
+    for i in range(n):
+        for j in range(i + 1, n):
+            solver.add_constraint((names[i], names[j]), lambda xi, xj, d=j - i: xi != xj and abs(xi - xj) != d)
+    return solver
+
+
+class TestJSONLinesWriter(unittest.TestCase):
+
+    def test_writes_events(self):
+        file = io.BytesIO()
+        with JSONLinesWriter(file, Verbosity.SEARCH, buffer_size=8) as writer:
+            solutions = queens(5).solve(target=writer, record_tree="off")
+
+        records = [json.loads(line) for line in file.getvalue().decode("utf-8").splitlines()]
+        self.assertEqual(records[-1], {"event": SOLUTION, "assignment": solutions[0]})
+        self.assertTrue(all(record["event"] in ("assign", "fail", SOLUTION) for record in records))
+
+    def test_write_error(self):
+        errors = []
+
+        def run():
+            writer = JSONLinesWriter(FullDisk(), Verbosity.ALL, buffer_size=4)
+            try:
+                queens(6).solve(target=writer)
+                writer.flush()
+            except OSError as error:
+                errors.append(error)
+            writer.close()
+
+        thread = threading.Thread(target=run, daemon=True)
+        thread.start()
+        thread.join(10)
+
+        self.assertFalse(thread.is_alive(), "the writer is blocked after a write error")
+        self.assertEqual(len(errors), 1)
+        self.assertEqual(errors[0].errno, errno.ENOSPC)
+
+
+if __name__ == "__main__":
+    unittest.main()